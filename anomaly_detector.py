@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from count_matrix import CountMatrixBuilder, matriks_bulanan_dari_long
+from maintenance_data import load_job_reports, clean_job_reports
+from maintenance_store import store_tersedia, connect_store, query_bulanan_kapal_komponen, simpan_tabel
+from ingest_daemon import baca_agregat
+
+# ==========================================
+# KONFIGURASI DETEKSI ANOMALI
+# ==========================================
+# Setiap seri = jumlah job per bulan untuk satu pasangan (Kapal, Komponen).
+# Bulan t dianggap lonjakan jika jauh di atas baseline robust 12 bulan sebelumnya:
+#   skor = (jumlah - median) / skala,  skala = max(1.4826 * MAD, sqrt(median))
+# Batas bawah sqrt(median) (ala Poisson) mencegah skor meledak pada seri yang datar.
+FILE_ALERT = 'Alert_Anomali_Komponen.csv'
+WINDOW = 12          # Panjang baseline (bulan)
+MIN_SKOR = 3.5       # Ambang skor robust z
+MIN_JUMLAH = 3       # Jumlah job minimum di bulan lonjakan
+MIN_SELISIH = 2      # Selisih minimum terhadap median baseline
+CHUNK_ROWS = 20000   # Jumlah seri per blok perhitungan (membatasi memori)
+
+# ==========================================
+# 1. SKOR ROBUST Z (VECTORIZED)
+# ==========================================
+def robust_z(counts, window=WINDOW):
+    """
+    Menghitung skor untuk semua seri sekaligus.
+    counts : array (seri x bulan). Hasil: (skor, median) berukuran (seri x bulan-window),
+    kolom ke-j menilai bulan ke-(window + j) terhadap `window` bulan sebelumnya.
+    """
+    counts = np.asarray(counts, dtype=float)
+    n_eval = counts.shape[1] - window
+    if n_eval <= 0:
+        empty = np.zeros((counts.shape[0], 0))
+        return empty, empty
+
+    scores = np.empty((counts.shape[0], n_eval))
+    medians = np.empty((counts.shape[0], n_eval))
+    for start in range(0, counts.shape[0], CHUNK_ROWS):
+        block = counts[start:start + CHUNK_ROWS]
+        # Jendela baseline: bulan [t-window, t) untuk setiap t yang dinilai
+        baseline = sliding_window_view(block[:, :-1], window, axis=1)
+        med = np.median(baseline, axis=2)
+        mad = np.median(np.abs(baseline - med[:, :, None]), axis=2)
+        scale = np.maximum(1.4826 * mad, np.sqrt(np.maximum(med, 1.0)))
+
+        scores[start:start + CHUNK_ROWS] = (block[:, window:] - med) / scale
+        medians[start:start + CHUNK_ROWS] = med
+    return scores, medians
+
+# ==========================================
+# 2. TABEL ALERT
+# ==========================================
+def deteksi_anomali(counts, labels, first_period, window=WINDOW, min_skor=MIN_SKOR):
+    """
+    Menghasilkan tabel alert (diurutkan dari skor tertinggi) untuk seluruh matriks
+    bulanan. labels = MultiIndex (VESSELID, COMPNAME) untuk setiap baris counts.
+    """
+    counts = np.asarray(counts)
+    scores, medians = robust_z(counts, window)
+    actual = counts[:, window:]
+
+    hit = (scores >= min_skor) & (actual >= MIN_JUMLAH) & (actual - medians >= MIN_SELISIH)
+    rows, cols = np.nonzero(hit)
+
+    periods = first_period + window + cols
+    alerts = pd.DataFrame(labels[rows].to_frame(index=False))
+    alerts['PERIODE'] = [f"{p // 12}-{p % 12 + 1:02d}" for p in periods]
+    alerts['JUMLAH_JOB'] = actual[rows, cols]
+    alerts['BASELINE_MEDIAN'] = medians[rows, cols]
+    alerts['SKOR_ANOMALI'] = np.round(scores[rows, cols], 2)
+
+    alerts = alerts.sort_values('SKOR_ANOMALI', ascending=False).reset_index(drop=True)
+    alerts.index += 1
+    alerts.index.name = 'RANK'
+    return alerts
+
+
+def baca_alert(path=FILE_ALERT):
+    """Dipakai dashboard: membaca tabel alert yang sudah dihitung (None jika belum ada)."""
+    try:
+        return pd.read_csv(path, index_col='RANK')
+    except FileNotFoundError:
+        return None
+
+# ==========================================
+# 3. EKSEKUSI BATCH
+# ==========================================
+if __name__ == '__main__':
+    print("\n--- [1] MENYUSUN MATRIKS BULANAN (KAPAL x KOMPONEN x BULAN) ---")
+    conn = connect_store() if store_tersedia() else None
+    agregat = baca_agregat()
+    if agregat is not None:
+        # Agregat dari ingest_daemon selalu mengikuti file export terbaru
+        counts, first_period, labels = matriks_bulanan_dari_long(agregat, ['VESSELID', 'COMPNAME'])
+    elif conn is not None:
+        counts, first_period, labels = matriks_bulanan_dari_long(
+            query_bulanan_kapal_komponen(conn), ['VESSELID', 'COMPNAME']
+        )
+    else:
+        df_done = clean_job_reports(load_job_reports())
+        counts, first_period, labels = CountMatrixBuilder(df_done).monthly(('VESSELID', 'COMPNAME'))
+    print(f"Total seri: {counts.shape[0]:,} | Total bulan: {counts.shape[1]}")
+
+    print("\n--- [2] MENDETEKSI LONJAKAN ---")
+    alerts = deteksi_anomali(counts, labels, first_period)
+    alerts.to_csv(FILE_ALERT)
+    if conn is not None:
+        simpan_tabel(conn, 'anomali', alerts.reset_index(), {'idx_anomali_vessel': ['VESSELID']})
+        conn.close()
+    print(f"Ditemukan {len(alerts):,} alert. Disimpan di: {FILE_ALERT}")
+    print(alerts.head(10))
@@ -0,0 +1,384 @@
+import asyncio
+import copy
+import functools
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+import pandas as pd
+
+from maintenance_data import FILE_MAINT, FILE_MASTER_BARANG, load_job_reports, clean_job_reports, hitung_mtbf
+from maintenance_store import STORE_PATH, store_tersedia, connect_store, query_bulanan_komponen, query_tanggal_akhir, baca_tabel
+from reliability import hitung_mtbf_jam, tabel_weibull, WeibullLookup
+from count_matrix import CountMatrixBuilder
+from trend_engine import TrendEngine
+from part_recommender import PartRecommender, baca_mapping_manual
+from due_scheduler import DueScheduler
+from demand_simulation import FILE_SIMULASI_KOMPONEN
+from ingest_daemon import versi_data, baca_ingest, daftar_part
+from chart_cache import versi_file
+from shared_data import map_dataset
+from date_parser import parse_tanggal
+
+# ==========================================
+# KONFIGURASI API LOKAL
+# ==========================================
+# MTBF, forecast (tren + simulasi demand + peluang gagal Weibull) dan rekomendasi
+# part per komponen disajikan lewat HTTP/JSON untuk tool internal lain.
+# Server asyncio (stdlib, tanpa dependency tambahan) dengan index dict di memori,
+# cache respons LRU, dan endpoint batch untuk banyak COMPNAME sekaligus.
+#   python api_server.py [--port 8765]
+#   GET  /health
+#   GET  /mtbf?compname=...          POST /batch/mtbf      {"compname": [...]}
+#   GET  /forecast?compname=...      POST /batch/forecast  {"compname": [...]}
+#   GET  /parts?compname=...         POST /batch/parts     {"compname": [...]}
+#   GET  /due?vesselid=...&hari=30   (tanpa vesselid = seluruh armada)
+# /forecast menerima parameter opsional umur (hari, default 0) & horizon (hari, default 30).
+# /due mengembalikan pekerjaan yang jatuh tempo (due_scheduler.py) + part yang dibutuhkan.
+# Jika ingest_daemon.py hanya menambah workbook baru, scheduler tidak dibangun ulang:
+# laporan di part baru dimasukkan lewat DueScheduler.tambah_laporan.
+HOST = '127.0.0.1'
+PORT = 8765
+USE_CACHE = os.environ.get('API_CACHE', '1') != '0'   # API_CACHE=0 untuk membandingkan tanpa cache
+MAX_CACHE = 4096            # Jumlah respons yang disimpan (LRU)
+MAX_BATCH = 1000            # Jumlah COMPNAME maksimum per request batch
+MAX_BODY = 1024 * 1024
+CEK_VERSI_DETIK = 30        # Index dibangun ulang jika versi data berubah
+# Sumber data job report (dipakai versi_data jika ingest belum ada) & tabel pendukung
+SUMBER_VERSI = (STORE_PATH,) + tuple(FILE_MAINT.values())
+SUMBER_PENDUKUNG = (FILE_MASTER_BARANG, FILE_SIMULASI_KOMPONEN)
+HORIZON_DEFAULT = 30
+
+_STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+
+class ApiError(Exception):
+    def __init__(self, status, pesan):
+        super().__init__(pesan)
+        self.status = status
+
+# ==========================================
+# 1. INDEX DI MEMORI
+# ==========================================
+def _ke_record(df, key='COMPNAME'):
+    """DataFrame -> {key: dict baris} dengan NaN dijadikan None (JSON null)."""
+    df = df.drop_duplicates(key).set_index(key)
+    df = df.astype(object).where(df.notna(), None)
+    return {k: {c: (v.item() if isinstance(v, np.generic) else v) for c, v in row.items()}
+            for k, row in zip(df.index, df.to_dict('records'))}
+
+
+class ApiIndex:
+    """Semua tabel per komponen, dimuat sekali dan disimpan sebagai dict (lookup O(1))."""
+
+    def __init__(self, scheduler=None, trend=None):
+        """
+        scheduler / trend: DueScheduler / TrendEngine yang sudah diperbarui secara
+        inkremental (dipakai ulang, tidak dibangun dari data).
+        """
+        t0 = time.perf_counter()
+        # Sumber yang sama dengan token versi_data: hasil ingest jika ada, lalu store, lalu xlsx
+        # Daftar part dibaca sebelum datanya (part yang tercatat pasti sudah ikut dimuat)
+        self.part_ingest = daftar_part()
+        df_ingest = baca_ingest()
+        if df_ingest is None and store_tersedia():
+            conn = connect_store(read_only=True)
+            mtbf = baca_tabel(conn, 'mtbf')
+            mtbf_jam = baca_tabel(conn, 'mtbf_jam')
+            weibull = baca_tabel(conn, 'weibull')
+            if trend is None:
+                trend = TrendEngine.from_long(query_bulanan_komponen(conn), 'COMPNAME', tanggal_akhir=query_tanggal_akhir(conn))
+            df_inventory = baca_tabel(conn, 'master_barang')
+            self.scheduler = scheduler if scheduler is not None else DueScheduler.from_store(conn)
+            conn.close()
+        else:
+            df_done = clean_job_reports(df_ingest if df_ingest is not None else load_job_reports())
+            mtbf = hitung_mtbf(df_done)
+            mtbf_jam = hitung_mtbf_jam(df_done)
+            weibull = tabel_weibull(df_done)
+            if trend is None:
+                trend = TrendEngine.from_builder(CountMatrixBuilder(df_done), 'COMPNAME')
+            df_inventory = pd.read_csv(FILE_MASTER_BARANG)
+            self.scheduler = scheduler if scheduler is not None else DueScheduler.from_jobs(df_done)
+
+        gabung = mtbf.merge(mtbf_jam, on='COMPNAME', how='outer').merge(weibull, on='COMPNAME', how='outer')
+        self.mtbf = _ke_record(gabung)
+        self.weibull = WeibullLookup(weibull)
+
+        self.trend = trend
+        tren = trend.summary().reset_index()
+        self.tren = _ke_record(tren)
+        self.periode_tren = trend.periode_yoy()
+        try:
+            self.simulasi = _ke_record(pd.read_csv(FILE_SIMULASI_KOMPONEN))
+        except FileNotFoundError:
+            self.simulasi = {}
+
+        self.recommender = PartRecommender(df_inventory, mapping_manual=baca_mapping_manual())
+        self._parts = {}
+        self.komponen = set(self.mtbf) | set(self.tren)
+        # Pencarian tidak peka huruf besar/kecil & spasi di tepi
+        self._nama = {k.strip().upper(): k for k in self.komponen if isinstance(k, str)}
+        print(f"[api] Index dimuat: {len(self.komponen):,} komponen ({time.perf_counter() - t0:.1f} s)")
+
+    def nama_komponen(self, compname):
+        return self._nama.get(str(compname).strip().upper())
+
+    def data_mtbf(self, comp):
+        return self.mtbf.get(comp)
+
+    def data_forecast(self, comp, umur=0.0, horizon=HORIZON_DEFAULT):
+        if comp not in self.tren and comp not in self.simulasi:
+            return None
+        peluang = self.weibull.peluang_gagal(comp, umur, horizon)
+        return {
+            'PERIODE_TREN': self.periode_tren,
+            'TREN': self.tren.get(comp),
+            'SIMULASI_DEMAND': self.simulasi.get(comp),
+            'PELUANG_GAGAL': None if peluang is None else round(float(peluang), 4),
+            'UMUR_HARI': umur,
+            'HORIZON_HARI': horizon,
+        }
+
+    def data_parts(self, comp):
+        # Hasil pencarian per komponen disimpan sebagai list dict (konversi DataFrame hanya sekali)
+        if comp not in self._parts:
+            parts = self.recommender.cari(comp)
+            self._parts[comp] = [] if parts is None else parts.astype(object).where(parts.notna(), None).to_dict('records')
+        return self._parts[comp]
+
+    def data_due(self, kapal=None, hari=HORIZON_DEFAULT):
+        due = self.scheduler.jatuh_tempo(hari, kapal)
+        parts = self.scheduler.kebutuhan_part(self.recommender, hari, kapal)
+        for df in (due, parts):
+            for c in df.columns[df.dtypes.map(pd.api.types.is_datetime64_any_dtype)]:
+                df[c] = df[c].dt.strftime('%Y-%m-%d')
+        ke_list = lambda df: df.astype(object).where(df.notna(), None).to_dict('records')
+        return {'VESSELID': kapal, 'HARI': hari, 'JOBS': ke_list(due), 'PARTS': ke_list(parts)}
+
+# ==========================================
+# 2. ROUTING
+# ==========================================
+def _angka(query, nama, default):
+    # nan / inf / negatif ditolak (umur & horizon dalam hari, tidak boleh negatif)
+    try:
+        nilai = float(query.get(nama, [default])[0])
+    except ValueError:
+        raise ApiError(400, f"Parameter '{nama}' harus berupa angka.")
+    if not np.isfinite(nilai) or nilai < 0:
+        raise ApiError(400, f"Parameter '{nama}' harus berupa angka >= 0.")
+    return nilai
+
+
+def _panjang_body(headers):
+    """Nilai Content-Length, atau None jika bukan bilangan bulat >= 0."""
+    try:
+        panjang = int(headers.get('content-length', 0) or 0)
+    except ValueError:
+        return None
+    return panjang if panjang >= 0 else None
+
+
+def _ambil(index, resource, compname, query):
+    comp = index.nama_komponen(compname)
+    if comp is None:
+        return None
+    if resource == 'mtbf':
+        return index.data_mtbf(comp)
+    if resource == 'forecast':
+        return index.data_forecast(comp, _angka(query, 'umur', 0), _angka(query, 'horizon', HORIZON_DEFAULT))
+    return index.data_parts(comp)
+
+
+def proses_request(index, method, target, body):
+    """Mengembalikan (status, objek JSON). Tidak menyentuh jaringan (mudah diuji)."""
+    url = urlsplit(target)
+    query = parse_qs(url.query)
+    bagian = [b for b in url.path.split('/') if b]
+
+    if bagian == ['health']:
+        return 200, {'status': 'ok', 'komponen': len(index.komponen)}
+
+    if method == 'GET' and bagian == ['due']:
+        kapal = query['vesselid'][0] if 'vesselid' in query else None
+        return 200, index.data_due(kapal, _angka(query, 'hari', HORIZON_DEFAULT))
+
+    if method == 'GET' and len(bagian) == 1 and bagian[0] in ('mtbf', 'forecast', 'parts'):
+        if 'compname' not in query:
+            raise ApiError(400, "Parameter 'compname' wajib diisi.")
+        compname = query['compname'][0]
+        hasil = _ambil(index, bagian[0], compname, query)
+        if hasil is None:
+            raise ApiError(404, f"Komponen '{compname}' tidak ditemukan.")
+        return 200, {'COMPNAME': index.nama_komponen(compname), bagian[0]: hasil}
+
+    if len(bagian) == 2 and bagian[0] == 'batch' and bagian[1] in ('mtbf', 'forecast', 'parts'):
+        if method != 'POST':
+            raise ApiError(405, 'Endpoint batch memakai POST.')
+        try:
+            daftar = json.loads(body or b'{}').get('compname', [])
+        except (ValueError, AttributeError):
+            raise ApiError(400, "Body harus JSON: {\"compname\": [...]}.")
+        if not isinstance(daftar, list):
+            raise ApiError(400, "'compname' harus berupa list.")
+        if len(daftar) > MAX_BATCH:
+            raise ApiError(413, f"Maksimum {MAX_BATCH} COMPNAME per request.")
+        # Komponen yang tidak ditemukan bernilai null
+        return 200, {'hasil': {str(c): _ambil(index, bagian[1], c, query) for c in daftar}}
+
+    raise ApiError(404, f"Endpoint '{url.path}' tidak ada.")
+
+# ==========================================
+# 3. SERVER HTTP (ASYNCIO, KEEP-ALIVE)
+# ==========================================
+class ApiServer:
+    def __init__(self, index_factory=ApiIndex, sumber_versi=SUMBER_VERSI, sumber_pendukung=SUMBER_PENDUKUNG):
+        self.index_factory = index_factory
+        self.sumber_versi = sumber_versi
+        self.sumber_pendukung = sumber_pendukung
+        self.versi = self._versi()
+        self.index = index_factory()
+        self._cache = OrderedDict()
+        self._tugas_versi = None
+        self.hits = 0
+        self.misses = 0
+
+    def _respons(self, method, target, body):
+        key = (method, target, body)
+        if USE_CACHE and key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+        self.misses += 1
+
+        try:
+            status, obj = proses_request(self.index, method, target, body)
+        except ApiError as e:
+            status, obj = e.status, {'error': str(e)}
+        # JSON standar: NaN/inf tidak boleh lolos ke klien
+        try:
+            data = json.dumps(obj, ensure_ascii=False, allow_nan=False).encode('utf-8')
+        except ValueError:
+            status, data = 500, b'{"error": "Respons berisi nilai bukan angka (NaN/inf)."}'
+        hasil = (status, data)
+        # Error 400/413 tidak di-cache (tergantung input), 404 tetap di-cache
+        if USE_CACHE and status in (200, 404):
+            self._cache[key] = hasil
+            if len(self._cache) > MAX_CACHE:
+                self._cache.popitem(last=False)
+        return hasil
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                baris = await reader.readline()
+                if not baris:
+                    break
+                try:
+                    method, target, _ = baris.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b'\r\n', b'\n', b''):
+                        break
+                    nama, _, nilai = h.decode('latin-1').partition(':')
+                    headers[nama.strip().lower()] = nilai.strip()
+
+                panjang = _panjang_body(headers)
+                if panjang is None:
+                    # Batas body tidak diketahui: koneksi tidak bisa dipakai ulang
+                    status, data = 400, b'{"error": "Content-Length tidak valid."}'
+                    tutup = True
+                elif panjang > MAX_BODY:
+                    status, data = 413, b'{"error": "Body terlalu besar."}'
+                    tutup = True
+                else:
+                    body = await reader.readexactly(panjang) if panjang else b''
+                    status, data = self._respons(method.upper(), target, body)
+                    tutup = headers.get('connection', '').lower() == 'close'
+
+                writer.write(
+                    f'HTTP/1.1 {status} {_STATUS.get(status, "")}\r\n'
+                    f'Content-Type: application/json; charset=utf-8\r\n'
+                    f'Content-Length: {len(data)}\r\n'
+                    f'Connection: {"close" if tutup else "keep-alive"}\r\n\r\n'.encode('latin-1') + data
+                )
+                await writer.drain()
+                if tutup:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _versi(self):
+        # Job report (manifest ingest / store / xlsx) + master barang & hasil simulasi
+        return versi_data(*self.sumber_versi), versi_file(*self.sumber_pendukung)
+
+    def _perbarui_inkremental(self):
+        """
+        Jika ingest hanya menambah part baru (tidak ada workbook yang diganti/dihapus),
+        laporan di part baru dimasukkan ke scheduler & trend engine index lama, lalu
+        keduanya dipakai ulang (argumen untuk index_factory). None = semua dibangun ulang.
+        """
+        lama, baru = getattr(self.index, 'part_ingest', None), daftar_part()
+        if lama is None or baru is None or not lama <= baru:
+            return None
+        # Trend disalin: jika index baru gagal dibangun, part yang sama ditambahkan lagi
+        # pada percobaan berikutnya (tambah_laporan scheduler aman diulang)
+        scheduler, trend = self.index.scheduler, copy.copy(self.index.trend)
+        if baru > lama:
+            df = pd.concat([map_dataset(p) for p in sorted(baru - lama)], ignore_index=True)
+            df['REPORT_DATE'] = parse_tanggal(df['JOBREPORT_DATE'])
+            n = scheduler.tambah_laporan(df)
+
+            # Hitungan bulanan part baru; bulan berjalan yang sudah ada ikut diperbarui
+            df = df.dropna(subset=['REPORT_DATE'])
+            period = (df['REPORT_DATE'].dt.year * 12 + df['REPORT_DATE'].dt.month - 1).rename('PERIOD')
+            bulanan = df.groupby([df['COMPNAME'], period]).size().rename('JUMLAH').reset_index()
+            trend.tambah_bulanan(bulanan, tanggal_akhir=df['REPORT_DATE'].max())
+            print(f"[api] {len(baru - lama)} part baru: {n:,} instance dijadwalkan ulang "
+                  f"(tanpa rebuild scheduler & matriks tren).")
+        return {'scheduler': scheduler, 'trend': trend}
+
+    async def _pantau_versi(self):
+        """Index & cache diganti jika versi data (ingest/store/xlsx) berubah."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(CEK_VERSI_DETIK)
+            try:
+                versi = self._versi()
+                if versi == self.versi:
+                    continue
+                # Index baru dibangun di thread lain; request tetap dilayani index lama
+                dipakai_ulang = self._perbarui_inkremental()
+                pabrik = self.index_factory if dipakai_ulang is None else functools.partial(self.index_factory, **dipakai_ulang)
+                self.index = await loop.run_in_executor(None, pabrik)
+                self._cache.clear()
+                self.versi = versi
+            except Exception as e:
+                # Versi tidak diperbarui -> dicoba lagi pada pengecekan berikutnya
+                print(f"[api] Warning: index gagal dibangun ulang ({type(e).__name__}: {e}), index lama tetap dipakai.")
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self._handle, host, port)
+        print(f"[api] Melayani di http://{host}:{port} (cache {'aktif' if USE_CACHE else 'nonaktif'})")
+        # Referensi task disimpan (event loop hanya menyimpan weak reference)
+        self._tugas_versi = asyncio.create_task(self._pantau_versi())
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[sys.argv.index('--port') + 1]) if '--port' in sys.argv else PORT
+    try:
+        asyncio.run(ApiServer().serve(port=port))
+    except KeyboardInterrupt:
+        print("\nBerhenti.")
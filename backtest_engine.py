@@ -0,0 +1,240 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from maintenance_data import load_job_reports, clean_job_reports
+from maintenance_store import store_tersedia, connect_store, simpan_tabel
+from sarimax_order import ORDER_DEFAULT, MIN_JOB, VALIDASI, seri_bulanan, pilih_order, ramal_order
+
+# ==========================================
+# KONFIGURASI BACKTEST ROLLING-ORIGIN
+# ==========================================
+# Akurasi di dashboard sebelumnya hanya dari satu holdout 3 bulan. Di sini setiap
+# komponen diuji pada N_CUTOFF titik potong berurutan: model dilatih sampai cutoff,
+# lalu meramal HORIZON bulan berikutnya. Semua model (SARIMAX & baseline) dinilai
+# dengan cutoff yang sama, paralel antar komponen (ProcessPoolExecutor).
+# SARIMAX_OTOMATIS = prosedur pencarian order (sarimax_order.pilih_order) yang dijalankan
+# ulang per cutoff hanya dengan data latih cutoff itu. Order hasil pencarian di seluruh
+# data tidak dipakai di sini, karena sudah "melihat" bulan-bulan yang diuji.
+# Prediksi per (komponen, model, cutoff) disimpan di FILE_BACKTEST_CACHE dengan kunci
+# hash data latih + spesifikasi model, sehingga rerun hanya fit cutoff yang datanya berubah.
+FILE_BACKTEST = 'Backtest_Metrik_Model.csv'
+FILE_BACKTEST_CACHE = 'Backtest_Prediksi_Cache.csv'
+HORIZON = 3
+N_CUTOFF = 6
+MIN_TRAIN = 12       # Panjang data latih minimum pada cutoff pertama
+N_PROSES = None      # None = jumlah CPU
+
+# Batas badge akurasi (NMAE) yang dipakai dashboard
+BATAS_AKURASI = [(0.2, 'Akurasi Tinggi'), (0.5, 'Akurasi Sedang')]
+
+MODEL_BASELINE = ['NAIVE', 'SEASONAL_NAIVE', 'RATA2_3_BULAN']
+
+# ==========================================
+# 1. MODEL
+# ==========================================
+def ramal_baseline(model, train, horizon):
+    """Baseline: nilai terakhir, nilai 12 bulan sebelumnya, atau rata-rata 3 bulan terakhir."""
+    if model == 'NAIVE':
+        return np.repeat(train[-1], horizon)
+    if model == 'SEASONAL_NAIVE':
+        if len(train) < 12:
+            return np.repeat(train[-1], horizon)
+        return np.resize(train[-12:], horizon)
+    if model == 'RATA2_3_BULAN':
+        return np.repeat(train[-3:].mean(), horizon)
+    raise ValueError(f"Model tidak dikenal: {model}")
+
+
+def ramal_model(spek, train, horizon):
+    """
+    spek: nama baseline, ('SARIMAX', order, seasonal_order) atau ('SARIMAX_CARI', validasi)
+    (order dicari dari train saja, lalu difit). ValueError jika prediksi tidak finite.
+    """
+    if isinstance(spek, str):
+        pred = ramal_baseline(spek, train, horizon)
+    elif spek[0] == 'SARIMAX_CARI':
+        pilihan = pilih_order(train, spek[1])
+        if pilihan is None:
+            raise ValueError('Tidak ada kandidat order yang berhasil difit.')
+        pred = ramal_order(train, pilihan['order'], pilihan['seasonal_order'], horizon)
+    else:
+        _, order, seasonal_order = spek
+        pred = ramal_order(train, order, seasonal_order, horizon)
+    if not np.all(np.isfinite(pred)):
+        raise ValueError('Prediksi tidak finite.')
+    return pred
+
+
+def daftar_model():
+    """{NAMA_MODEL: spek} yang dinilai untuk setiap komponen."""
+    model = {
+        'SARIMAX_DEFAULT': ('SARIMAX',) + ORDER_DEFAULT,
+        'SARIMAX_OTOMATIS': ('SARIMAX_CARI', VALIDASI),
+    }
+    model.update({m: m for m in MODEL_BASELINE})
+    return model
+
+
+def _kunci(train, spek, horizon):
+    """Hash data latih + spesifikasi model: prediksi cutoff bisa dipakai ulang jika sama."""
+    h = hashlib.md5(np.asarray(train, dtype=float).tobytes())
+    h.update(repr((spek, horizon)).encode())
+    return h.hexdigest()[:16]
+
+# ==========================================
+# 2. BACKTEST SATU KOMPONEN
+# ==========================================
+def cutoff_rolling(n, horizon=HORIZON, n_cutoff=N_CUTOFF, min_train=MIN_TRAIN):
+    """Panjang data latih untuk setiap cutoff (cutoff terakhir = n - horizon)."""
+    akhir = n - horizon
+    return [c for c in range(akhir - n_cutoff + 1, akhir + 1) if c >= min_train]
+
+
+def backtest_komponen(nilai, model, cache=None, horizon=HORIZON, n_cutoff=N_CUTOFF):
+    """
+    nilai: array jumlah job per bulan. model: {nama: spek}. cache: {kunci: prediksi}.
+    Mengembalikan (baris error per model/cutoff/langkah, semua prediksi yang dipakai,
+    jumlah fit baru). Prediksi cutoff lama yang tidak dipakai lagi tidak ikut dikembalikan.
+    """
+    y = np.asarray(nilai, dtype=float)
+    cache = cache or {}
+    baris, dipakai, n_baru = [], {}, 0
+    for cutoff in cutoff_rolling(len(y), horizon, n_cutoff):
+        train, aktual = y[:cutoff], y[cutoff:cutoff + horizon]
+        for nama, spek in model.items():
+            kunci = _kunci(train, spek, horizon)
+            pred = cache.get(kunci)
+            # Prediksi cache yang tidak finite (hasil versi lama) dihitung ulang
+            if pred is None or not np.all(np.isfinite(pred)):
+                try:
+                    pred = ramal_model(spek, train, horizon)
+                except (ValueError, np.linalg.LinAlgError):
+                    continue
+                n_baru += 1
+            dipakai[kunci] = pred
+            for langkah, (a, p) in enumerate(zip(aktual, pred), start=1):
+                baris.append((nama, cutoff, langkah, a, p))
+    return baris, dipakai, n_baru
+
+
+def _backtest_task(args):
+    comp, nilai, model, cache = args
+    return (comp,) + backtest_komponen(nilai, model, cache)
+
+# ==========================================
+# 3. METRIK & CACHE
+# ==========================================
+def label_akurasi(nmae):
+    for batas, label in BATAS_AKURASI:
+        if nmae < batas:
+            return label
+    return 'Akurasi Rendah'
+
+
+def ringkas_metrik(df_error):
+    """MAE, RMSE, NMAE (MAE / rata-rata aktual), BIAS (prediksi - aktual) per COMPNAME & MODEL."""
+    err = df_error['PREDIKSI'] - df_error['AKTUAL']
+    g = df_error.assign(ERR=err, ABS=err.abs(), SQ=err ** 2).groupby(['COMPNAME', 'MODEL'])
+    tabel = pd.DataFrame({
+        'MAE': g['ABS'].mean(),
+        'RMSE': np.sqrt(g['SQ'].mean()),
+        'BIAS': g['ERR'].mean(),
+        'RATA2_AKTUAL': g['AKTUAL'].mean(),
+        'N_CUTOFF': g['CUTOFF'].nunique(),
+        'N_PREDIKSI': g.size(),
+    }).reset_index()
+    tabel['NMAE'] = np.where(tabel['RATA2_AKTUAL'] > 0, tabel['MAE'] / tabel['RATA2_AKTUAL'], 0.0)
+    tabel['AKURASI'] = tabel['NMAE'].map(label_akurasi)
+    # Model terbaik per komponen = NMAE terkecil
+    tabel['TERBAIK'] = tabel.groupby('COMPNAME')['NMAE'].rank(method='first') == 1
+    kolom_angka = ['MAE', 'RMSE', 'BIAS', 'NMAE', 'RATA2_AKTUAL']
+    tabel[kolom_angka] = tabel[kolom_angka].round(3)
+    return tabel[['COMPNAME', 'MODEL', 'MAE', 'RMSE', 'NMAE', 'BIAS', 'RATA2_AKTUAL',
+                  'N_CUTOFF', 'N_PREDIKSI', 'AKURASI', 'TERBAIK']]
+
+
+def baca_cache(path=FILE_BACKTEST_CACHE):
+    """{COMPNAME: {kunci: array prediksi}} dari file cache prediksi."""
+    try:
+        df = pd.read_csv(path)
+    except FileNotFoundError:
+        return {}
+    cache = {}
+    for (comp, kunci), grup in df.groupby(['COMPNAME', 'KUNCI'], sort=False):
+        cache.setdefault(comp, {})[kunci] = grup.sort_values('LANGKAH')['PREDIKSI'].to_numpy()
+    return cache
+
+
+def tulis_cache(cache, path=FILE_BACKTEST_CACHE):
+    baris = [
+        (comp, kunci, langkah, p)
+        for comp, isi in cache.items() for kunci, pred in isi.items()
+        for langkah, p in enumerate(pred, start=1)
+    ]
+    pd.DataFrame(baris, columns=['COMPNAME', 'KUNCI', 'LANGKAH', 'PREDIKSI']).to_csv(path, index=False)
+
+
+def baca_metrik(path=FILE_BACKTEST):
+    """Dipakai dashboard: tabel metrik backtest (None jika belum ada)."""
+    try:
+        return pd.read_csv(path)
+    except FileNotFoundError:
+        return None
+
+# ==========================================
+# 4. SEMUA KOMPONEN (PROCESS POOL)
+# ==========================================
+def backtest_semua(df_done, n_proses=N_PROSES, min_job=MIN_JOB):
+    """Backtest semua komponen & model. Mengembalikan (tabel metrik, jumlah fit baru, jumlah dipakai ulang)."""
+    cache = baca_cache()
+    jumlah = df_done['COMPNAME'].value_counts()
+
+    tugas = []
+    for comp, df_comp in df_done[df_done['COMPNAME'].isin(jumlah[jumlah >= min_job].index)].groupby('COMPNAME'):
+        seri = seri_bulanan(df_comp)
+        if cutoff_rolling(len(seri)):
+            tugas.append((comp, seri.to_numpy(), daftar_model(), cache.get(comp, {})))
+    tugas.sort(key=lambda t: -len(t[1]))
+
+    frames, cache_baru, n_baru, n_total = [], {}, 0, 0
+    with ProcessPoolExecutor(max_workers=n_proses) as pool:
+        for comp, baris, dipakai, baru in pool.map(_backtest_task, tugas, chunksize=4):
+            df_err = pd.DataFrame(baris, columns=['MODEL', 'CUTOFF', 'LANGKAH', 'AKTUAL', 'PREDIKSI'])
+            frames.append(df_err.assign(COMPNAME=comp))
+            # Cache hanya menyimpan prediksi yang masih dipakai (cutoff lama dibuang)
+            cache_baru[comp] = dipakai
+            n_baru += baru
+            n_total += len(dipakai)
+
+    tulis_cache(cache_baru)
+    if not frames:
+        return ringkas_metrik(pd.DataFrame(columns=['COMPNAME', 'MODEL', 'CUTOFF', 'LANGKAH', 'AKTUAL', 'PREDIKSI'])), 0, 0
+    return ringkas_metrik(pd.concat(frames, ignore_index=True)), n_baru, n_total - n_baru
+
+# ==========================================
+# 5. EKSEKUSI
+# ==========================================
+if __name__ == '__main__':
+    print("\n--- [1] MEMUAT DATA MAINTENANCE ---")
+    df_done = clean_job_reports(load_job_reports())
+    print(f"Sukses! Total Data Maintenance (selesai): {len(df_done):,} baris.")
+
+    print(f"\n--- [2] BACKTEST ROLLING ({N_CUTOFF} cutoff, horizon {HORIZON} bulan, {N_PROSES or os.cpu_count()} proses) ---")
+    t0 = time.perf_counter()
+    metrik, n_baru, n_ulang = backtest_semua(df_done)
+    print(f"Selesai dalam {time.perf_counter() - t0:.1f} detik. Fit baru: {n_baru:,} | Dipakai ulang dari cache: {n_ulang:,}")
+
+    metrik.to_csv(FILE_BACKTEST, index=False)
+    if store_tersedia():
+        conn = connect_store()
+        simpan_tabel(conn, 'backtest', metrik, {'idx_backtest_comp': ['COMPNAME']})
+        conn.close()
+    print(f"Metrik disimpan di: {FILE_BACKTEST}")
+
+    print("\nModel terbaik per komponen:")
+    print(metrik[metrik['TERBAIK']][['COMPNAME', 'MODEL', 'MAE', 'NMAE', 'BIAS', 'AKURASI']].head(20))
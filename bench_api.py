@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+import numpy as np
+
+from api_server import HOST
+
+# ==========================================
+# LOAD TEST API LOKAL
+# ==========================================
+# Menjalankan api_server.py di proses terpisah (dengan & tanpa cache respons),
+# lalu KONEKSI klien keep-alive mengirim request selama DURASI detik per skenario.
+# Hasil: request/detik dan latency p50/p99.
+#   python bench_api.py
+PORT_BENCH = 8799
+KONEKSI = 32
+DURASI = 5
+UKURAN_BATCH = 50
+JUMLAH_BATCH = 20        # Variasi body batch; body acak setiap request tidak pernah kena cache respons
+
+
+async def _kirim(reader, writer, method, target, body=b''):
+    writer.write(
+        f'{method} {target} HTTP/1.1\r\nHost: {HOST}\r\nContent-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    panjang = 0
+    while True:
+        h = await reader.readline()
+        if h in (b'\r\n', b''):
+            break
+        if h.lower().startswith(b'content-length:'):
+            panjang = int(h.split(b':')[1])
+    return status, await reader.readexactly(panjang)
+
+
+async def _klien(port, buat_request, batas_waktu, latency):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    while time.perf_counter() < batas_waktu:
+        method, target, body = buat_request()
+        t0 = time.perf_counter()
+        await _kirim(reader, writer, method, target, body)
+        latency.append(time.perf_counter() - t0)
+    writer.close()
+
+
+async def _skenario(port, buat_request):
+    latency = []
+    batas_waktu = time.perf_counter() + DURASI
+    t0 = time.perf_counter()
+    await asyncio.gather(*[_klien(port, buat_request, batas_waktu, latency) for _ in range(KONEKSI)])
+    detik = time.perf_counter() - t0
+    ms = np.array(latency) * 1000
+    return len(latency) / detik, np.percentile(ms, 50), np.percentile(ms, 99)
+
+
+async def _tunggu_server(port, batas=300):
+    mulai = time.time()
+    while time.time() - mulai < batas:
+        try:
+            reader, writer = await asyncio.open_connection(HOST, port)
+            _, data = await _kirim(reader, writer, 'GET', '/health')
+            writer.close()
+            return json.loads(data)
+        except OSError:
+            await asyncio.sleep(0.5)
+    raise RuntimeError('Server tidak merespons.')
+
+
+def jalankan_bench(daftar_komponen, cache):
+    env = dict(os.environ, API_CACHE='1' if cache else '0')
+    proses = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api_server.py'),
+         '--port', str(PORT_BENCH)],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(_tunggu_server(PORT_BENCH))
+        rng = random.Random(0)
+        daftar_batch = [
+            json.dumps({'compname': rng.sample(daftar_komponen, min(UKURAN_BATCH, len(daftar_komponen)))}).encode()
+            for _ in range(JUMLAH_BATCH)
+        ]
+
+        skenario = {
+            'GET /mtbf': lambda: ('GET', '/mtbf?compname=' + quote(rng.choice(daftar_komponen)), b''),
+            'GET /forecast': lambda: ('GET', '/forecast?compname=' + quote(rng.choice(daftar_komponen)), b''),
+            'GET /parts': lambda: ('GET', '/parts?compname=' + quote(rng.choice(daftar_komponen)), b''),
+            f'POST /batch/mtbf x{UKURAN_BATCH}': lambda: ('POST', '/batch/mtbf', rng.choice(daftar_batch)),
+        }
+        for nama, buat in skenario.items():
+            rps, p50, p99 = asyncio.run(_skenario(PORT_BENCH, buat))
+            print(f"{'aktif' if cache else 'nonaktif':<10}{nama:<26}{rps:>12,.0f}{p50:>10.2f}{p99:>10.2f}")
+    finally:
+        proses.terminate()
+        proses.wait()
+
+
+if __name__ == '__main__':
+    from api_server import ApiIndex
+
+    daftar_komponen = sorted(k for k in ApiIndex().komponen if isinstance(k, str))
+    print(f"\n--- Load Test API ({KONEKSI} koneksi, {DURASI} detik per skenario, {len(daftar_komponen):,} komponen) ---")
+    print(f"{'CACHE':<10}{'SKENARIO':<26}{'REQ/DETIK':>12}{'P50 ms':>10}{'P99 ms':>10}")
+    for cache in (True, False):
+        jalankan_bench(daftar_komponen, cache)
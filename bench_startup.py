@@ -0,0 +1,137 @@
+import ast
+import os
+import subprocess
+import sys
+import time
+
+# ==========================================
+# BENCHMARK COLD START (python -X importtime)
+# ==========================================
+# Mengukur biaya import setiap entry point sebelum mulai bekerja. Semua import di
+# level modul (termasuk di dalam if/try/with) dijalankan di proses Python baru dengan
+# -X importtime. Tidak dihitung: import di dalam fungsi/kelas (baru jalan saat
+# fiturnya dipakai). Blok `if TOGGLE:` (konstanta konfigurasi seperti TAMPILKAN_GRAFIK,
+# USE_STORE) mengikuti nilai toggle pada setiap konfigurasi di KONFIGURASI:
+#   DEFAULT        -> nilai bawaan (grafik ditampilkan), yang dialami pengguna biasa
+#   MAINT_GRAFIK=0 -> run batch tanpa grafik
+# Hasil: waktu wall per konfigurasi, total import dan paket terberat (DEFAULT).
+#   python bench_startup.py [script.py ...]
+ENTRY_POINT = [
+    'maintenance_job.py', 'maintenance_job_v2.py', 'maintenance_job_v3.py',
+    'maintenance_app.py', 'maintenance_app_v4.py', 'inventory_app.py', 'inventory_app_v2.py',
+    'api_server.py', 'sarimax_order.py', 'backtest_engine.py', 'ingest_daemon.py',
+]
+KONFIGURASI = {'DEFAULT': {}, 'MAINT_GRAFIK=0': {'MAINT_GRAFIK': '0'}}
+ULANG = 3            # Diambil yang tercepat (setelah satu kali pemanasan .pyc)
+TOP_PAKET = 3
+
+# ==========================================
+# 1. IMPORT LEVEL MODUL
+# ==========================================
+def nilai_toggle(tree, env):
+    """
+    {NAMA: bool} untuk konstanta huruf besar level modul yang bisa dihitung dari
+    environment `env` (misal os.environ.get('MAINT_GRAFIK', '1') != '0', atau True/False).
+    """
+    namespace = {'os': type('os', (), {'environ': env})}
+    hasil = {}
+    for node in tree.body:
+        if not (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name) and node.targets[0].id.isupper()):
+            continue
+        try:
+            nilai = eval(compile(ast.Expression(node.value), '<toggle>', 'eval'), dict(namespace))
+        except Exception:
+            continue
+        if isinstance(nilai, bool):
+            hasil[node.targets[0].id] = nilai
+    return hasil
+
+
+def _kumpulkan_import(node, hasil, toggle):
+    for anak in ast.iter_child_nodes(node):
+        if isinstance(anak, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            continue
+        if isinstance(anak, ast.If) and isinstance(anak.test, ast.Name) and anak.test.id in toggle:
+            # Hanya cabang yang berjalan pada konfigurasi ini
+            for cabang in (anak.body if toggle[anak.test.id] else anak.orelse):
+                _kumpulkan_import(ast.Module(body=[cabang], type_ignores=[]), hasil, toggle)
+            continue
+        if isinstance(anak, (ast.Import, ast.ImportFrom)):
+            hasil.append(anak)
+        else:
+            _kumpulkan_import(anak, hasil, toggle)
+    return hasil
+
+
+def kode_import(path, env=None):
+    """
+    Kode Python berisi import level modul dari script (masing-masing aman dari ImportError),
+    dengan toggle konfigurasi dihitung dari `env` (None = os.environ).
+    """
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    toggle = nilai_toggle(tree, os.environ if env is None else env)
+    baris = []
+    for node in _kumpulkan_import(tree, [], toggle):
+        baris.append(f"try:\n    {ast.unparse(node)}\nexcept ImportError:\n    pass")
+    return '\n'.join(baris)
+
+# ==========================================
+# 2. JALANKAN DENGAN -X importtime
+# ==========================================
+def ukur(kode, folder):
+    """(wall detik, total import detik, {paket level atas: detik kumulatif})."""
+    t0 = time.perf_counter()
+    proses = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', kode],
+        cwd=folder, capture_output=True, text=True,
+        env=dict(os.environ, MPLBACKEND='Agg'),
+    )
+    wall = time.perf_counter() - t0
+
+    total, paket = 0, {}
+    for baris in proses.stderr.splitlines():
+        if not baris.startswith('import time:') or 'self [us]' in baris:
+            continue
+        self_us, kumulatif_us, nama = baris[len('import time:'):].split('|')
+        total += int(self_us)
+        # Nama tanpa indentasi = import level atas (kumulatif sudah termasuk anaknya)
+        if not nama.startswith('  '):
+            nama = nama.strip().split('.')[0]
+            paket[nama] = paket.get(nama, 0) + int(kumulatif_us) / 1e6
+    return wall, total / 1e6, paket
+
+
+def _terbaik(kode, folder):
+    ukur(kode, folder)    # Pemanasan: .pyc dikompilasi, cache disk OS terisi
+    return min((ukur(kode, folder) for _ in range(ULANG)), key=lambda h: h[0])
+
+
+def main(scripts):
+    folder = os.path.dirname(os.path.abspath(__file__))
+    scripts = scripts or [s for s in ENTRY_POINT if os.path.exists(os.path.join(folder, s))]
+    # Variabel toggle yang diatur oleh konfigurasi dilepas dari environment saat ini
+    dasar = {k: v for k, v in os.environ.items()
+             if k not in {nama for env in KONFIGURASI.values() for nama in env}}
+
+    print(f"\n--- Benchmark Cold Start (import level modul, terbaik dari {ULANG}x) ---")
+    judul = ''.join(f"{'WALL ' + nama + ' (s)':>26}" for nama in KONFIGURASI)
+    print(f"{'SCRIPT':<26}{judul}{'IMPORT (s)':>12}   PAKET TERBERAT (DEFAULT)")
+    for script in scripts:
+        hasil, per_kode = [], {}
+        for env in KONFIGURASI.values():
+            kode = kode_import(os.path.join(folder, script), dict(dasar, **env))
+            # Script tanpa toggle: kode sama, cukup diukur sekali
+            if kode not in per_kode:
+                per_kode[kode] = _terbaik(kode, folder)
+            hasil.append(per_kode[kode])
+        _, total, paket = hasil[0]
+        terberat = sorted(paket.items(), key=lambda p: -p[1])[:TOP_PAKET]
+        ringkas = ', '.join(f"{nama} {detik:.2f}" for nama, detik in terberat)
+        kolom = ''.join(f"{wall:>26.2f}" for wall, _, _ in hasil)
+        print(f"{script:<26}{kolom}{total:>12.2f}   {ringkas}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
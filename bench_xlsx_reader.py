@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import time
+
+# ==========================================
+# BENCHMARK PEMBACA JOB REPORT
+# ==========================================
+# Membandingkan pd.read_excel (loader lama) dengan baca_xlsx_kolom (streaming,
+# hanya kolom yang dipakai). Setiap loader dijalankan di proses terpisah agar
+# peak RSS (ru_maxrss) tidak saling tercampur.
+#   python bench_xlsx_reader.py [file.xlsx ...]
+LOADER = ['read_excel', 'streaming']
+
+
+def _jalankan(loader, paths):
+    """Dipanggil di proses anak: baca semua file, cetak waktu & peak RSS."""
+    import resource
+    import pandas as pd
+    from xlsx_reader import baca_xlsx_kolom
+
+    t0 = time.perf_counter()
+    baris = 0
+    for p in paths:
+        df = pd.read_excel(p) if loader == 'read_excel' else baca_xlsx_kolom(p)
+        baris += len(df)
+    detik = time.perf_counter() - t0
+    # Linux: ru_maxrss dalam KB
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{detik:.3f} {rss_mb:.1f} {baris}")
+
+
+def main(paths):
+    from maintenance_data import FILE_MAINT
+
+    paths = paths or [p for p in FILE_MAINT.values() if os.path.exists(p)]
+    if not paths:
+        print("Warning: tidak ada file Job Report untuk diuji.")
+        return
+
+    print("\n--- Benchmark Pembaca Job Report ---")
+    print(f"File: {', '.join(paths)}")
+    print(f"{'LOADER':<12}{'WAKTU (s)':>12}{'PEAK RSS (MB)':>16}{'BARIS':>10}")
+    for loader in LOADER:
+        out = subprocess.run(
+            [sys.executable, __file__, '--loader', loader, *paths],
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        detik, rss, baris = out[-3:]
+        print(f"{loader:<12}{float(detik):>12.2f}{float(rss):>16.1f}{int(baris):>10,}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ['--loader']:
+        _jalankan(args[1], args[2:])
+    else:
+        main(args)
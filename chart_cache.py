@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# ==========================================
+# KONFIGURASI CACHE GRAFIK
+# ==========================================
+# Setiap rerun dashboard membangun ulang semua grafik (px.bar, heatmap seaborn, dll).
+# Grafik yang input-nya tidak berubah cukup diambil dari cache:
+#   kunci = (ID grafik, fingerprint filter, versi data)
+# Plotly disimpan sebagai JSON, Matplotlib sebagai PNG. Ukuran total dibatasi;
+# entri yang paling lama tidak dipakai dibuang lebih dulu (LRU).
+MAX_BYTES = 64 * 1024 * 1024
+MAX_ENTRIES = 256
+
+
+def versi_file(*paths):
+    """Versi data dari waktu modifikasi file sumber (0 jika file belum ada)."""
+    return tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else 0 for p in paths)
+
+
+class ChartCache:
+    def __init__(self, max_bytes=MAX_BYTES, max_entries=MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+    def _put(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._total -= len(self._items.pop(key))
+            self._items[key] = value
+            self._total += size
+            # Buang yang paling lama tidak dipakai sampai di bawah batas
+            while self._total > self.max_bytes or len(self._items) > self.max_entries:
+                _, lama = self._items.popitem(last=False)
+                self._total -= len(lama)
+
+    def plotly(self, chart_id, fingerprint, versi, build):
+        """
+        Mengembalikan figure Plotly (dict) dari cache, atau memanggil build()
+        yang harus mengembalikan go.Figure. Hasil bisa langsung ke st.plotly_chart.
+        """
+        key = (chart_id, fingerprint, versi)
+        data = self._get(key)
+        if data is None:
+            data = build().to_json().encode('utf-8')
+            self._put(key, data)
+        return json.loads(data)
+
+    def matplotlib(self, chart_id, fingerprint, versi, build, dpi=100):
+        """
+        Mengembalikan PNG (bytes) dari cache, atau memanggil build() yang harus
+        mengembalikan Figure Matplotlib. Hasil ditampilkan dengan st.image.
+        """
+        key = (chart_id, fingerprint, versi)
+        png = self._get(key)
+        if png is None:
+            import matplotlib.pyplot as plt
+
+            fig = build()
+            buf = io.BytesIO()
+            fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight')
+            plt.close(fig)
+            png = buf.getvalue()
+            self._put(key, png)
+        return png
+
+    def info(self):
+        return {'entri': len(self._items), 'bytes': self._total, 'hit': self.hits, 'miss': self.misses}
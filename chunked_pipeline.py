@@ -0,0 +1,319 @@
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from date_parser import parse_tanggal
+from interval_kernel import KEYS, statistik_interval
+from maintenance_data import FILE_MAINT, ringkas_mtbf
+from reliability import KOLOM_RH, hitung_interval_rh, laporan_interval_rh
+from xlsx_reader import CHUNK_ROWS, iter_xlsx_kolom
+
+# ==========================================
+# KONFIGURASI MODE OUT-OF-CORE
+# ==========================================
+# Untuk histori multi-tahun yang lebih besar dari RAM: Job Report dibaca per blok
+# CHUNK_ROWS baris (xlsx_reader streaming) dan tidak pernah digabung menjadi satu
+# DataFrame. Setiap blok langsung diringkas menjadi agregat parsial yang bisa
+# dijumlahkan (pivot tahunan, matriks bulanan untuk tren, total per bulan, delay per kapal).
+# MTBF butuh tanggal berurutan per (Kapal, Komponen), jadi dipakai external sort
+# berbasis distribusi: setiap baris ditulis ke salah satu N_BUCKET file Arrow sementara
+# menurut hash (Kapal, Komponen), lalu setiap bucket diurutkan & dihitung sendiri.
+# Bucket yang lebih besar dari BARIS_PER_BUCKET dipecah lagi (dibaca per batch, hash
+# lain) sampai cukup kecil, sehingga memori tidak ikut tumbuh bersama jumlah data:
+# memori puncak ~ satu blok + satu bucket (<= BARIS_PER_BUCKET baris) + agregat.
+# Pengecualian: satu (Kapal, Komponen) tidak bisa dipecah, jadi tetap satu bucket.
+# Kunci VESSELID & COMPNAME diperlakukan sebagai teks agar blok yang tipenya ditebak
+# berbeda tetap masuk ke grup (dan bucket) yang sama.
+N_BUCKET = 32
+BARIS_PER_BUCKET = 500_000 # Batas baris satu bucket yang dibaca sekaligus ke memori
+MAKS_LEVEL_PECAH = 4       # Batas pemecahan ulang (kunci tunggal yang sangat besar)
+BATAS_PARSIAL = 200_000    # Agregat parsial dipadatkan (groupby sum) setelah sebanyak ini baris
+
+KOLOM_OOC = ['VESSELID', 'COMPNAME', 'FREQ_TYPE', 'JOBREPORT_DATE', 'JOB_TIMESTAMP', KOLOM_RH]
+
+# Kategori keterlambatan lapor (JOB_TIMESTAMP - JOBREPORT_DATE), sama dengan dashboard v4
+KATEGORI_DELAY = [(1, 'TEPAT_WAKTU'), (7, 'TELAT_RINGAN'), (30, 'TELAT_SEDANG'), (np.inf, 'TELAT_BERAT')]
+
+_SKEMA_BUCKET = pa.schema([
+    ('VESSELID', pa.string()), ('COMPNAME', pa.string()),
+    ('REPORT_DATE', pa.timestamp('ns')), (KOLOM_RH, pa.float64()),
+])
+
+# ==========================================
+# 1. SUMBER BLOK
+# ==========================================
+def iter_job_reports(files=None, chunk_rows=CHUNK_ROWS, columns=KOLOM_OOC):
+    """Generator blok DataFrame dari semua file Job Report (dengan SOURCE_YEAR)."""
+    files = files or FILE_MAINT
+    for year, path in files.items():
+        for chunk in iter_xlsx_kolom(path, columns, chunk_rows=chunk_rows):
+            chunk['SOURCE_YEAR'] = year
+            yield chunk
+
+
+def _sebagai_teks(s):
+    """Kunci sebagai teks (nilai kosong tetap kosong)."""
+    return s.map(str, na_action='ignore').astype(object)
+
+# ==========================================
+# 2. AGREGAT PARSIAL
+# ==========================================
+class AgregatParsial:
+    """Kumpulan hasil groupby per blok yang dijumlahkan (dipadatkan) secara berkala."""
+
+    def __init__(self, batas=BATAS_PARSIAL):
+        self.batas = batas
+        self.bagian = []
+        self.n_baris = 0
+
+    def tambah(self, parsial):
+        self.bagian.append(parsial)
+        self.n_baris += len(parsial)
+        if self.n_baris > self.batas:
+            self._padatkan()
+
+    def _padatkan(self):
+        if len(self.bagian) > 1:
+            gabung = pd.concat(self.bagian)
+            level = list(range(gabung.index.nlevels))
+            self.bagian = [gabung.groupby(level=level).sum()]
+        self.n_baris = sum(len(b) for b in self.bagian)
+
+    def hasil(self):
+        if not self.bagian:
+            return None
+        self._padatkan()
+        return self.bagian[0].sort_index()
+
+
+def kategori_delay(delay):
+    """Array nama kategori keterlambatan lapor untuk setiap nilai delay (hari)."""
+    batas = np.array([b for b, _ in KATEGORI_DELAY])
+    nama = np.array([n for _, n in KATEGORI_DELAY])
+    return nama[np.searchsorted(batas, delay, side='left')]
+
+# ==========================================
+# 3. EXTERNAL SORT (BUCKET HASH KAPAL, KOMPONEN)
+# ==========================================
+class BucketInterval:
+    """
+    Menulis baris (Kapal, Komponen, REPORT_DATE, RH) ke N_BUCKET file Arrow stream
+    sementara. Satu (Kapal, Komponen) selalu berada di bucket yang sama, sehingga
+    setiap bucket bisa diurutkan & dihitung intervalnya tanpa bucket lain.
+    level > 0: bucket hasil pemecahan ulang (hash dengan kunci lain).
+    """
+
+    def __init__(self, folder, n_bucket=N_BUCKET, awalan='bucket', level=0):
+        self.folder = folder
+        self.n_bucket = n_bucket
+        self.level = level
+        self.paths = [os.path.join(folder, f'{awalan}_{i:03d}.arrow') for i in range(n_bucket)]
+        self.writers = [None] * n_bucket
+        self.n_baris = [0] * n_bucket
+
+    def tulis(self, df):
+        # hash_key (16 karakter) berbeda per level agar pemecahan ulang benar-benar membagi bucket
+        kunci_hash = f'bucketlevel{self.level:05d}'
+        bucket = pd.util.hash_pandas_object(df[KEYS], index=False, hash_key=kunci_hash).to_numpy() % self.n_bucket
+        urutan = np.argsort(bucket, kind='stable')
+        batas = np.searchsorted(bucket[urutan], np.arange(self.n_bucket + 1))
+        table = pa.Table.from_pandas(df.iloc[urutan], schema=_SKEMA_BUCKET, preserve_index=False)
+        for i in range(self.n_bucket):
+            if batas[i + 1] == batas[i]:
+                continue
+            if self.writers[i] is None:
+                self.writers[i] = pa.ipc.new_stream(self.paths[i], _SKEMA_BUCKET)
+            self.writers[i].write_table(table.slice(batas[i], batas[i + 1] - batas[i]))
+            self.n_baris[i] += int(batas[i + 1] - batas[i])
+
+    def tutup(self):
+        for writer in self.writers:
+            if writer is not None:
+                writer.close()
+
+    def iter_bucket(self, batas=BARIS_PER_BUCKET):
+        """
+        Generator DataFrame per bucket (satu bucket di memori pada satu waktu). Bucket
+        > batas baris dipecah dulu ke sub-bucket, dibaca per batch (bukan sekaligus).
+        """
+        for path, writer, n in zip(self.paths, self.writers, self.n_baris):
+            if writer is None:
+                continue
+            if n <= batas or self.level >= MAKS_LEVEL_PECAH:
+                with pa.memory_map(path) as sumber:
+                    yield pa.ipc.open_stream(sumber).read_all().to_pandas()
+                continue
+
+            sub = BucketInterval(self.folder, min(N_BUCKET, math.ceil(2 * n / batas)),
+                                 os.path.splitext(os.path.basename(path))[0], self.level + 1)
+            try:
+                with pa.memory_map(path) as sumber:
+                    for batch in pa.ipc.open_stream(sumber):
+                        sub.tulis(batch.to_pandas())
+            finally:
+                sub.tutup()
+            os.remove(path)
+            yield from sub.iter_bucket(batas)
+
+# ==========================================
+# 4. PIPELINE
+# ==========================================
+def jalankan_out_of_core(chunks=None, n_bucket=N_BUCKET, folder_tmp=None, baris_per_bucket=BARIS_PER_BUCKET):
+    """
+    Menghitung ringkasan yang sama dengan mode in-memory tanpa memuat seluruh data.
+    chunks: iterable DataFrame (default: semua file FILE_MAINT per CHUNK_ROWS baris).
+    Hasil dict: pivot_tahunan (COMPNAME x SOURCE_YEAR), bulanan_komponen (COMPNAME,
+    PERIOD, JUMLAH untuk TrendEngine.from_long), tren_bulanan (per YYYYMM), mtbf,
+    mtbf_jam, statistik_interval (per Kapal, Komponen), delay_kapal, jumlah baris,
+    tanggal_akhir (tanggal laporan terakhir).
+    """
+    chunks = iter_job_reports() if chunks is None else chunks
+    pivot, bulanan, total_bulan, delay = AgregatParsial(), AgregatParsial(), AgregatParsial(), AgregatParsial()
+    n_baris = n_selesai = n_gagal = 0
+    tanggal_akhir = None
+
+    with tempfile.TemporaryDirectory(prefix='maint_ooc_', dir=folder_tmp) as folder:
+        bucket = BucketInterval(folder, n_bucket)
+        try:
+            for chunk in chunks:
+                n_baris += len(chunk)
+                report = parse_tanggal(chunk['JOBREPORT_DATE'], laporan=False)
+                n_gagal += int((report.isna() & chunk['JOBREPORT_DATE'].notna()).sum())
+                selesai = report.notna().to_numpy()
+                if not selesai.any():
+                    continue
+
+                # Hanya pekerjaan selesai (punya tanggal laporan), seperti clean_job_reports
+                df = pd.DataFrame({
+                    'VESSELID': _sebagai_teks(chunk['VESSELID'][selesai]),
+                    'COMPNAME': _sebagai_teks(chunk['COMPNAME'][selesai]),
+                    'SOURCE_YEAR': chunk['SOURCE_YEAR'][selesai],
+                    'REPORT_DATE': report[selesai],
+                    KOLOM_RH: pd.to_numeric(chunk[KOLOM_RH][selesai], errors='coerce'),
+                })
+                n_selesai += len(df)
+                akhir = df['REPORT_DATE'].max()
+                tanggal_akhir = akhir if tanggal_akhir is None else max(tanggal_akhir, akhir)
+
+                period = (df['REPORT_DATE'].dt.year * 12 + df['REPORT_DATE'].dt.month - 1).rename('PERIOD')
+                pivot.tambah(df.groupby(['COMPNAME', 'SOURCE_YEAR']).size())
+                bulanan.tambah(df.groupby(['COMPNAME', period]).size())
+                total_bulan.tambah(period.value_counts())
+
+                # Delay lapor: negatif (salah input) -> 0, tanpa timestamp -> 0
+                timestamp = parse_tanggal(chunk['JOB_TIMESTAMP'][selesai], laporan=False)
+                hari = (timestamp - df['REPORT_DATE']).dt.days.clip(lower=0).fillna(0).to_numpy()
+                kategori = kategori_delay(hari)
+                parsial = pd.DataFrame({'JUMLAH_JOB': 1, 'TOTAL_DELAY_HARI': hari}, index=df.index)
+                for _, nama in KATEGORI_DELAY:
+                    parsial[nama] = (kategori == nama).astype(np.int64)
+                delay.tambah(parsial.groupby(df['VESSELID']).sum())
+
+                bucket.tulis(df.dropna(subset=KEYS))
+        finally:
+            bucket.tutup()
+
+        if n_gagal:
+            print(f"Warning: {n_gagal:,} nilai JOBREPORT_DATE tidak bisa dibaca sebagai tanggal (dijadikan kosong).")
+
+        # Bucket demi bucket: interval hari (kernel MTBF) & interval Running Hours
+        frames_stat, frames_jam = [], []
+        n_reset, rh_bulanan = 0, False
+        for df_bucket in bucket.iter_bucket(baris_per_bucket):
+            frames_stat.append(statistik_interval(df_bucket, tanggal_akhir=tanggal_akhir))
+            interval = hitung_interval_rh(df_bucket, laporan=False)
+            n_reset += interval.attrs['N_RESET']
+            rh_bulanan |= interval.attrs['RH_BULANAN']
+            frames_jam.append(interval.groupby('COMPNAME')['INTERVAL_JAM'].agg(['sum', 'count']))
+        # Warning dicetak sekali untuk semua bucket
+        laporan_interval_rh(n_reset, rh_bulanan)
+
+    hasil = _susun_hasil(pivot, bulanan, total_bulan, delay, frames_stat, frames_jam, n_baris, n_selesai)
+    hasil['tanggal_akhir'] = tanggal_akhir
+    return hasil
+
+
+def _susun_hasil(pivot, bulanan, total_bulan, delay, frames_stat, frames_jam, n_baris, n_selesai):
+    """Agregat parsial -> tabel akhir dengan bentuk yang sama seperti mode in-memory."""
+    pivot = pivot.hasil()
+    pivot_tahunan = (pivot if pivot is not None else pd.Series(dtype='int64', index=pd.MultiIndex.from_arrays(
+        [[], []], names=['COMPNAME', 'SOURCE_YEAR']))).unstack(fill_value=0)
+
+    bulanan = bulanan.hasil()
+    bulanan = (bulanan if bulanan is not None else pd.Series(dtype='int64')).rename('JUMLAH').reset_index()
+
+    total_bulan = total_bulan.hasil()
+    if total_bulan is None:
+        total_bulan = pd.Series(dtype='int64')
+    tren_bulanan = pd.Series(
+        total_bulan.to_numpy(),
+        index=pd.PeriodIndex([pd.Period(year=p // 12, month=p % 12 + 1, freq='M') for p in total_bulan.index], name='YYYYMM'),
+    )
+
+    stat = pd.concat(frames_stat, ignore_index=True) if frames_stat else statistik_interval(
+        pd.DataFrame(columns=KEYS + ['REPORT_DATE']))
+    stat = stat.sort_values(KEYS, ignore_index=True)
+
+    jam = pd.concat(frames_jam).groupby(level=0).sum() if frames_jam else pd.DataFrame(columns=['sum', 'count'])
+    jam = jam[jam['count'] > 0]
+    mtbf_jam = pd.DataFrame({
+        'COMPNAME': jam.index,
+        'MTBF_JAM': (jam['sum'] / jam['count']).round(1).to_numpy(),
+        'TOTAL_KEJADIAN_JAM': jam['count'].astype('int64').to_numpy(),
+    })
+
+    delay = delay.hasil()
+    if delay is not None:
+        delay = delay.rename_axis('VESSELID').reset_index()
+        delay['RATA2_DELAY_HARI'] = (delay['TOTAL_DELAY_HARI'] / delay['JUMLAH_JOB']).round(2)
+        delay['PERSEN_TEPAT_WAKTU'] = (100 * delay['TEPAT_WAKTU'] / delay['JUMLAH_JOB']).round(1)
+
+    return {
+        'pivot_tahunan': pivot_tahunan,
+        'bulanan_komponen': bulanan,
+        'tren_bulanan': tren_bulanan,
+        'mtbf': ringkas_mtbf(stat),
+        'mtbf_jam': mtbf_jam,
+        'statistik_interval': stat,
+        'delay_kapal': delay,
+        'n_baris': n_baris,
+        'n_selesai': n_selesai,
+    }
+
+# ==========================================
+# 5. EKSEKUSI (RINGKASAN & MEMORI PUNCAK)
+# ==========================================
+def memori_puncak_mb():
+    """Resident set size puncak proses ini (MB); None jika tidak tersedia (Windows)."""
+    if sys.platform == 'win32':
+        return None
+    import resource
+    puncak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return puncak / 1e6 if sys.platform == 'darwin' else puncak / 1e3
+
+
+if __name__ == '__main__':
+    print(f"\n--- [1] MODE OUT-OF-CORE (blok {CHUNK_ROWS:,} baris, {N_BUCKET} bucket) ---")
+    t0 = time.perf_counter()
+    try:
+        hasil = jalankan_out_of_core()
+    except FileNotFoundError:
+        print("Error: File maintenance tidak ditemukan. Cek path file dan nama folder.")
+        exit()
+    puncak = memori_puncak_mb()
+    print(f"Selesai dalam {time.perf_counter() - t0:.1f} detik. "
+          f"Baris: {hasil['n_baris']:,} | Selesai: {hasil['n_selesai']:,} | "
+          f"Memori puncak: {'-' if puncak is None else f'{puncak:,.0f} MB'}")
+
+    print("\n--- [2] RINGKASAN ---")
+    print(f"Komponen: {len(hasil['pivot_tahunan']):,} | Tahun: {list(hasil['pivot_tahunan'].columns)}")
+    print(f"Bulan: {len(hasil['tren_bulanan']):,} | Pasangan (Kapal, Komponen): {len(hasil['statistik_interval']):,}")
+    print(hasil['mtbf'].sort_values('TOTAL_KEJADIAN', ascending=False).head(5))
+    if hasil['delay_kapal'] is not None:
+        print(hasil['delay_kapal'].sort_values('RATA2_DELAY_HARI', ascending=False).head(5))
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# COUNT MATRIX BUILDER
+# ==========================================
+# Pengganti pivot_table(aggfunc='size') untuk heatmap & pivot tahunan.
+# Setiap dimensi (VESSELID, COMPNAME, year, month, FREQ_TYPE, MAKERS_NAME, ...)
+# di-encode sekali menjadi kode integer, lalu matriks hitungan dibuat dengan
+# np.bincount pada kode gabungan baris*kolom. Kode disimpan di cache sehingga
+# beberapa grafik dari data yang sama tidak meng-encode ulang.
+
+# Dimensi turunan dari kolom tanggal
+DERIVED_DIMS = {
+    'year': lambda dates: dates.dt.year,
+    'month': lambda dates: dates.dt.month,
+    # Nomor bulan berurutan (tahun*12 + bulan-1), dipakai untuk matriks bulanan
+    'period': lambda dates: dates.dt.year * 12 + dates.dt.month - 1,
+}
+
+
+class CountMatrixBuilder:
+    def __init__(self, df, date_col='REPORT_DATE'):
+        self.df = df
+        self.date_col = date_col
+        self._codes = {}
+
+    def codes(self, dim):
+        """
+        Mengembalikan (kode, label) untuk satu dimensi. Kode -1 = nilai kosong.
+        Label diurutkan, sama seperti index hasil pivot_table.
+        dim berupa tuple, misal ('VESSELID', 'COMPNAME'), menghasilkan kode
+        untuk setiap pasangan yang muncul di data (label = MultiIndex).
+        """
+        if dim in self._codes:
+            return self._codes[dim]
+
+        if isinstance(dim, tuple):
+            self._codes[dim] = self._pair_codes(dim)
+            return self._codes[dim]
+
+        if dim in DERIVED_DIMS:
+            values = DERIVED_DIMS[dim](self.df[self.date_col])
+        else:
+            values = self.df[dim]
+        codes, labels = pd.factorize(values, sort=True)
+        if dim in DERIVED_DIMS:
+            labels = labels.astype(int)
+        self._codes[dim] = (codes, labels)
+        return self._codes[dim]
+
+    def _pair_codes(self, dims):
+        parts = [self.codes(d) for d in dims]
+        valid = np.logical_and.reduce([codes >= 0 for codes, _ in parts])
+
+        combined = np.zeros(len(self.df), dtype=np.int64)
+        for codes, labels in parts:
+            combined = combined * len(labels) + codes
+
+        uniq, inverse = np.unique(combined[valid], return_inverse=True)
+        pair_codes = np.full(len(self.df), -1, dtype=np.int64)
+        pair_codes[valid] = inverse
+
+        # Uraikan kembali kode gabungan menjadi label per dimensi
+        arrays = []
+        rest = uniq
+        for codes, labels in reversed(parts):
+            rest, idx = np.divmod(rest, len(labels))
+            arrays.insert(0, np.asarray(labels)[idx])
+        return pair_codes, pd.MultiIndex.from_arrays(arrays, names=list(dims))
+
+    def monthly(self, dim):
+        """
+        Matriks bulanan dim x bulan dengan kolom berurutan (bulan tanpa data diisi nol).
+        Hasil: (matriks, periode_pertama, label) - periode = tahun*12 + bulan-1.
+        """
+        mat, labels, periods = self.matrix(dim, 'period')
+        return lengkapi_periode(mat, np.asarray(periods)) + (labels,)
+
+    def labels(self, dim):
+        """Daftar nilai unik sebuah dimensi (misal semua tahun yang ada di data)."""
+        return self.codes(dim)[1].tolist()
+
+    def totals(self, dim, mask=None):
+        """Jumlah baris per nilai dimensi (pengganti value_counts tanpa sorting)."""
+        codes, labels = self.codes(dim)
+        valid = codes >= 0 if mask is None else (codes >= 0) & mask
+        return pd.Series(np.bincount(codes[valid], minlength=len(labels)), index=labels)
+
+    def matrix(self, row, col, mask=None, sparse=False):
+        """
+        Matriks hitungan row x col. mask (array boolean) membatasi baris data yang
+        dihitung. sparse=True mengembalikan scipy.sparse.csr_matrix.
+        Hasil: (matriks, label_baris, label_kolom).
+        """
+        row_codes, row_labels = self.codes(row)
+        col_codes, col_labels = self.codes(col)
+        n_row, n_col = len(row_labels), len(col_labels)
+
+        valid = (row_codes >= 0) & (col_codes >= 0)
+        if mask is not None:
+            valid &= np.asarray(mask)
+        r, c = row_codes[valid], col_codes[valid]
+
+        if sparse:
+            from scipy.sparse import coo_matrix
+            mat = coo_matrix((np.ones(len(r), dtype=np.int64), (r, c)), shape=(n_row, n_col)).tocsr()
+        else:
+            flat = r.astype(np.int64) * n_col + c
+            mat = np.bincount(flat, minlength=n_row * n_col).reshape(n_row, n_col)
+
+        return mat, row_labels, col_labels
+
+    def pivot(self, row, col, mask=None, rows=None):
+        """
+        Hasil setara pivot_table(index=row, columns=col, aggfunc='size', fill_value=0).
+        rows (opsional) = daftar label baris yang ingin diambil saja.
+        """
+        mat, row_labels, col_labels = self.matrix(row, col, mask=mask)
+        pivot = pd.DataFrame(mat, index=pd.Index(row_labels, name=row), columns=pd.Index(col_labels, name=col))
+        if rows is not None:
+            pivot = pivot.loc[pivot.index.isin(rows)]
+
+        # Buang baris/kolom yang kosong seluruhnya (pivot_table juga tidak menampilkannya)
+        pivot = pivot.loc[pivot.sum(axis=1) > 0, pivot.sum(axis=0) > 0]
+        return pivot
+
+
+# ==========================================
+# HELPER MATRIKS BULANAN
+# ==========================================
+def lengkapi_periode(mat, periods):
+    """Menyisipkan kolom nol untuk bulan yang tidak muncul. Hasil: (matriks, periode_pertama)."""
+    first = int(periods.min())
+    counts = np.zeros((mat.shape[0], int(periods.max()) - first + 1), dtype=np.int64)
+    counts[:, periods - first] = mat
+    return counts, first
+
+
+def matriks_bulanan_dari_long(df_long, dims, period_col='PERIOD', count_col='JUMLAH'):
+    """
+    Matriks bulanan dari tabel panjang (dims..., periode, jumlah), misal hasil query store.
+    Hasil sama dengan CountMatrixBuilder.monthly(): (matriks, periode_pertama, label).
+    """
+    wide = df_long.pivot_table(index=dims, columns=period_col, values=count_col, aggfunc='sum', fill_value=0)
+    return lengkapi_periode(wide.to_numpy(dtype=np.int64), np.asarray(wide.columns)) + (wide.index,)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI PARSING TANGGAL
+# ==========================================
+# pd.to_datetime(..., dayfirst=True) tanpa format harus menebak format untuk
+# ratusan ribu teks, padahal tanggal yang sama muncul berulang kali.
+# Di sini setiap nilai unik hanya diparse sekali: format eksplisit dicoba dulu,
+# sisanya baru ditebak (dayfirst). Hasil teks disimpan di memo agar rerun
+# dashboard tidak mengulang parsing.
+FORMAT_TANGGAL = [
+    '%d/%m/%Y',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y %H:%M:%S',
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%d-%m-%Y',
+    '%d-%b-%Y',
+]
+
+MAKS_MEMO_TANGGAL = 200_000   # Batas memo teks tanggal (proses dashboard/API berjalan lama)
+
+_MEMO = {}    # {tuple(formats): {teks: Timestamp}}
+
+# ==========================================
+# 1. PARSING NILAI UNIK
+# ==========================================
+def _parse_teks(teks, formats):
+    """Parse array teks unik: format eksplisit berurutan, lalu tebakan untuk sisanya."""
+    hasil = pd.Series(pd.NaT, index=teks, dtype='datetime64[ns]')
+    sisa = pd.Index(teks)
+    for fmt in formats:
+        if sisa.empty:
+            break
+        parsed = pd.to_datetime(sisa, format=fmt, errors='coerce')
+        ok = ~parsed.isna()
+        hasil[sisa[ok]] = parsed[ok]
+        sisa = sisa[~ok]
+
+    if not sisa.empty:
+        hasil[sisa] = pd.to_datetime(sisa, format='mixed', dayfirst=True, errors='coerce')
+    return hasil
+
+
+def parse_tanggal(values, formats=FORMAT_TANGGAL, laporan=True):
+    """
+    Pengganti pd.to_datetime(values, dayfirst=True, errors='coerce') untuk kolom
+    tanggal Job Report. Nilai yang tidak bisa dibaca menjadi NaT dan jumlahnya
+    dicetak (laporan=True). Kolom yang sudah bertipe datetime dikembalikan apa adanya.
+    """
+    s = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+
+    codes, unik = pd.factorize(s)
+    if len(unik) == 0:
+        return pd.Series(pd.NaT, index=s.index, name=s.name, dtype='datetime64[ns]')
+    unik = pd.Series(unik, dtype=object)
+    hasil = np.full(len(unik), np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    # Teks -> memo + format eksplisit; nilai lain (datetime dari Excel, dll) langsung
+    is_teks = unik.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    teks = unik[is_teks].str.strip()
+    memo = _MEMO.setdefault(tuple(formats), {})
+    baru = pd.unique(teks[~teks.isin(memo.keys())])
+    if len(baru):
+        # Memo dikosongkan jika akan melebihi batas (teks lama yang masih dipakai diparse ulang)
+        if len(memo) + len(baru) > MAKS_MEMO_TANGGAL:
+            memo.clear()
+            baru = pd.unique(teks)
+        memo.update(_parse_teks(baru, formats).to_dict())
+    hasil[is_teks] = teks.map(memo).to_numpy(dtype='datetime64[ns]')
+
+    if (~is_teks).any():
+        lain = pd.to_datetime(unik[~is_teks], dayfirst=True, errors='coerce')
+        hasil[~is_teks] = lain.to_numpy(dtype='datetime64[ns]')
+
+    tanggal = pd.Series(np.where(codes >= 0, hasil[codes], np.datetime64('NaT')), index=s.index, name=s.name)
+
+    if laporan:
+        gagal = int(((codes >= 0) & tanggal.isna().to_numpy()).sum())
+        if gagal:
+            nama = s.name or 'tanggal'
+            print(f"Warning: {gagal:,} nilai {nama} tidak bisa dibaca sebagai tanggal (dijadikan kosong).")
+    return tanggal
@@ -0,0 +1,250 @@
+import numpy as np
+import pandas as pd
+
+from maintenance_data import FILE_MASTER_BARANG, load_job_reports, clean_job_reports
+from maintenance_store import store_tersedia, connect_store, simpan_tabel
+from reliability import KEYS, data_umur_komponen, fit_weibull
+from inventory_planning import siapkan_mapping, QTY_PER_JOB
+from part_recommender import PartRecommender, baca_mapping_manual
+
+# ==========================================
+# KONFIGURASI SIMULASI MONTE CARLO
+# ==========================================
+# Setiap (Kapal, Komponen) disimulasikan sebagai proses renewal selama HORIZON_HARI
+# ke depan (misal periode docking), dimulai dari tanggal data terakhir.
+# Interval antar pekerjaan diambil dari:
+#   - Weibull per pasangan (jika minimal 3 interval gagal), dengan memperhitungkan
+#     umur komponen saat ini (interval pertama bersyarat "sudah bertahan X hari");
+#   - selain itu bootstrap dari interval historis pasangan tersebut (empiris); interval
+#     pertama = sisa umur dari interval historis yang lebih panjang dari umur saat ini.
+# Semua skenario x pasangan dihitung sebagai array NumPy; loop hanya per urutan kejadian.
+# Setiap blok pasangan langsung dijumlahkan ke kolom komponen (matriks skenario x
+# pasangan penuh tidak pernah dibuat).
+FILE_SIMULASI_KOMPONEN = 'Simulasi_Demand_Komponen.csv'
+FILE_SIMULASI_PART = 'Simulasi_Demand_Sparepart.csv'
+HORIZON_HARI = 90
+N_SKENARIO = 10000
+KUANTIL = [0.5, 0.9, 0.95, 0.99]
+SEED = 42
+CHUNK_PASANGAN = 500     # Jumlah pasangan per blok (membatasi memori skenario x pasangan)
+CHUNK_SKENARIO = 1000    # Jumlah skenario per blok saat agregasi ke komponen / barang
+
+# ==========================================
+# 1. PARAMETER PER (KAPAL, KOMPONEN)
+# ==========================================
+def siapkan_parameter(df_done, metode='auto'):
+    """
+    Menyusun parameter simulasi untuk setiap pasangan (Kapal, Komponen) yang punya
+    minimal satu interval gagal. metode: 'auto' (Weibull jika cukup data), 'empiris', 'weibull'.
+    Hasil: (pasangan, params) dengan params berisi array sejajar per pasangan.
+    """
+    df_umur = data_umur_komponen(df_done)
+    group_codes, pasangan = pd.MultiIndex.from_frame(df_umur[KEYS]).factorize()
+    pasangan = pasangan.set_names(KEYS)
+    n_pasangan = len(pasangan)
+
+    shape, scale, n_gagal, _ = fit_weibull(df_umur['DURASI_HARI'], df_umur['GAGAL'], group_codes, n_pasangan)
+
+    # Umur saat ini = durasi interval tersensor (interval terakhir yang masih berjalan)
+    sensor = df_umur['GAGAL'].to_numpy() == 0
+    umur = np.zeros(n_pasangan)
+    umur[group_codes[sensor]] = df_umur['DURASI_HARI'].to_numpy()[sensor]
+
+    # Interval gagal diurutkan per pasangan (lalu per durasi) -> bootstrap cukup dengan
+    # offset + indeks acak, dan interval yang lebih panjang dari umur = ekor setiap blok
+    gagal = ~sensor
+    durasi_gagal = df_umur['DURASI_HARI'].to_numpy(dtype=float)[gagal]
+    kode_gagal = group_codes[gagal]
+    urut = np.lexsort((durasi_gagal, kode_gagal))
+    interval = durasi_gagal[urut]
+    offset = np.concatenate(([0], np.cumsum(n_gagal)[:-1]))
+
+    # Jumlah interval > umur per pasangan (searchsorted pada kunci kode*M + durasi)
+    m = interval.max() + umur.max() + 1 if len(interval) else 1
+    kunci = kode_gagal[urut] * m + interval
+    batas = np.searchsorted(kunci, np.arange(n_pasangan) * m + umur, side='right')
+    n_lebih = offset + n_gagal - batas
+
+    # Kumulatif durasi untuk memilih interval sebanding panjangnya (length-biased)
+    kumulatif = np.cumsum(interval)
+    kum_awal = np.concatenate(([0.0], kumulatif))[offset]
+    total_durasi = np.bincount(kode_gagal, weights=durasi_gagal, minlength=n_pasangan)
+
+    pakai_weibull = ~np.isnan(shape) if metode != 'empiris' else np.zeros(n_pasangan, dtype=bool)
+    # metode 'weibull' hanya mensimulasikan pasangan yang parameternya bisa diestimasi
+    ada_data = pakai_weibull if metode == 'weibull' else n_gagal > 0
+
+    params = {
+        'shape': shape, 'scale': scale, 'umur': umur,
+        'pakai_weibull': pakai_weibull, 'offset': offset, 'n_interval': n_gagal,
+        'n_lebih': n_lebih, 'kum_awal': kum_awal, 'total_durasi': total_durasi,
+        'interval': interval, 'kumulatif': kumulatif,
+    }
+    pilih = np.flatnonzero(ada_data)
+    global_ = ('interval', 'kumulatif')
+    return pasangan[pilih], {k: (v if k in global_ else v[pilih]) for k, v in params.items()}
+
+# ==========================================
+# 2. SAMPLING INTERVAL (VECTORIZED)
+# ==========================================
+def _ambil_interval(rng, p, idx, umur=None):
+    """
+    Mengambil satu interval untuk setiap (skenario, pasangan) pada array indeks pasangan `idx`.
+    Jika `umur` diberikan, interval dihitung sebagai sisa umur (kejadian pertama).
+    """
+    u = rng.random(idx.shape)
+    t = np.empty(idx.shape)
+
+    wb = p['pakai_weibull'][idx]
+    k, lam = p['shape'][idx[wb]], p['scale'][idx[wb]]
+    if umur is None:
+        t[wb] = lam * (-np.log1p(-u[wb])) ** (1 / k)
+    else:
+        # Weibull bersyarat sudah bertahan `a` hari: T = lam*((a/lam)^k - ln U)^(1/k) - a
+        a = umur[idx[wb]]
+        t[wb] = lam * ((a / lam) ** k - np.log1p(-u[wb])) ** (1 / k) - a
+
+    emp = ~wb
+    ie = idx[emp]
+    offset, n = p['offset'][ie], p['n_interval'][ie]
+    if umur is None:
+        t[emp] = p['interval'][offset + (u[emp] * n).astype(int)]
+        return t
+
+    # Sisa umur bersyarat "sudah bertahan a hari": interval historis > a, dikurangi a
+    n_lebih = p['n_lebih'][ie]
+    ada = n_lebih > 0
+    pos_lebih = offset + n - n_lebih + (u[emp] * n_lebih).astype(int)
+    # Tidak ada interval > a: interval dipilih sebanding panjangnya, posisi seragam di dalamnya
+    target = p['kum_awal'][ie] + u[emp] * p['total_durasi'][ie]
+    pos_bias = np.clip(np.searchsorted(p['kumulatif'], target, side='right'), offset, offset + n - 1)
+    pos = np.where(ada, pos_lebih, pos_bias)
+    t[emp] = np.where(ada, p['interval'][pos] - umur[ie], p['interval'][pos] * rng.random(len(ie)))
+    return t
+
+
+def simulasi_jumlah_job(params, horizon_hari=HORIZON_HARI, n_skenario=N_SKENARIO, seed=SEED, codes=None, n_grup=None):
+    """
+    Jumlah job dalam horizon untuk semua skenario, dijumlahkan per grup: codes[i] = grup
+    pasangan ke-i (misal komponen). codes None = per pasangan.
+    Hasil: array berukuran (n_skenario x n_grup).
+    """
+    rng = np.random.default_rng(seed)
+    n_pasangan = len(params['shape'])
+    if codes is None:
+        codes, n_grup = np.arange(n_pasangan), n_pasangan
+    codes = np.asarray(codes)
+    jumlah = np.zeros((n_skenario, n_grup))
+
+    for start in range(0, n_pasangan, CHUNK_PASANGAN):
+        cols = np.arange(start, min(start + CHUNK_PASANGAN, n_pasangan))
+        idx = np.broadcast_to(cols, (n_skenario, len(cols))).ravel()
+
+        waktu = _ambil_interval(rng, params, idx, umur=params['umur'])
+        count = np.zeros(idx.shape, dtype=np.int32)
+        aktif = np.flatnonzero(waktu <= horizon_hari)
+        # Hanya (skenario, pasangan) yang masih di dalam horizon yang diteruskan
+        while aktif.size:
+            count[aktif] += 1
+            waktu[aktif] += _ambil_interval(rng, params, idx[aktif])
+            aktif = aktif[waktu[aktif] <= horizon_hari]
+
+        # Blok pasangan langsung dijumlahkan ke kolom grupnya
+        agregasi_kolom(count.reshape(n_skenario, len(cols)), codes[cols], n_grup, hasil=jumlah)
+    return jumlah
+
+# ==========================================
+# 3. AGREGASI & KUANTIL
+# ==========================================
+def agregasi_kolom(sampel, codes, n_grup, kolom=None, bobot=None, hasil=None):
+    """
+    Menjumlahkan kolom sampel (skenario x kolom) ke grup:
+    hasil[:, codes[i]] += bobot[i] * sampel[:, kolom[i]] (kolom None = kolom ke-i, bobot None = 1).
+    Pasangan diurutkan per grup lalu dijumlah dengan np.add.reduceat per blok skenario,
+    tanpa matriks indikator padat kolom x grup. hasil: array tujuan yang ditambah (None = baru).
+    """
+    codes = np.asarray(codes)
+    kolom = np.arange(len(codes)) if kolom is None else np.asarray(kolom)
+    if hasil is None:
+        hasil = np.zeros((sampel.shape[0], n_grup))
+    if not len(codes):
+        return hasil
+
+    urut = np.argsort(codes, kind='stable')
+    codes, kolom = codes[urut], kolom[urut]
+    bobot = None if bobot is None else np.asarray(bobot, dtype=float)[urut]
+    awal = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    grup = codes[awal]
+
+    for start in range(0, sampel.shape[0], CHUNK_SKENARIO):
+        blok = sampel[start:start + CHUNK_SKENARIO, kolom]
+        if bobot is not None:
+            blok = blok * bobot
+        hasil[start:start + CHUNK_SKENARIO, grup] += np.add.reduceat(blok, awal, axis=1, dtype=float)
+    return hasil
+
+
+def ringkas_kuantil(sampel, labels, kuantil=KUANTIL):
+    """Tabel rata-rata & kuantil demand per kolom sampel (skenario x grup)."""
+    tabel = labels.copy()
+    tabel['DEMAND_RATA2'] = sampel.mean(axis=0).round(2)
+    for q, nilai in zip(kuantil, np.quantile(sampel, kuantil, axis=0)):
+        tabel[f'P{round(q * 100)}'] = np.ceil(nilai).astype(int)
+    return tabel
+
+
+def simulasi_demand(df_done, mapping=None, horizon_hari=HORIZON_HARI, n_skenario=N_SKENARIO,
+                    seed=SEED, metode='auto', qty_per_job=QTY_PER_JOB):
+    """
+    Menjalankan simulasi armada lalu meringkas distribusi demand per komponen
+    (dan per barang jika `mapping` COMPNAME -> NAMA_BARANG_RAPIH, PART_NO, QTY diberikan,
+    satu kandidat per komponen atau baris mapping manual).
+    """
+    pasangan, params = siapkan_parameter(df_done, metode)
+    comp_codes, komponen = pd.factorize(pasangan.get_level_values('COMPNAME'))
+    demand_komp = simulasi_jumlah_job(params, horizon_hari, n_skenario, seed, comp_codes, len(komponen))
+    tabel_komp = ringkas_kuantil(demand_komp, pd.DataFrame({'COMPNAME': komponen}))
+    tabel_komp['JUMLAH_KAPAL'] = np.bincount(comp_codes, minlength=len(komponen))
+    tabel_komp = tabel_komp.sort_values('DEMAND_RATA2', ascending=False).reset_index(drop=True)
+    if mapping is None:
+        return tabel_komp, None
+
+    df_map = siapkan_mapping(mapping)
+    df_map = df_map[df_map['COMPNAME'].isin(komponen)]
+    key_codes, keys = pd.factorize(df_map['KEY_BARANG'])
+    # Demand barang = jumlah (QTY x demand komponen) untuk setiap baris mapping komponen -> barang
+    demand_part = agregasi_kolom(demand_komp, key_codes, len(keys), kolom=komponen.get_indexer(df_map['COMPNAME']),
+                                 bobot=df_map['QTY'].to_numpy() * qty_per_job)
+
+    info = df_map.groupby('KEY_BARANG', sort=False).agg(
+        PART_NO=('PART_NO', 'first'), NAMA_BARANG_RAPIH=('NAMA_BARANG_RAPIH', 'first')
+    ).loc[keys].reset_index(drop=True)
+    tabel_part = ringkas_kuantil(demand_part, info)
+    return tabel_komp, tabel_part.sort_values('DEMAND_RATA2', ascending=False).reset_index(drop=True)
+
+# ==========================================
+# 4. EKSEKUSI
+# ==========================================
+if __name__ == '__main__':
+    print("\n--- [1] MEMUAT DATA MAINTENANCE ---")
+    df_done = clean_job_reports(load_job_reports())
+    print(f"Sukses! Total Data Maintenance (selesai): {len(df_done):,} baris.")
+
+    print("\n--- [2] MEMETAKAN KOMPONEN KE MASTER BARANG ---")
+    df_inventory = pd.read_csv(FILE_MASTER_BARANG)
+    df_inventory['NAMA_BARANG_RAPIH'] = df_inventory['NAMA_BARANG_RAPIH'].astype(str)
+    recommender = PartRecommender(df_inventory, mapping_manual=baca_mapping_manual())
+    mapping = recommender.tabel_mapping(df_done['COMPNAME'], terbaik=True)
+
+    print(f"\n--- [3] SIMULASI {N_SKENARIO:,} SKENARIO, HORIZON {HORIZON_HARI} HARI ---")
+    tabel_komp, tabel_part = simulasi_demand(df_done, mapping)
+    tabel_komp.to_csv(FILE_SIMULASI_KOMPONEN, index=False)
+    tabel_part.to_csv(FILE_SIMULASI_PART, index=False)
+    if store_tersedia():
+        conn = connect_store()
+        simpan_tabel(conn, 'simulasi_komponen', tabel_komp, {'idx_simulasi_comp': ['COMPNAME']})
+        simpan_tabel(conn, 'simulasi_part', tabel_part, {'idx_simulasi_part': ['PART_NO']})
+        conn.close()
+    print(f"Demand per komponen disimpan di: {FILE_SIMULASI_KOMPONEN}")
+    print(f"Demand per barang disimpan di: {FILE_SIMULASI_PART}")
+    print(tabel_part.head(10))
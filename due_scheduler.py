@@ -0,0 +1,294 @@
+import heapq
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from interval_kernel import KEYS, siapkan_grup
+
+# ==========================================
+# KONFIGURASI JADWAL "NEXT DUE" ARMADA
+# ==========================================
+# Setiap instance komponen (VESSELID, COMPNAME) diprediksi jatuh tempo pada
+# tanggal laporan terakhir + MTBF-nya. MTBF instance = (terakhir - pertama) /
+# (jumlah hari laporan berbeda - 1), sama dengan statistik_interval (selisih <= 0
+# diabaikan). Hari laporan berbeda per instance disimpan (array terurut) agar laporan
+# terlambat (tanggal lama yang sudah tercatat) tidak dihitung dua kali.
+# Instance dengan satu laporan saja memakai MTBF komponen di seluruh armada.
+# Prediksi disimpan di min-heap (satu heap armada + satu heap per kapal):
+#   - "jatuh tempo dalam N hari" = jelajah heap dari akar, cabang yang sudah
+#     melewati batas tidak dibuka -> O(k log n) untuk k hasil, bukan O(n)
+#   - laporan baru hanya memperbarui instance yang terkena (entri lama tidak dihapus
+#     dari heap tetapi ditandai usang, heap dibangun ulang jika entri usang terlalu banyak).
+#     api_server.py memakai ini saat ingest_daemon.py menambah workbook baru.
+HORIZON_DUE = 30
+FAKTOR_REBUILD = 2         # Heap dibangun ulang jika isinya > 2x jumlah entri aktif
+
+SUMBER_KAPAL = 'KAPAL_KOMPONEN'
+SUMBER_KOMPONEN = 'KOMPONEN'
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+# ==========================================
+# 1. TABEL INSTANCE (HARI LAPORAN BERBEDA)
+# ==========================================
+def tabel_instance(df_done, keys=KEYS):
+    """
+    Satu baris per (Kapal, Komponen) dari data pekerjaan selesai: HARI = array hari
+    laporan berbeda (hari sejak 1970-01-01, terurut). PERTAMA, TERAKHIR & N_HARI
+    diturunkan dari HARI.
+    """
+    hari, offset, tabel = siapkan_grup(df_done, keys)
+    if len(hari) == 0:
+        return tabel.assign(HARI=pd.Series(dtype=object))
+    baru = np.r_[True, np.diff(hari) != 0]
+    baru[offset[:-1]] = True
+    unik = hari[baru]
+    offset_unik = np.r_[0, np.cumsum(np.add.reduceat(baru.astype(np.int64), offset[:-1]))]
+    tabel['HARI'] = [unik[a:b] for a, b in zip(offset_unik[:-1], offset_unik[1:])]
+    return tabel
+
+
+def query_instance(conn):
+    """Sama dengan tabel_instance, dihitung langsung dari tabel job_reports di store."""
+    df = pd.read_sql_query(
+        '''
+        SELECT DISTINCT VESSELID, COMPNAME,
+               CAST(julianday(date(REPORT_DATE)) - 2440587.5 AS INTEGER) AS HARI
+        FROM job_reports
+        WHERE VESSELID IS NOT NULL AND COMPNAME IS NOT NULL AND REPORT_DATE IS NOT NULL
+        ORDER BY VESSELID, COMPNAME, HARI
+        ''',
+        conn
+    )
+    # Baris sudah terurut per instance -> potong array HARI per grup
+    ukuran = df.groupby(KEYS, sort=False).size()
+    tabel = ukuran.index.to_frame(index=False)
+    hari = df['HARI'].to_numpy(dtype=np.int64)
+    offset = np.r_[0, np.cumsum(ukuran.to_numpy())]
+    tabel['HARI'] = [hari[a:b] for a, b in zip(offset[:-1], offset[1:])]
+    return tabel
+
+# ==========================================
+# 2. HELPER HEAP
+# ==========================================
+def _jelajah_heap(heap, batas, aktif):
+    """Semua entri aktif di heap dengan due <= batas, tanpa mengubah heap."""
+    hasil, tumpuk = [], [0] if heap else []
+    while tumpuk:
+        i = tumpuk.pop()
+        if i >= len(heap) or heap[i][0] > batas:
+            continue    # Anak-anaknya pasti > batas juga (sifat min-heap)
+        due, seq, key = heap[i]
+        if aktif.get(key, (None, None))[1] == seq:
+            hasil.append(heap[i])
+        tumpuk.extend((2 * i + 1, 2 * i + 2))
+    return hasil
+
+# ==========================================
+# 3. SCHEDULER
+# ==========================================
+class DueScheduler:
+    def __init__(self, tabel):
+        """tabel: VESSELID, COMPNAME, HARI (lihat tabel_instance)."""
+        self._seq = itertools.count()
+        self._state = {}         # key -> [pertama, terakhir, n_hari]
+        self._hari_laporan = {}  # key -> array terurut hari laporan berbeda (lebih hemat dari set)
+        self._komp = {}          # COMPNAME -> [jumlah hari, banyak interval] seluruh armada
+        self._fallback = {}      # COMPNAME -> {key} yang memakai MTBF komponen
+        self._aktif = {}         # key -> (due, seq) entri heap yang berlaku
+        self._heap = []
+        self._heap_kapal = {}
+        self.hari_akhir = 0
+
+        for kapal, comp, hari in zip(tabel['VESSELID'].tolist(), tabel['COMPNAME'].tolist(), tabel['HARI']):
+            if len(hari) == 0:
+                continue
+            key = (kapal, comp)
+            self._hari_laporan[key] = hari
+            self._state[key] = [int(hari[0]), int(hari[-1]), len(hari)]
+            self._tambah_komp(comp, *self._state[key], 1)
+            self.hari_akhir = max(self.hari_akhir, int(hari[-1]))
+
+        # Heap dibangun sekaligus (heapify O(n)), bukan push satu per satu
+        for key in self._state:
+            self._jadwalkan(key, push=False)
+        self._bangun_ulang()
+
+    @classmethod
+    def from_jobs(cls, df_done):
+        return cls(tabel_instance(df_done))
+
+    @classmethod
+    def from_store(cls, conn):
+        return cls(query_instance(conn))
+
+    def __len__(self):
+        return len(self._aktif)
+
+    # ------------------------------------------
+    # MTBF & DUE
+    # ------------------------------------------
+    def _tambah_komp(self, comp, pertama, terakhir, n_hari, tanda):
+        if n_hari > 1:
+            total = self._komp.setdefault(comp, [0, 0])
+            total[0] += tanda * (terakhir - pertama)
+            total[1] += tanda * (n_hari - 1)
+
+    def mtbf(self, key):
+        """(MTBF hari, sumber) untuk satu instance; (None, None) jika belum bisa diprediksi."""
+        pertama, terakhir, n_hari = self._state[key]
+        if n_hari > 1:
+            return (terakhir - pertama) / (n_hari - 1), SUMBER_KAPAL
+        total = self._komp.get(key[1])
+        if total and total[1] > 0:
+            return total[0] / total[1], SUMBER_KOMPONEN
+        return None, None
+
+    def _jadwalkan(self, key, push=True):
+        mtbf, sumber = self.mtbf(key)
+        fallback = self._fallback.setdefault(key[1], set())
+        if sumber == SUMBER_KOMPONEN:
+            fallback.add(key)
+        else:
+            fallback.discard(key)
+        if mtbf is None:
+            self._aktif.pop(key, None)
+            return
+
+        due = self._state[key][1] + int(round(mtbf))
+        if key in self._aktif and self._aktif[key][0] == due:
+            return
+        entri = (due, next(self._seq), key)
+        self._aktif[key] = entri[:2]
+        if push:
+            heapq.heappush(self._heap, entri)
+            heapq.heappush(self._heap_kapal.setdefault(key[0], []), entri)
+
+    def _bangun_ulang(self):
+        """Heap baru dari entri aktif saja (membuang entri usang)."""
+        self._heap = [(due, seq, key) for key, (due, seq) in self._aktif.items()]
+        heapq.heapify(self._heap)
+        self._heap_kapal = {}
+        for entri in self._heap:
+            self._heap_kapal.setdefault(entri[2][0], []).append(entri)
+        for heap in self._heap_kapal.values():
+            heapq.heapify(heap)
+
+    # ------------------------------------------
+    # UPDATE INKREMENTAL
+    # ------------------------------------------
+    def tambah_laporan(self, df_baru):
+        """
+        Memasukkan laporan baru (VESSELID, COMPNAME, REPORT_DATE). Hanya instance yang
+        dilaporkan (dan instance lain yang memakai MTBF komponen yang sama) dijadwalkan
+        ulang. Tanggal yang sudah tercatat (laporan terlambat / ganda) tidak menambah
+        hari laporan. Mengembalikan jumlah instance yang dijadwalkan ulang.
+        """
+        baru = tabel_instance(df_baru.dropna(subset=['REPORT_DATE']))
+        terkena, komp_berubah = set(), set()
+        for kapal, comp, hari in zip(baru['VESSELID'].tolist(), baru['COMPNAME'].tolist(), baru['HARI']):
+            key = (kapal, comp)
+            hari_lama = self._hari_laporan.get(key)
+            if hari_lama is not None:
+                hari = np.union1d(hari_lama, hari)
+                if len(hari) == len(hari_lama):
+                    continue    # Semua tanggal sudah tercatat, MTBF & due tidak berubah
+            self._hari_laporan[key] = hari
+            lama = self._state.get(key)
+            if lama is not None:
+                self._tambah_komp(comp, *lama, -1)
+            state = [int(hari[0]), int(hari[-1]), len(hari)]
+            self._state[key] = state
+            self._tambah_komp(comp, *state, 1)
+            self.hari_akhir = max(self.hari_akhir, state[1])
+            terkena.add(key)
+            if state[2] > 1:
+                komp_berubah.add(comp)
+
+        for comp in komp_berubah:
+            terkena |= self._fallback.get(comp, set())
+        for key in terkena:
+            self._jadwalkan(key)
+
+        if len(self._heap) > FAKTOR_REBUILD * len(self._aktif) + 1024:
+            self._bangun_ulang()
+        return len(terkena)
+
+    # ------------------------------------------
+    # QUERY
+    # ------------------------------------------
+    def _hari(self, tanggal):
+        if tanggal is None:
+            return self.hari_akhir
+        return int((np.datetime64(pd.Timestamp(tanggal), 'D') - _EPOCH).astype(np.int64))
+
+    def jatuh_tempo(self, hari=HORIZON_DUE, kapal=None, tanggal=None):
+        """
+        Pekerjaan yang jatuh tempo sampai `hari` hari setelah `tanggal` (default tanggal
+        laporan terakhir di data), termasuk yang sudah lewat (SISA_HARI negatif = overdue).
+        kapal=None untuk seluruh armada.
+        """
+        hari_ini = self._hari(tanggal)
+        heap = self._heap if kapal is None else self._heap_kapal.get(kapal, [])
+        entri = _jelajah_heap(heap, hari_ini + hari, self._aktif)
+
+        baris = []
+        for due, _, key in entri:
+            mtbf, sumber = self.mtbf(key)
+            baris.append(key + (self._state[key][1], round(mtbf, 1), sumber, due, due - hari_ini))
+        df = pd.DataFrame(baris, columns=KEYS + ['TERAKHIR', 'MTBF_HARI', 'SUMBER_MTBF', 'TANGGAL_DUE', 'SISA_HARI'])
+        for c in ['TERAKHIR', 'TANGGAL_DUE']:
+            df[c] = pd.to_datetime(df[c].to_numpy(dtype=np.int64), unit='D')
+        return df.sort_values(['TANGGAL_DUE'] + KEYS, ignore_index=True)
+
+    def kebutuhan_part(self, recommender, hari=HORIZON_DUE, kapal=None, tanggal=None):
+        """
+        Part yang dibutuhkan pekerjaan jatuh tempo (rekomendasi PartRecommender per
+        COMPNAME, satu kandidat terbaik atau mapping manual): JUMLAH_JOB, JUMLAH_BARANG
+        (QTY x job) dan tanggal due paling awal per part.
+        """
+        due = self.jatuh_tempo(hari, kapal, tanggal)
+        mapping = recommender.tabel_mapping(due['COMPNAME'], terbaik=True)
+        df = due.merge(mapping, on='COMPNAME')
+        if df.empty:
+            return pd.DataFrame(columns=['PART_NO', 'NAMA_BARANG_RAPIH', 'JUMLAH_JOB', 'JUMLAH_BARANG', 'DUE_PERTAMA'])
+        return (
+            df.groupby(['PART_NO', 'NAMA_BARANG_RAPIH'], dropna=False)
+            .agg(JUMLAH_JOB=('COMPNAME', 'size'), JUMLAH_BARANG=('QTY', 'sum'), DUE_PERTAMA=('TANGGAL_DUE', 'min'))
+            .reset_index()
+            .sort_values(['DUE_PERTAMA', 'JUMLAH_JOB'], ascending=[True, False], ignore_index=True)
+        )
+
+# ==========================================
+# 4. EKSEKUSI
+# ==========================================
+if __name__ == '__main__':
+    from maintenance_data import FILE_MASTER_BARANG, load_job_reports, clean_job_reports
+    from maintenance_store import store_tersedia, connect_store, baca_tabel
+    from part_recommender import PartRecommender, baca_mapping_manual
+
+    print("\n--- [1] MEMBANGUN JADWAL NEXT DUE ---")
+    t0 = time.perf_counter()
+    if store_tersedia():
+        conn = connect_store(read_only=True)
+        scheduler = DueScheduler.from_store(conn)
+        df_inventory = baca_tabel(conn, 'master_barang')
+    else:
+        scheduler = DueScheduler.from_jobs(clean_job_reports(load_job_reports()))
+        df_inventory = pd.read_csv(FILE_MASTER_BARANG)
+    print(f"Selesai dalam {time.perf_counter() - t0:.2f} detik: {len(scheduler):,} instance komponen terjadwal.")
+
+    print(f"\n--- [2] JATUH TEMPO {HORIZON_DUE} HARI KE DEPAN (SELURUH ARMADA) ---")
+    t0 = time.perf_counter()
+    due = scheduler.jatuh_tempo()
+    print(f"{len(due):,} pekerjaan ({(due['SISA_HARI'] < 0).sum():,} sudah overdue), query {1000 * (time.perf_counter() - t0):.1f} ms")
+    print(due.head(10))
+
+    if not due.empty:
+        kapal = due['VESSELID'].value_counts().index[0]
+        print(f"\n--- [3] KAPAL {kapal}: PEKERJAAN & PART YANG DIBUTUHKAN ---")
+        print(scheduler.jatuh_tempo(kapal=kapal).head(10))
+        recommender = PartRecommender(df_inventory, mapping_manual=baca_mapping_manual())
+        print(scheduler.kebutuhan_part(recommender, kapal=kapal).head(10))
@@ -0,0 +1,304 @@
+import glob
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from shared_data import publish_dataset, map_dataset
+from xlsx_reader import baca_xlsx_kolom
+from date_parser import parse_tanggal
+from chart_cache import versi_file
+
+# ==========================================
+# KONFIGURASI INGEST OTOMATIS
+# ==========================================
+# Export Job Report baru cukup diletakkan di WATCH_DIR. Proses ini memantau folder
+# (watchdog/inotify jika tersedia, selain itu polling), lalu hanya workbook yang baru
+# atau berubah yang dibaca ulang. Setiap workbook disimpan sebagai satu file Arrow
+# di INGEST_DIR, agregat bulanan diperbarui secara inkremental (kurangi versi lama,
+# tambah versi baru), dan nomor versi data di manifest dinaikkan. Dashboard memakai
+# nomor versi itu sebagai kunci cache, sehingga data baru terbaca tanpa clear cache.
+#   python ingest_daemon.py          -> jalan terus
+#   python ingest_daemon.py --sekali -> satu kali scan lalu selesai
+WATCH_DIR = 'Magang Sparepart 2025'
+POLA_FILE = 'Maintenance Job Report*.xlsx'
+INGEST_DIR = 'ingest_cache'
+MANIFEST_PATH = os.path.join(INGEST_DIR, 'manifest.json')
+AGREGAT_PATH = os.path.join(INGEST_DIR, 'agregat_bulanan.arrow')
+POLL_DETIK = 30       # Interval scan (cadangan jika event watchdog terlewat)
+STABIL_DETIK = 5      # File yang baru diubah < 5 detik dianggap masih disalin
+
+KUNCI_AGREGAT = ['VESSELID', 'COMPNAME', 'PERIOD']
+
+# ==========================================
+# 1. MANIFEST & SCAN FOLDER
+# ==========================================
+def baca_manifest(path=MANIFEST_PATH):
+    """
+    Manifest: {'versi': int, 'files': {path: {mtime_ns, size, part, tahun, baris}},
+    'part_usang': [part lama yang belum bisa dihapus]}.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'versi': 0, 'files': {}}
+
+
+def _tulis_manifest(manifest, path=MANIFEST_PATH):
+    # Tulis ke file sementara lalu rename (pembaca tidak melihat file setengah jadi)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def scan_folder(folder=WATCH_DIR, pola=POLA_FILE):
+    """{path: (mtime_ns, size)} untuk semua workbook yang cocok dengan pola."""
+    hasil = {}
+    for path in sorted(glob.glob(os.path.join(folder, pola))):
+        if os.path.basename(path).startswith('~$'):  # File lock Excel
+            continue
+        st = os.stat(path)
+        hasil[path] = (st.st_mtime_ns, st.st_size)
+    return hasil
+
+
+def tahun_dari_file(path, df):
+    """SOURCE_YEAR dari nama file (misal '... 2025.xlsx'), jika tidak ada dari kolom TAHUN."""
+    cocok = re.findall(r'20\d{2}', os.path.basename(path))
+    if cocok:
+        return int(cocok[-1])
+    tahun = pd.to_numeric(df['TAHUN'], errors='coerce').dropna()
+    return int(tahun.mode().iloc[0]) if not tahun.empty else 0
+
+# ==========================================
+# 2. AGREGAT BULANAN (INKREMENTAL)
+# ==========================================
+def agregat_part(df):
+    """Jumlah job per (VESSELID, COMPNAME, PERIOD); PERIOD = tahun*12 + bulan-1 (sama dengan store)."""
+    tanggal = parse_tanggal(df['JOBREPORT_DATE'], laporan=False)
+    ok = tanggal.notna().to_numpy()
+    period = (tanggal.dt.year * 12 + tanggal.dt.month - 1)[ok].astype(int)
+    return (
+        df.loc[ok, ['VESSELID', 'COMPNAME']]
+        .assign(PERIOD=period.to_numpy())
+        .groupby(KUNCI_AGREGAT, dropna=False).size().rename('JUMLAH').reset_index()
+    )
+
+
+def gabung_agregat(total, dikurangi, ditambah):
+    """total - agregat file lama + agregat file baru (baris yang menjadi 0 dibuang)."""
+    bagian = [total] + [a.assign(JUMLAH=-a['JUMLAH']) for a in dikurangi] + list(ditambah)
+    bagian = [b for b in bagian if b is not None and not b.empty]
+    if not bagian:
+        return pd.DataFrame(columns=KUNCI_AGREGAT + ['JUMLAH'])
+    hasil = (
+        pd.concat(bagian, ignore_index=True)
+        .astype({'VESSELID': object, 'COMPNAME': object})
+        .groupby(KUNCI_AGREGAT, dropna=False)['JUMLAH'].sum().reset_index()
+    )
+    return hasil[hasil['JUMLAH'] != 0].reset_index(drop=True)
+
+# ==========================================
+# 3. INGEST (HANYA FILE BARU / BERUBAH)
+# ==========================================
+def _nama_part(path, mtime_ns):
+    # Nama part memuat mtime: part lama tetap ada sampai manifest baru ditulis
+    nama = re.sub(r'[^A-Za-z0-9]+', '_', os.path.splitext(os.path.basename(path))[0]).strip('_')
+    return os.path.join(INGEST_DIR, f'{nama}.{mtime_ns}.arrow')
+
+
+def _hapus_part_usang(manifest):
+    """
+    Menghapus part lama di manifest['part_usang']. Part yang masih dipetakan (mmap)
+    oleh dashboard tidak bisa dihapus di Windows: disimpan dan dicoba lagi nanti.
+    Mengembalikan True jika daftar berubah.
+    """
+    usang = manifest.get('part_usang', [])
+    sisa = []
+    for part in usang:
+        try:
+            if os.path.exists(part):
+                os.remove(part)
+        except OSError as e:
+            print(f"Warning: part lama '{part}' belum bisa dihapus ({e}), dicoba lagi nanti.")
+            sisa.append(part)
+    manifest['part_usang'] = sisa
+    return sisa != usang
+
+
+def ingest_sekali(folder=WATCH_DIR, pola=POLA_FILE):
+    """
+    Satu kali scan. Mengembalikan True jika ada data yang berubah (versi naik).
+    Workbook yang gagal dibaca (misal masih disalin) dicoba lagi di scan berikutnya.
+    """
+    os.makedirs(INGEST_DIR, exist_ok=True)
+    manifest = baca_manifest()
+    lama = manifest['files']
+
+    sekarang = scan_folder(folder, pola)
+    batas_stabil = time.time_ns() - STABIL_DETIK * 10**9
+    berubah = [
+        p for p, (mtime, size) in sekarang.items()
+        if (p not in lama or (lama[p]['mtime_ns'], lama[p]['size']) != (mtime, size)) and mtime < batas_stabil
+    ]
+    hilang = [p for p in lama if p not in sekarang]
+    if not berubah and not hilang:
+        if _hapus_part_usang(manifest):
+            _tulis_manifest(manifest)
+        return False
+
+    dikurangi, ditambah, part_usang = [], [], []
+    for path in hilang:
+        print(f"[ingest] File dihapus: {path}")
+        dikurangi.append(agregat_part(map_dataset(lama[path]['part'])))
+        part_usang.append(lama[path]['part'])
+        del lama[path]
+
+    for path in berubah:
+        mtime, size = sekarang[path]
+        t0 = time.perf_counter()
+        try:
+            df = baca_xlsx_kolom(path)
+        except Exception as e:
+            print(f"Warning: '{path}' belum bisa dibaca ({e}), dicoba lagi nanti.")
+            continue
+        df['SOURCE_YEAR'] = tahun_dari_file(path, df)
+
+        part = _nama_part(path, mtime)
+        publish_dataset(df, part)
+        if path in lama:
+            dikurangi.append(agregat_part(map_dataset(lama[path]['part'])))
+            part_usang.append(lama[path]['part'])
+        # Agregat dihitung dari part yang sudah ditulis (tipe kolom sama dengan yang dibaca dashboard)
+        ditambah.append(agregat_part(map_dataset(part)))
+        lama[path] = {
+            'mtime_ns': mtime, 'size': size, 'part': part,
+            'tahun': int(df['SOURCE_YEAR'].iloc[0]) if len(df) else 0, 'baris': len(df),
+        }
+        print(f"[ingest] {path}: {len(df):,} baris ({time.perf_counter() - t0:.1f} s)")
+
+    if not dikurangi and not ditambah:
+        return False
+
+    publish_dataset(gabung_agregat(baca_agregat(), dikurangi, ditambah), AGREGAT_PATH)
+
+    manifest['versi'] += 1
+    manifest['diperbarui'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    manifest['part_usang'] = manifest.get('part_usang', []) + part_usang
+    _tulis_manifest(manifest)
+    # Part lama dihapus setelah manifest baru tertulis; yang gagal tetap tercatat
+    if _hapus_part_usang(manifest):
+        _tulis_manifest(manifest)
+    print(f"[ingest] Versi data sekarang: {manifest['versi']}")
+    return True
+
+# ==========================================
+# 4. BACA HASIL INGEST (DIPAKAI DASHBOARD & SCRIPT)
+# ==========================================
+def ingest_tersedia(path=MANIFEST_PATH):
+    return os.path.exists(path)
+
+
+def versi_data(*fallback_paths):
+    """
+    Token versi data untuk kunci cache dashboard: nomor versi manifest jika
+    ingest dipakai, selain itu waktu modifikasi file sumber.
+    """
+    if ingest_tersedia():
+        return ('ingest', baca_manifest()['versi'])
+    return versi_file(*fallback_paths)
+
+
+def daftar_part(path=MANIFEST_PATH):
+    """Himpunan file part Arrow yang tercatat di manifest; None jika belum ada ingest."""
+    if not ingest_tersedia(path):
+        return None
+    return {info['part'] for info in baca_manifest(path)['files'].values()}
+
+
+def baca_ingest(tahun=None):
+    """
+    Menggabungkan semua part hasil ingest (kolom Job Report + SOURCE_YEAR).
+    tahun: daftar SOURCE_YEAR yang diambil (None = semua). None jika belum ada ingest.
+    """
+    if not ingest_tersedia():
+        return None
+    files = baca_manifest()['files']
+    parts = [
+        map_dataset(info['part']) for _, info in sorted(files.items())
+        if tahun is None or info['tahun'] in tahun
+    ]
+    if not parts:
+        return None
+    return pd.concat(parts, ignore_index=True)
+
+
+def baca_agregat(path=AGREGAT_PATH):
+    """Agregat bulanan (VESSELID, COMPNAME, PERIOD, JUMLAH); None jika belum ada ingest."""
+    return map_dataset(path) if os.path.exists(path) else None
+
+# ==========================================
+# 5. LOOP PEMANTAU FOLDER
+# ==========================================
+def _mulai_watchdog(folder, pemicu):
+    """Event sistem file (inotify di Linux) lewat watchdog; None jika tidak terpasang."""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class _Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            pemicu.set()
+
+    observer = Observer()
+    observer.schedule(_Handler(), folder, recursive=False)
+    observer.start()
+    return observer
+
+
+def _ingest_aman(folder):
+    # Error satu scan (file terkunci, disk penuh, part rusak, ...) tidak menghentikan
+    # pemantau: manifest lama tetap berlaku dan scan berikutnya mencoba lagi
+    try:
+        return ingest_sekali(folder)
+    except Exception as e:
+        print(f"Warning: ingest gagal ({type(e).__name__}: {e}), dicoba lagi pada scan berikutnya.")
+        return False
+
+
+def jalankan(folder=WATCH_DIR, interval=POLL_DETIK):
+    print(f"\n--- Memantau folder '{folder}' (Ctrl+C untuk berhenti) ---")
+    _ingest_aman(folder)
+
+    pemicu = threading.Event()
+    observer = _mulai_watchdog(folder, pemicu)
+    print("Mode: watchdog + polling" if observer else f"Mode: polling setiap {interval} detik")
+    try:
+        while True:
+            # Tunggu event (atau interval habis), beri jeda agar salinan file selesai
+            if pemicu.wait(interval):
+                time.sleep(STABIL_DETIK)
+            pemicu.clear()
+            _ingest_aman(folder)
+    except KeyboardInterrupt:
+        print("\nBerhenti.")
+    finally:
+        if observer:
+            observer.stop()
+            observer.join()
+
+
+if __name__ == '__main__':
+    if '--sekali' in sys.argv[1:]:
+        berubah = ingest_sekali()
+        print(f"Selesai. Data {'diperbarui' if berubah else 'tidak berubah'} (versi {baca_manifest()['versi']}).")
+    else:
+        jalankan()
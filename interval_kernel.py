@@ -0,0 +1,170 @@
+import os
+from importlib.util import find_spec
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI KERNEL INTERVAL PER GRUP
+# ==========================================
+# MTBF lama: sort -> shift(-1) per grup -> kolom NEXT_JOB_DATE, DAYS_BETWEEN ->
+# filter > 0 -> groupby mean/count, masing-masing membuat kolom sementara seukuran data.
+# Di sini tanggal (int64, nanodetik) diurutkan sekali per (Kapal, Komponen), batas grup
+# disimpan sebagai offset, lalu satu kernel berjalan sekali per grup dan menghitung:
+#   - jumlah & banyak selisih > 0 (-> MTBF), selisih terpanjang
+#   - hari sejak pekerjaan terakhir (sampai tanggal data terakhir)
+#   - streak overdue terpanjang: interval berurutan yang > FAKTOR_OVERDUE x MTBF grup
+# Selisih dihitung seperti (NEXT_JOB_DATE - REPORT_DATE).dt.days (dan LEAD di store):
+# selisih waktu penuh dibulatkan ke bawah ke hari, bukan selisih tanggal kalender.
+# Kernel dikompilasi Numba jika terpasang; selain itu versi NumPy (vectorized) dipakai.
+# INTERVAL_NUMBA=0 untuk memaksa versi NumPy.
+KEYS = ['VESSELID', 'COMPNAME']
+FAKTOR_OVERDUE = 1.5
+NS_HARI = 86_400 * 10**9
+
+# Numba baru di-import (dan kernel dikompilasi) saat statistik pertama dihitung
+NUMBA_TERSEDIA = find_spec('numba') is not None and os.environ.get('INTERVAL_NUMBA', '1') != '0'
+
+# ==========================================
+# 1. DATA TERURUT + OFFSET GRUP
+# ==========================================
+def siapkan_grup(df_done, keys=KEYS, satuan='D'):
+    """
+    Mengembalikan (waktu int64 terurut per grup, offset grup, DataFrame label grup).
+    satuan: 'D' = hari kalender sejak 1970-01-01, 'ns' = nanodetik (jam ikut dihitung).
+    Grup ke-i menempati hari[offset[i]:offset[i + 1]]. Baris dengan kunci kosong
+    diabaikan (sama seperti groupby).
+    """
+    df_done = df_done.dropna(subset=keys)
+    # Kode grup dari hash groupby (factorize MultiIndex jauh lebih lambat untuk kolom teks)
+    grup = df_done.groupby(keys, sort=True)
+    codes = grup.ngroup().to_numpy()
+    tabel = grup.size().index.to_frame(index=False)
+    hari = df_done['REPORT_DATE'].to_numpy(dtype=f'datetime64[{satuan}]').astype(np.int64)
+    offset = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(tabel)))))
+    if len(hari) == 0:
+        return hari, offset, tabel
+    # Satu kunci int64 (grup, hari) -> satu np.sort, lebih cepat dari lexsort dua kolom;
+    # lexsort jika kunci bisa melebihi int64 (rentang nanodetik x banyak grup)
+    awal = hari.min()
+    rentang = int(hari.max() - awal + 1)
+    if len(tabel) * rentang >= 2**62:
+        return hari[np.lexsort((hari, codes))], offset, tabel
+    kunci = codes * rentang + (hari - awal)
+    kunci.sort()
+    return kunci % rentang + awal, offset, tabel
+
+# ==========================================
+# 2. KERNEL (NUMBA, SATU KALI JALAN PER GRUP)
+# ==========================================
+def _kernel_loop(hari, offset, hari_akhir, faktor):
+    n_grup = len(offset) - 1
+    jumlah = np.zeros(n_grup)
+    banyak = np.zeros(n_grup, dtype=np.int64)
+    gap_maks = np.zeros(n_grup, dtype=np.int64)
+    sejak = np.zeros(n_grup, dtype=np.int64)
+    streak_maks = np.zeros(n_grup, dtype=np.int64)
+
+    for g in range(n_grup):
+        a, b = offset[g], offset[g + 1]
+        if b == a:
+            continue
+        sejak[g] = (hari_akhir - hari[b - 1]) // NS_HARI
+        for i in range(a, b - 1):
+            gap = (hari[i + 1] - hari[i]) // NS_HARI
+            if gap > 0:
+                jumlah[g] += gap
+                banyak[g] += 1
+                if gap > gap_maks[g]:
+                    gap_maks[g] = gap
+        if banyak[g] == 0:
+            continue
+
+        # Jalan kedua (data grup masih di cache): streak interval > faktor x MTBF
+        batas = faktor * jumlah[g] / banyak[g]
+        streak = 0
+        for i in range(a, b - 1):
+            gap = (hari[i + 1] - hari[i]) // NS_HARI
+            if gap <= 0:
+                continue      # Pekerjaan di hari yang sama tidak memutus streak
+            if gap > batas:
+                streak += 1
+                if streak > streak_maks[g]:
+                    streak_maks[g] = streak
+            else:
+                streak = 0
+    return jumlah, banyak, gap_maks, sejak, streak_maks
+
+
+_kernel_numba = None
+
+
+def _kernel():
+    """Kernel Numba (dikompilasi sekali per proses) atau versi NumPy jika Numba tidak ada."""
+    global _kernel_numba
+    if not NUMBA_TERSEDIA:
+        return _kernel_numpy
+    if _kernel_numba is None:
+        from numba import njit
+        _kernel_numba = njit(cache=True, nogil=True)(_kernel_loop)
+    return _kernel_numba
+
+# ==========================================
+# 3. VERSI NUMPY (TANPA NUMBA)
+# ==========================================
+def _kernel_numpy(hari, offset, hari_akhir, faktor):
+    n_grup = len(offset) - 1
+    ukuran = np.diff(offset)
+    grup = np.repeat(np.arange(n_grup), ukuran)
+
+    gap = np.diff(hari) // NS_HARI
+    valid = (grup[1:] == grup[:-1]) & (gap > 0)
+    g_gap, gap = grup[1:][valid], gap[valid]
+
+    jumlah = np.bincount(g_gap, weights=gap, minlength=n_grup)
+    banyak = np.bincount(g_gap, minlength=n_grup)
+    gap_maks = np.zeros(n_grup, dtype=np.int64)
+    np.maximum.at(gap_maks, g_gap, gap)
+
+    ada = ukuran > 0
+    sejak = np.zeros(n_grup, dtype=np.int64)
+    sejak[ada] = (hari_akhir - hari[offset[1:][ada] - 1]) // NS_HARI
+
+    # Streak: run berurutan gap > batas dalam grup yang sama (gap <= 0 sudah dibuang)
+    batas = faktor * jumlah / np.maximum(banyak, 1)
+    overdue = gap > batas[g_gap]
+    streak_maks = np.zeros(n_grup, dtype=np.int64)
+    if overdue.any():
+        mulai_run = np.r_[True, (g_gap[1:] != g_gap[:-1]) | (overdue[1:] != overdue[:-1])]
+        run_id = np.cumsum(mulai_run) - 1
+        panjang_run = np.bincount(run_id)
+        awal = np.flatnonzero(mulai_run)
+        run_overdue = overdue[awal]
+        np.maximum.at(streak_maks, g_gap[awal][run_overdue], panjang_run[run_overdue])
+    return jumlah, banyak, gap_maks, sejak, streak_maks
+
+# ==========================================
+# 4. API
+# ==========================================
+def statistik_interval(df_done, keys=KEYS, faktor=FAKTOR_OVERDUE, tanggal_akhir=None):
+    """
+    Statistik interval per (Kapal, Komponen): JUMLAH_HARI & TOTAL_KEJADIAN (selisih > 0),
+    MTBF_HARI, GAP_MAKS_HARI, HARI_SEJAK_TERAKHIR (sampai tanggal_akhir, default
+    tanggal data terakhir) dan STREAK_OVERDUE_MAKS.
+    """
+    # Waktu dalam nanodetik: selisih = waktu penuh // 1 hari, sama dengan .dt.days
+    hari, offset, tabel = siapkan_grup(df_done, keys, satuan='ns')
+    if tanggal_akhir is None:
+        hari_akhir = int(hari.max()) if len(hari) else 0
+    else:
+        hari_akhir = int(np.datetime64(pd.Timestamp(tanggal_akhir), 'ns').astype(np.int64))
+
+    jumlah, banyak, gap_maks, sejak, streak = _kernel()(hari, offset, hari_akhir, float(faktor))
+
+    tabel['JUMLAH_HARI'] = jumlah
+    tabel['TOTAL_KEJADIAN'] = banyak
+    tabel['MTBF_HARI'] = np.where(banyak > 0, jumlah / np.maximum(banyak, 1), np.nan).round(1)
+    tabel['GAP_MAKS_HARI'] = gap_maks
+    tabel['HARI_SEJAK_TERAKHIR'] = sejak
+    tabel['STREAK_OVERDUE_MAKS'] = streak
+    return tabel
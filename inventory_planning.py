@@ -0,0 +1,152 @@
+import os
+
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+
+from maintenance_data import FILE_MASTER_BARANG, load_job_reports, clean_job_reports, hitung_mtbf
+from maintenance_store import store_tersedia, connect_store, query_mtbf, simpan_tabel
+from part_recommender import PartRecommender, baca_mapping_manual
+
+# ==========================================
+# KONFIGURASI PERENCANAAN STOK
+# ==========================================
+# Laporan_Forecasting_MTBF_Sparepart.csv hanya berisi teks "Setiap X Hari".
+# Di sini kebutuhan per komponen (laju per bulan) diambil dari:
+#   - MTBF setiap (Kapal, Komponen) (default), atau
+#   - forecast simulasi demand (demand_simulation.py), INV_SUMBER_DEMAND=FORECAST
+# lalu dipetakan ke barang di Master Barang: mapping manual (Mapping_Komponen_Part.csv,
+# QTY per pekerjaan) atau satu kandidat terbaik PartRecommender per komponen, sehingga
+# demand tidak digandakan ke kandidat alternatif. Dijumlahkan per PART_NO untuk seluruh
+# armada, lalu dihitung Safety Stock & Reorder Point.
+FILE_RENCANA_STOK = 'Rencana_Stok_Sparepart.csv'
+SUMBER_DEMAND = os.environ.get('INV_SUMBER_DEMAND', 'MTBF').upper()
+SERVICE_LEVEL = 0.95     # Peluang tidak kehabisan stok selama lead time
+LEAD_TIME_HARI = 30      # Waktu tunggu pengadaan
+QTY_PER_JOB = 1          # Asumsi jumlah barang terpakai per pekerjaan
+HARI_PER_BULAN = 30.44
+
+# ==========================================
+# 1. KEBUTUHAN PER KOMPONEN
+# ==========================================
+def demand_dari_mtbf(mtbf_pair):
+    """
+    mtbf_pair: tabel MTBF per (VESSELID, COMPNAME).
+    Setiap kapal dianggap proses Poisson dengan laju 1/MTBF, sehingga untuk
+    seluruh armada: rata-rata = jumlah laju, varians = jumlah laju.
+    Hasil: COMPNAME, DEMAND_BULAN, VAR_BULAN, JUMLAH_KAPAL.
+    """
+    rate = HARI_PER_BULAN / mtbf_pair['MTBF_HARI']
+    demand = mtbf_pair[['COMPNAME']].assign(DEMAND_BULAN=rate, VAR_BULAN=rate, JUMLAH_KAPAL=1)
+    return demand.groupby('COMPNAME', as_index=False).sum()
+
+
+def demand_dari_forecast(tabel_simulasi, horizon_hari):
+    """
+    tabel_simulasi: hasil simulasi demand per komponen (DEMAND_RATA2, P95, JUMLAH_KAPAL)
+    untuk horizon_hari ke depan. Rata-rata & varians diskalakan ke per bulan
+    (varians proses renewal tumbuh linear terhadap waktu); simpangan baku dari P95.
+    """
+    skala = HARI_PER_BULAN / horizon_hari
+    z95 = NormalDist().inv_cdf(0.95)
+    std = np.maximum(tabel_simulasi['P95'] - tabel_simulasi['DEMAND_RATA2'], 0) / z95
+    return pd.DataFrame({
+        'COMPNAME': tabel_simulasi['COMPNAME'],
+        'DEMAND_BULAN': tabel_simulasi['DEMAND_RATA2'] * skala,
+        'VAR_BULAN': std ** 2 * skala,
+        'JUMLAH_KAPAL': tabel_simulasi['JUMLAH_KAPAL'],
+    })
+
+
+def siapkan_mapping(mapping):
+    """
+    Menambahkan KEY_BARANG (PART_NO, atau nama rapih jika P/N kosong) tanpa duplikat per
+    komponen. mapping sebaiknya dari tabel_mapping(..., terbaik=True): setiap baris
+    dianggap barang yang benar-benar terpakai per pekerjaan (QTY, default 1).
+    """
+    df = mapping.copy()
+    if 'QTY' not in df.columns:
+        df['QTY'] = 1
+    df['QTY'] = pd.to_numeric(df['QTY'], errors='coerce').fillna(1)
+    # Barang tanpa Part Number dikelompokkan berdasarkan nama rapihnya
+    df['KEY_BARANG'] = df['PART_NO'].where(df['PART_NO'].notna(), df['NAMA_BARANG_RAPIH'])
+    # Master barang bisa berisi P/N yang sama lebih dari sekali; jangan dihitung ganda
+    return df.drop_duplicates(subset=['COMPNAME', 'KEY_BARANG']).reset_index(drop=True)
+
+# ==========================================
+# 2. REORDER POINT & SAFETY STOCK PER PART
+# ==========================================
+def hitung_rencana_stok(demand_komponen, mapping, service_level=SERVICE_LEVEL,
+                        lead_time_hari=LEAD_TIME_HARI, qty_per_job=QTY_PER_JOB):
+    """
+    demand_komponen : COMPNAME, DEMAND_BULAN, VAR_BULAN (dari MTBF atau forecast)
+    mapping         : COMPNAME -> NAMA_BARANG_RAPIH, PART_NO, QTY (PartRecommender.tabel_mapping terbaik=True)
+    Rumus (kebutuhan independen antar komponen):
+        SS  = z * sqrt(VAR_BULAN * LT)
+        ROP = DEMAND_BULAN * LT + SS          (LT dalam bulan)
+    """
+    z = NormalDist().inv_cdf(service_level)
+    lt_bulan = lead_time_hari / HARI_PER_BULAN
+
+    df = siapkan_mapping(mapping).merge(demand_komponen, on='COMPNAME', how='inner')
+    qty = df['QTY'] * qty_per_job
+    df['DEMAND_BULAN'] *= qty
+    df['VAR_BULAN'] *= qty ** 2
+
+    rencana = df.groupby('KEY_BARANG').agg(
+        PART_NO=('PART_NO', 'first'),
+        NAMA_BARANG_RAPIH=('NAMA_BARANG_RAPIH', 'first'),
+        DEMAND_BULAN=('DEMAND_BULAN', 'sum'),
+        VAR_BULAN=('VAR_BULAN', 'sum'),
+        JUMLAH_KOMPONEN=('COMPNAME', 'nunique'),
+        KOMPONEN_TERKAIT=('COMPNAME', lambda s: ', '.join(sorted(s.unique())[:5])),
+    ).reset_index(drop=True)
+
+    rencana['SAFETY_STOCK'] = np.ceil(z * np.sqrt(rencana['VAR_BULAN'] * lt_bulan)).astype(int)
+    rencana['REORDER_POINT'] = np.ceil(rencana['DEMAND_BULAN'] * lt_bulan + z * np.sqrt(rencana['VAR_BULAN'] * lt_bulan)).astype(int)
+    rencana['DEMAND_BULAN'] = rencana['DEMAND_BULAN'].round(2)
+    rencana = rencana.drop(columns='VAR_BULAN')
+
+    return rencana.sort_values('REORDER_POINT', ascending=False).reset_index(drop=True)
+
+# ==========================================
+# 3. EKSEKUSI
+# ==========================================
+if __name__ == '__main__':
+    conn = connect_store() if store_tersedia() else None
+    if SUMBER_DEMAND == 'FORECAST':
+        from demand_simulation import FILE_SIMULASI_KOMPONEN, HORIZON_HARI
+
+        print("\n--- [1] MEMBACA FORECAST DEMAND PER KOMPONEN ---")
+        try:
+            demand_komponen = demand_dari_forecast(pd.read_csv(FILE_SIMULASI_KOMPONEN), HORIZON_HARI)
+        except FileNotFoundError:
+            print(f"Error: '{FILE_SIMULASI_KOMPONEN}' tidak ditemukan. Jalankan demand_simulation.py dulu.")
+            exit()
+        print(f"Total komponen dengan forecast: {len(demand_komponen):,}")
+    else:
+        print("\n--- [1] MENGHITUNG MTBF PER KAPAL & KOMPONEN ---")
+        if conn is not None:
+            mtbf_pair = query_mtbf(conn, by=('VESSELID', 'COMPNAME'))
+        else:
+            mtbf_pair = hitung_mtbf(clean_job_reports(load_job_reports()), by=['VESSELID', 'COMPNAME'])
+        demand_komponen = demand_dari_mtbf(mtbf_pair)
+        print(f"Total komponen dengan MTBF: {len(demand_komponen):,}")
+
+    print("\n--- [2] MEMETAKAN KOMPONEN KE MASTER BARANG ---")
+    df_inventory = pd.read_csv(FILE_MASTER_BARANG)
+    df_inventory['NAMA_BARANG_RAPIH'] = df_inventory['NAMA_BARANG_RAPIH'].astype(str)
+    recommender = PartRecommender(df_inventory, mapping_manual=baca_mapping_manual())
+    mapping = recommender.tabel_mapping(demand_komponen['COMPNAME'], terbaik=True)
+    print(f"Total pasangan komponen-barang: {len(mapping):,} "
+          f"({(mapping['SUMBER'] == 'MANUAL').sum():,} dari mapping manual)")
+
+    print("\n--- [3] MENGHITUNG SAFETY STOCK & REORDER POINT ---")
+    rencana = hitung_rencana_stok(demand_komponen, mapping)
+    rencana.to_csv(FILE_RENCANA_STOK, index=False)
+    if conn is not None:
+        simpan_tabel(conn, 'rencana_stok', rencana, {'idx_rencana_part': ['PART_NO']})
+        conn.close()
+    print(f"Sumber demand {SUMBER_DEMAND}, service level {SERVICE_LEVEL:.0%}, lead time {LEAD_TIME_HARI} hari.")
+    print(f"Rencana stok {len(rencana):,} barang disimpan di: {FILE_RENCANA_STOK}")
+    print(rencana.head(10))
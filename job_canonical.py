@@ -0,0 +1,83 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from master_dedup import minhash_signatures, cluster_minhash
+
+# ==========================================
+# KONFIGURASI KANONIKALISASI JOB
+# ==========================================
+# JOBTITLE/JOBDESC yang sama sering ditulis sedikit berbeda ("Check oil level #1",
+# "check  oil level No.1"), sehingga value_counts() memecah pekerjaan yang sama.
+# Setiap teks unik dinormalisasi sekali (memo), lalu teks yang mirip digabung
+# lewat shingle kata yang di-hash (MinHash LSH) menjadi satu ID pekerjaan kanonik.
+KOLOM_JOB = ['JOBTITLE', 'JOBDESC']
+JACCARD_MIN_JOB = 0.7
+MAKS_MEMO_TEKS = 200_000   # Batas memo teks kanonik (proses dashboard berjalan lama)
+
+# Penomoran yang tidak mengubah jenis pekerjaan: #1, No.2, NO 3, (4)
+_POLA_NOMOR = re.compile(r'#\s*\d+\w*|\bNO\s*\.?\s*\d+\w*|\(\s*\d+\s*\)')
+
+# ==========================================
+# 1. NORMALISASI TEKS (SEKALI PER TEKS UNIK)
+# ==========================================
+@lru_cache(maxsize=MAKS_MEMO_TEKS)
+def kanonik_teks(teks):
+    """Huruf besar, tanpa penomoran, tanda baca & spasi berlebih."""
+    teks = _POLA_NOMOR.sub(' ', teks.upper())
+    teks = re.sub(r'[^A-Z0-9]+', ' ', teks)
+    return teks.strip() or '-'
+
+
+def shingles_job(teks_kanonik):
+    """Shingle kata: setiap kata + pasangan kata berurutan."""
+    kata = teks_kanonik.split()
+    return set(kata) | {f'{a} {b}' for a, b in zip(kata, kata[1:])}
+
+# ==========================================
+# 2. ID PEKERJAAN KANONIK
+# ==========================================
+def tambah_kanonik(df, kolom='JOBDESC', jaccard_min=JACCARD_MIN_JOB):
+    """
+    Menambahkan kolom <kolom>_KANONIK (teks wakil cluster) dan <kolom>_ID
+    (1 = pekerjaan paling sering). Proses berjalan per teks unik, bukan per baris.
+    """
+    if df.empty:
+        df[f'{kolom}_KANONIK'] = pd.Series(dtype=object)
+        df[f'{kolom}_ID'] = pd.Series(dtype=int)
+        return df
+
+    raw_codes, raw_unik = pd.factorize(df[kolom].fillna('-').astype(str))
+    kanonik = pd.Index([kanonik_teks(t) for t in raw_unik])
+
+    # Teks kanonik yang persis sama digabung dulu, sisanya lewat MinHash LSH
+    kan_codes, kan_unik = pd.factorize(kanonik)
+    sig = minhash_signatures([shingles_job(t) for t in kan_unik])
+    label, _ = cluster_minhash(sig, jaccard_min)
+
+    baris_label = label[kan_codes[raw_codes]]
+    frek = np.bincount(baris_label, minlength=label.max() + 1)
+
+    # Wakil cluster = teks kanonik yang paling sering muncul di dalam cluster
+    frek_kan = np.bincount(kan_codes[raw_codes], minlength=len(kan_unik))
+    urut = np.lexsort((-frek_kan, label))
+    wakil = pd.Series(kan_unik[urut], index=label[urut])
+    wakil = wakil[~wakil.index.duplicated()]
+
+    # Nomor ID berdasarkan frekuensi (stabil untuk frekuensi sama)
+    peringkat = np.empty_like(frek)
+    peringkat[np.argsort(-frek, kind='stable')] = np.arange(1, len(frek) + 1)
+
+    df[f'{kolom}_KANONIK'] = wakil.reindex(baris_label).to_numpy()
+    df[f'{kolom}_ID'] = peringkat[baris_label]
+    return df
+
+
+def tambah_semua_kanonik(df, kolom_list=KOLOM_JOB):
+    """Kanonikalisasi untuk semua kolom job yang tersedia di DataFrame."""
+    for kolom in kolom_list:
+        if kolom in df.columns:
+            tambah_kanonik(df, kolom)
+    return df
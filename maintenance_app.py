@@ -1,13 +1,24 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from count_matrix import CountMatrixBuilder
+from anomaly_detector import baca_alert
+from reliability import hitung_mtbf_jam, tabel_weibull, WeibullLookup
+from job_canonical import tambah_semua_kanonik
+from date_parser import parse_tanggal
+# matplotlib & seaborn di-import di dalam fungsi grafik: grafik dari ChartCache tidak memuatnya
+from chart_cache import ChartCache
+from xlsx_reader import baca_xlsx_kolom
+from ingest_daemon import baca_ingest, versi_data
+from maintenance_data import hitung_mtbf
+
+from maintenance_store import store_tersedia, connect_store, query_pivot_tahunan, baca_tabel
 
 # ==========================================
 # KONFIGURASI HALAMAN
 # ==========================================
 st.set_page_config(
-    page_title="Dashboard Maintenance 2023-2025",
+    page_title="Dashboard Maintenance",
     page_icon="🛠️",
     layout="wide"
 )
@@ -29,52 +40,84 @@ palette_bar = 'Reds_r'   # Gradasi Merah
 # ==========================================
 # FUNGSI LOAD DATA
 # ==========================================
-@st.cache_data
-def load_data():
+# `versi` (token versi data) menjadi bagian kunci cache: data baru dari ingest
+# langsung terbaca tanpa st.cache_data.clear(); hanya versi terakhir yang disimpan
+@st.cache_data(max_entries=1)
+def load_data(versi):
     try:
-        # Load Data
-        df_23 = pd.read_excel(FILE_2023)
-        df_24 = pd.read_excel(FILE_2024)
-        df_25 = pd.read_excel(FILE_2025)
+        # Jika ingest_daemon berjalan, pakai hasilnya (Arrow) tanpa membaca xlsx lagi
+        df_all = baca_ingest()
+        if df_all is None:
+            # Load Data
+            # Hanya kolom yang dipakai dashboard yang dibaca (streaming)
+            df_23 = baca_xlsx_kolom(FILE_2023)
+            df_24 = baca_xlsx_kolom(FILE_2024)
+            df_25 = baca_xlsx_kolom(FILE_2025)
+
+            df_23['SOURCE_YEAR'] = 2023
+            df_24['SOURCE_YEAR'] = 2024
+            df_25['SOURCE_YEAR'] = 2025
 
-        df_23['SOURCE_YEAR'] = 2023
-        df_24['SOURCE_YEAR'] = 2024
-        df_25['SOURCE_YEAR'] = 2025
+            df_all = pd.concat([df_23, df_24, df_25], ignore_index=True)
 
-        df_all = pd.concat([df_23, df_24, df_25], ignore_index=True)
-        return df_all, None
+        # --- DATA CLEANING ---
+        # Ikut di-cache: parsing tanggal & kanonikalisasi job hanya sekali per versi data
+        df_all['REPORT_DATE'] = parse_tanggal(df_all['JOBREPORT_DATE'])
+        df_all['YYYYMM'] = df_all['REPORT_DATE'].dt.to_period('M')
+
+        # Ambil data yang valid (sudah dikerjakan)
+        df_done = df_all.dropna(subset=['REPORT_DATE'])
+        # Variasi penulisan Job Title/Deskripsi digabung ke teks kanonik
+        df_done = tambah_semua_kanonik(df_done)
+        return df_done, None
 
     except FileNotFoundError as e:
         return None, f"File tidak ditemukan: {e}"
     except Exception as e:
         return None, f"Terjadi kesalahan: {e}"
 
+# Cache grafik (PNG) dibagi ke semua sesi; kunci memakai versi file sumber
+@st.cache_resource
+def get_chart_cache():
+    return ChartCache()
+
+# Koneksi store dibagi ke semua sesi (read-only), hanya dibuka jika store sudah dibangun
+@st.cache_resource
+def get_store():
+    return connect_store(read_only=True) if store_tersedia() else None
+
 # ==========================================
 # LOGIKA UTAMA
 # ==========================================
 st.title("🛠️ Dashboard Visualisasi Maintenance")
 st.markdown("Monitoring kinerja maintenance armada, analisis komponen, dan distribusi beban kerja.")
 
+# Versi data: nomor versi ingest, atau waktu modifikasi file sumber
+data_version = versi_data(FILE_2023, FILE_2024, FILE_2025)
+
 with st.spinner('Sedang memuat & memproses data...'):
-    df_maint, error_msg = load_data()
+    df_done, error_msg = load_data(data_version)
 
 if error_msg:
     st.error(error_msg)
     st.stop()
 
-if df_maint is not None:
-    # --- DATA CLEANING ---
-    df_maint['REPORT_DATE'] = pd.to_datetime(df_maint['JOBREPORT_DATE'], dayfirst=True, errors='coerce')
-    df_maint['YYYYMM'] = df_maint['REPORT_DATE'].dt.to_period('M')
-    
-    # Ambil data yang valid (sudah dikerjakan)
-    df_done = df_maint.dropna(subset=['REPORT_DATE'])
+if df_done is not None:
+    # Kode integer per dimensi (kapal, bulan, tahun, ...) dipakai bersama oleh heatmap & pivot
+    counts = CountMatrixBuilder(df_done)
+
+    # Grafik hanya digambar ulang jika versi data berubah (dashboard ini tanpa filter)
+    charts = get_chart_cache()
     
     # Sidebar Info
     st.sidebar.title("Info Dashboard")
     st.sidebar.info(f"Total Pekerjaan Selesai:\n**{len(df_done):,}** Job")
-    st.sidebar.caption("Periode Data: 2023 - 2025")
+    # Periode diambil dari tahun yang ada di data (tidak lagi hardcode 2023 - 2025)
+    tahun_data = counts.labels('SOURCE_YEAR')
+    st.sidebar.caption(f"Periode Data: {tahun_data[0]} - {tahun_data[-1]}")
     
+    # Data baru biasanya sudah terdeteksi lewat versi data; tombol ini tetap mengosongkan
+    # cache untuk perubahan yang tidak menaikkan versi (misal file diganti dengan mtime sama)
     if st.sidebar.button("Refresh Data"):
         st.cache_data.clear()
         st.rerun()
@@ -82,21 +125,26 @@ if df_maint is not None:
     # ==========================================
     # TABS DASHBOARD
     # ==========================================
-    tab1, tab2, tab3 = st.tabs(["📈 Tren Waktu", "📊 Dashboard Visualisasi", "📋 Tabel MTBF"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📈 Tren Waktu", "📊 Dashboard Visualisasi", "📋 Tabel MTBF", "🚨 Anomali"])
 
     # --- TAB 1: TREN WAKTU ---
     with tab1:
         st.subheader("Tren Aktivitas Maintenance Bulanan")
-        monthly_trend = df_done.groupby('YYYYMM').size()
-        monthly_trend.index = monthly_trend.index.astype(str)
-        
-        fig, ax = plt.subplots(figsize=(15, 5))
-        ax.plot(monthly_trend.index, monthly_trend.values, marker='o', color=main_color, linewidth=2.5)
-        ax.fill_between(monthly_trend.index, monthly_trend.values, color=main_color, alpha=0.1)
-        ax.set_title('Total Pekerjaan per Bulan', fontweight='bold')
-        ax.grid(True, linestyle='--', alpha=0.5)
-        plt.xticks(rotation=45)
-        st.pyplot(fig)
+
+        def chart_tren():
+            import matplotlib.pyplot as plt
+
+            monthly_trend = df_done.groupby('YYYYMM').size()
+            monthly_trend.index = monthly_trend.index.astype(str)
+            
+            fig, ax = plt.subplots(figsize=(15, 5))
+            ax.plot(monthly_trend.index, monthly_trend.values, marker='o', color=main_color, linewidth=2.5)
+            ax.fill_between(monthly_trend.index, monthly_trend.values, color=main_color, alpha=0.1)
+            ax.set_title('Total Pekerjaan per Bulan', fontweight='bold')
+            ax.grid(True, linestyle='--', alpha=0.5)
+            plt.xticks(rotation=45)
+            return fig
+        st.image(charts.matplotlib('tren_bulanan', (), data_version, chart_tren), use_container_width=True)
 
     # --- TAB 2: VISUALISASI UTAMA + TABEL TOP ---
     with tab2:
@@ -107,22 +155,34 @@ if df_maint is not None:
         
         with col1:
             st.markdown("#### 1. Top 10 Kapal Paling Sibuk Maintenance")
-            top_vessels = df_done['VESSELID'].value_counts().head(10)
-            
-            fig1, ax1 = plt.subplots(figsize=(8, 5))
-            sns.barplot(x=top_vessels.values, y=top_vessels.index, palette=palette_bar, ax=ax1)
-            ax1.set_xlabel("Jumlah Pekerjaan")
-            st.pyplot(fig1)
+
+            def chart_top_kapal():
+                import matplotlib.pyplot as plt
+                import seaborn as sns
+
+                top_vessels = df_done['VESSELID'].value_counts().head(10)
+                
+                fig1, ax1 = plt.subplots(figsize=(8, 5))
+                sns.barplot(x=top_vessels.values, y=top_vessels.index, palette=palette_bar, ax=ax1)
+                ax1.set_xlabel("Jumlah Pekerjaan")
+                return fig1
+            st.image(charts.matplotlib('top_kapal', (), data_version, chart_top_kapal), use_container_width=True)
             
         with col2:
             st.markdown("#### 2. Distribusi Tipe Frekuensi")
-            freq_dist = df_done['FREQ_TYPE'].value_counts()
-            
-            fig2, ax2 = plt.subplots(figsize=(8, 5))
-            colors = sns.color_palette(palette_bar, len(freq_dist))
-            ax2.pie(freq_dist.values, labels=freq_dist.index, autopct='%1.1f%%', startangle=90, colors=colors)
-            ax2.axis('equal')  
-            st.pyplot(fig2)
+
+            def chart_frekuensi():
+                import matplotlib.pyplot as plt
+                import seaborn as sns
+
+                freq_dist = df_done['FREQ_TYPE'].value_counts()
+                
+                fig2, ax2 = plt.subplots(figsize=(8, 5))
+                colors = sns.color_palette(palette_bar, len(freq_dist))
+                ax2.pie(freq_dist.values, labels=freq_dist.index, autopct='%1.1f%%', startangle=90, colors=colors)
+                ax2.axis('equal')  
+                return fig2
+            st.image(charts.matplotlib('distribusi_frekuensi', (), data_version, chart_frekuensi), use_container_width=True)
 
         st.divider()
 
@@ -132,36 +192,51 @@ if df_maint is not None:
         with col3:
             st.markdown("#### 3. Top 10 Maker (Pabrikan) yang Sparepartnya Sering Maintenance")
             valid_makers = df_done[~df_done['MAKERS_NAME'].isin([0, '0', '-'])] 
-            top_makers = valid_makers['MAKERS_NAME'].value_counts().head(10)
-            
-            fig3, ax3 = plt.subplots(figsize=(8, 5))
-            sns.barplot(x=top_makers.values, y=top_makers.index, palette=palette_bar, ax=ax3)
-            ax3.set_xlabel("Frekuensi Maintenance")
-            st.pyplot(fig3)
+
+            def chart_top_maker():
+                import matplotlib.pyplot as plt
+                import seaborn as sns
+
+                top_makers = valid_makers['MAKERS_NAME'].value_counts().head(10)
+                
+                fig3, ax3 = plt.subplots(figsize=(8, 5))
+                sns.barplot(x=top_makers.values, y=top_makers.index, palette=palette_bar, ax=ax3)
+                ax3.set_xlabel("Frekuensi Maintenance")
+                return fig3
+            st.image(charts.matplotlib('top_maker', (), data_version, chart_top_maker), use_container_width=True)
             
         with col4:
             st.markdown("#### 4. Top 10 Judul Pekerjaan (Job Title)")
-            top_jobs = df_done['JOBTITLE'].value_counts().head(10)
-            
-            fig4, ax4 = plt.subplots(figsize=(8, 5))
-            sns.barplot(x=top_jobs.values, y=top_jobs.index, palette=palette_bar, ax=ax4)
-            ax4.set_xlabel("Jumlah")
-            st.pyplot(fig4)
+
+            def chart_top_job():
+                import matplotlib.pyplot as plt
+                import seaborn as sns
+
+                top_jobs = df_done['JOBTITLE_KANONIK'].value_counts().head(10)
+                
+                fig4, ax4 = plt.subplots(figsize=(8, 5))
+                sns.barplot(x=top_jobs.values, y=top_jobs.index, palette=palette_bar, ax=ax4)
+                ax4.set_xlabel("Jumlah")
+                return fig4
+            st.image(charts.matplotlib('top_job', (), data_version, chart_top_job), use_container_width=True)
             
         st.divider()
         
         # ROW 3: HEATMAP (FULL WIDTH)
         st.markdown("#### 5. Heatmap Kesibukan: Kapal vs Bulan")
-        df_done['BulanNum'] = df_done['REPORT_DATE'].dt.month
-        top_15_vessels_list = df_done['VESSELID'].value_counts().head(15).index
-        df_heat = df_done[df_done['VESSELID'].isin(top_15_vessels_list)]
-        
-        heatmap_data = df_heat.pivot_table(index='VESSELID', columns='BulanNum', aggfunc='size', fill_value=0)
-        
-        fig5, ax5 = plt.subplots(figsize=(15, 6))
-        sns.heatmap(heatmap_data, cmap=cmap_heat, linewidths=.5, ax=ax5, cbar_kws={'label': 'Jumlah Job'})
-        ax5.set_xlabel("Bulan (1-12)")
-        st.pyplot(fig5)
+
+        def chart_heatmap():
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+
+            top_15_vessels_list = counts.totals('VESSELID').nlargest(15).index
+            heatmap_data = counts.pivot('VESSELID', 'month', rows=top_15_vessels_list)
+            
+            fig5, ax5 = plt.subplots(figsize=(15, 6))
+            sns.heatmap(heatmap_data, cmap=cmap_heat, linewidths=.5, ax=ax5, cbar_kws={'label': 'Jumlah Job'})
+            ax5.set_xlabel("Bulan (1-12)")
+            return fig5
+        st.image(charts.matplotlib('heatmap_kapal_bulan', (), data_version, chart_heatmap), use_container_width=True)
         
         st.divider()
 
@@ -177,8 +252,8 @@ if df_maint is not None:
         st.divider()
 
         st.markdown("##### 📝 Top 10 Deskripsi Pekerjaan (Detail)")
-        # Menggunakan JOBDESC agar lebih detail daripada JOBTITLE
-        top_desc_table = df_done['JOBDESC'].value_counts().head(10).reset_index()
+        # Menggunakan JOBDESC agar lebih detail daripada JOBTITLE (versi kanonik)
+        top_desc_table = df_done['JOBDESC_KANONIK'].value_counts().head(10).reset_index()
         top_desc_table.columns = ['Deskripsi Pekerjaan', 'Frekuensi']
         top_desc_table.index += 1
         st.dataframe(top_desc_table, use_container_width=True)
@@ -195,33 +270,70 @@ if df_maint is not None:
     with tab3:
         st.subheader("Data Analisis Komponen & MTBF")
         
-        # Hitung MTBF
-        df_mtbf = df_done.sort_values(by=['VESSELID', 'COMPNAME', 'REPORT_DATE'])
-        df_mtbf['NEXT_JOB_DATE'] = df_mtbf.groupby(['VESSELID', 'COMPNAME'])['REPORT_DATE'].shift(-1)
-        df_mtbf['DAYS_BETWEEN'] = (df_mtbf['NEXT_JOB_DATE'] - df_mtbf['REPORT_DATE']).dt.days
-        
-        mtbf_valid = df_mtbf[df_mtbf['DAYS_BETWEEN'] > 0]
-        mtbf_summary = mtbf_valid.groupby('COMPNAME')['DAYS_BETWEEN'].agg(['mean', 'count']).reset_index()
-        mtbf_summary.columns = ['COMPNAME', 'MTBF_HARI', 'TOTAL_KEJADIAN']
-        mtbf_summary['MTBF_HARI'] = mtbf_summary['MTBF_HARI'].round(1)
-        
-        # Pivot Tahunan
-        pivot_full = df_done.pivot_table(index='COMPNAME', columns='SOURCE_YEAR', aggfunc='size', fill_value=0)
-        for year in [2023, 2024, 2025]:
-            if year not in pivot_full.columns: pivot_full[year] = 0
+        store = get_store()
+        if store is not None:
+            # Agregat dihitung langsung di database (push-down)
+            mtbf_summary = baca_tabel(store, 'mtbf')
+            mtbf_jam = baca_tabel(store, 'mtbf_jam')
+            weibull = baca_tabel(store, 'weibull')
+            pivot_full = query_pivot_tahunan(store)
+        else:
+            # Hitung MTBF (kernel interval per (Kapal, Komponen), tanpa kolom sementara)
+            mtbf_summary = hitung_mtbf(df_done)
+
+            # MTBF berbasis Running Hours (jam operasi)
+            mtbf_jam = hitung_mtbf_jam(df_done)
+            weibull = tabel_weibull(df_done)
+            
+            # Pivot Tahunan
+            pivot_full = counts.pivot('COMPNAME', 'SOURCE_YEAR')
+        # Daftar tahun diambil dari data (tidak lagi hardcode 2023, 2024, 2025)
+        years = sorted(pivot_full.columns)
+        kolom_total = f"TOTAL_{len(years)}_TAHUN"
             
         pivot_full = pivot_full.reset_index()
         final_analysis = pd.merge(pivot_full, mtbf_summary, on='COMPNAME', how='left')
+        final_analysis = pd.merge(final_analysis, mtbf_jam, on='COMPNAME', how='left')
+        final_analysis = pd.merge(final_analysis, weibull[['COMPNAME', 'WEIBULL_SHAPE', 'WEIBULL_SCALE_HARI', 'POLA_KEGAGALAN']], on='COMPNAME', how='left')
         
-        final_analysis['TOTAL_3_TAHUN'] = final_analysis[2023] + final_analysis[2024] + final_analysis[2025]
+        final_analysis[kolom_total] = final_analysis[years].sum(axis=1)
         final_analysis['MTBF_HARI'] = final_analysis['MTBF_HARI'].fillna("-")
+        final_analysis['MTBF_JAM'] = final_analysis['MTBF_JAM'].fillna("-")
         
         # Ranking
-        final_analysis = final_analysis.sort_values(by='TOTAL_3_TAHUN', ascending=False)
+        final_analysis = final_analysis.sort_values(by=kolom_total, ascending=False)
         final_analysis = final_analysis.reset_index(drop=True)
         final_analysis.index = final_analysis.index + 1 
         
         st.dataframe(final_analysis, use_container_width=True)
         
         csv = final_analysis.to_csv().encode('utf-8')
-        st.download_button("📥 Download Tabel CSV", csv, "Analisis_Maintenance.csv", "text/csv")
\ No newline at end of file
+        st.download_button("📥 Download Tabel CSV", csv, "Analisis_Maintenance.csv", "text/csv")
+
+        st.divider()
+
+        # --- PELUANG RUSAK (WEIBULL) ---
+        st.markdown("##### 🎲 Peluang Rusak dalam Periode Tertentu (Weibull)")
+        st.caption("Shape < 1: kerusakan dini, ~1: acak, > 1: aus (wear-out). Interval terakhir yang belum selesai ikut dihitung sebagai data tersensor.")
+        weibull_lookup = WeibullLookup(weibull)
+        if weibull_lookup.params:
+            col_w1, col_w2, col_w3 = st.columns(3)
+            with col_w1:
+                comp_weibull = st.selectbox("Komponen:", sorted(weibull_lookup.params))
+            with col_w2:
+                umur_hari = st.number_input("Hari sejak pekerjaan terakhir:", min_value=0, value=0)
+            with col_w3:
+                horizon_hari = st.number_input("Dalam berapa hari ke depan:", min_value=1, value=30)
+            peluang = weibull_lookup.peluang_gagal(comp_weibull, umur_hari, horizon_hari)
+            st.metric(f"Peluang {comp_weibull} perlu maintenance", f"{peluang * 100:.1f}%")
+
+    # --- TAB 4: ALERT LONJAKAN MAINTENANCE ---
+    with tab4:
+        st.subheader("Lonjakan Maintenance per Kapal & Komponen")
+        # Tabel alert dihitung batch oleh anomaly_detector.py, dashboard hanya membaca hasilnya
+        df_alert = baca_alert()
+        if df_alert is None:
+            st.info("Tabel alert belum tersedia. Jalankan `python anomaly_detector.py` terlebih dahulu.")
+        else:
+            st.caption("Skor = jarak jumlah job bulan tsb dari median 12 bulan sebelumnya (robust z-score). Semakin tinggi, semakin tidak biasa.")
+            st.dataframe(df_alert, use_container_width=True)
@@ -1,6 +1,18 @@
+import os
+import time
+from importlib.util import find_spec
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+
+from shared_data import dataset_perlu_dibangun
+from parquet_store import tulis_partisi, baca_partisi, opsi_partisi, jumlah_per_kapal, path_penunjuk, versi_partisi
+from chart_cache import ChartCache, versi_file
+from xlsx_reader import baca_xlsx_kolom
+from ingest_daemon import MANIFEST_PATH, baca_ingest, versi_data
+from date_parser import parse_tanggal
+from sarimax_order import FILE_ORDER_SARIMAX, ORDER_DEFAULT, HOLDOUT, baca_order
+from backtest_engine import FILE_BACKTEST, label_akurasi, baca_metrik
 
 # --- KONFIGURASI HALAMAN ---
 st.set_page_config(
@@ -13,20 +25,24 @@ st.set_page_config(
 st.title("🚢 Vessel Maintenance Job Dashboard")
 st.markdown("Dashboard interaktif untuk memonitor laporan pekerjaan maintenance kapal tahun 2024-2025.")
 
+# --- KONFIGURASI FILE ---
+FILE_2024 = "Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2024.xlsx"
+FILE_2025 = "Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2025.xlsx"
+
 # --- FUNGSI LOAD DATA ---
-@st.cache_data
 def load_data():
-    # Path file
-    file_2024 = "Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2024.xlsx"
-    file_2025 = "Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2025.xlsx"
-    
     try:
-        # Load data
-        df1 = pd.read_excel(file_2024)
-        df2 = pd.read_excel(file_2025)
-        
-        # Gabungkan data
-        df = pd.concat([df1, df2], ignore_index=True)
+        # Hasil ingest_daemon (jika berjalan) dipakai langsung tanpa membaca xlsx
+        df = baca_ingest(tahun=[2024, 2025])
+        if df is None:
+            # Load data (hanya kolom yang dipakai dashboard, dibaca streaming)
+            df1 = baca_xlsx_kolom(FILE_2024)
+            df2 = baca_xlsx_kolom(FILE_2025)
+            
+            # Gabungkan data
+            df = pd.concat([df1, df2], ignore_index=True)
+        else:
+            df = df.drop(columns='SOURCE_YEAR')
         
         # --- DATA CLEANING ---
         # 1. Pastikan TAHUN dan BULAN adalah angka
@@ -48,8 +64,8 @@ def load_data():
         df['RH_THIS_MONTH_UNTIL_JOBDONE'] = pd.to_numeric(df['RH_THIS_MONTH_UNTIL_JOBDONE'], errors='coerce').fillna(0)
         
         # 6. Format Tanggal (PENTING UNTUK DELAY)
-        df['JOBREPORT_DATE'] = pd.to_datetime(df['JOBREPORT_DATE'], dayfirst=True, errors='coerce')
-        df['JOB_TIMESTAMP'] = pd.to_datetime(df['JOB_TIMESTAMP'], dayfirst=True, errors='coerce')
+        df['JOBREPORT_DATE'] = parse_tanggal(df['JOBREPORT_DATE'])
+        df['JOB_TIMESTAMP'] = parse_tanggal(df['JOB_TIMESTAMP'])
         
         # 7. HITUNG DELAY (Timestamp - Report Date)
         # Menghitung selisih hari antara pekerjaan dilakukan vs diinput ke sistem
@@ -64,22 +80,170 @@ def load_data():
         st.error(f"Error loading data: {e}")
         return pd.DataFrame()
 
-# Load data awal
-df = load_data()
+# --- DATASET PARQUET TERPARTISI (TAHUN / VESSELID) ---
+# Data bersih ditulis sekali sebagai dataset Parquet berpartisi. Pilihan sidebar
+# di-pushdown ke pembacaan: hanya partisi (tahun, kapal) & row group (tipe frekuensi)
+# yang cocok yang dibaca dari disk. Opsi sidebar diambil dari nama folder partisi.
+# `versi` (token versi data) membuat data baru dari ingest terbaca tanpa clear cache.
+@st.cache_resource(max_entries=1)
+def siapkan_dataset(versi):
+    """Membangun dataset jika perlu; mengembalikan opsi sidebar (tahun, kapal, tipe frekuensi)."""
+    # Dibandingkan dengan file penunjuk versi aktif (diganti setiap dataset ditulis)
+    if dataset_perlu_dibangun([FILE_2024, FILE_2025, MANIFEST_PATH], path_penunjuk()):
+        df_clean = load_data()
+        if df_clean.empty:
+            return None
+        tulis_partisi(df_clean)
+    all_years, all_vessels = opsi_partisi()
+    all_freqs = sorted(baca_partisi(columns=['FREQ_TYPE'])['FREQ_TYPE'].dropna().unique())
+    return all_years, all_vessels, all_freqs
+
+# Hasil per kombinasi filter dipakai bersama oleh semua sesi (tanpa salinan per sesi).
+# tahun / kapal / freq None = tidak difilter: tampilan default (semua) langsung
+# memory-map file Arrow versi aktif, zero-copy dan tanpa memori tambahan per filter.
+# Filter lain men-decode hanya partisi yang cocok (subset, disimpan maksimal 16).
+@st.cache_resource(max_entries=16, show_spinner=False)
+def load_filtered(versi, tahun, kapal, kecuali, freq):
+    daftar = lambda nilai: None if nilai is None else list(nilai)
+    df = baca_partisi(daftar(tahun), daftar(kapal), list(kecuali), daftar(freq))
+    # Opsi tipe frekuensi tidak memuat FREQ_TYPE kosong; "semua tipe" = semua opsi
+    if freq is None and df['FREQ_TYPE'].isna().any():
+        df = df[df['FREQ_TYPE'].notna()]
+    return df
+
+# Jumlah job per kapal untuk filter Low Activity (dari metadata Parquet saja)
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_jumlah_per_kapal(versi, tahun):
+    return jumlah_per_kapal(list(tahun))
+
+# --- FRAGMENT (RERUN PER BAGIAN) ---
+# Widget di dalam fragment (slider Top Komponen, konfigurasi forecast) hanya
+# menjalankan ulang bagiannya sendiri, bukan seluruh dashboard (KPI, grafik,
+# analisis delay, encoding CSV). DASHBOARD_FRAGMENT=0 untuk membandingkan tanpa fragment.
+USE_FRAGMENT = os.environ.get('DASHBOARD_FRAGMENT', '1') != '0'
+fragment = st.fragment if USE_FRAGMENT else (lambda func: func)
+# Log latency selalu ada di sidebar; DASHBOARD_LATENCY=1 untuk ikut mencetak ke console
+CETAK_LATENCY = os.environ.get('DASHBOARD_LATENCY', '0') != '0'
+T_MULAI = time.perf_counter()
+
+def catat_latency(label, t0):
+    """Menyimpan durasi proses (ms) ke log sesi (dan console jika CETAK_LATENCY) untuk perbandingan latency."""
+    ms = (time.perf_counter() - t0) * 1000
+    log = st.session_state.setdefault('latency_log', [])
+    log.append((label, round(ms)))
+    del log[:-20]
+    if CETAK_LATENCY:
+        print(f"[latency] {label}: {ms:.0f} ms")
+    return ms
+
+# Cache grafik (JSON Plotly) dibagi ke semua sesi, dibatasi ukurannya (LRU).
+# plotly.express di-import di dalam fungsi grafik: hit cache tidak memuat plotly.
+@st.cache_resource
+def get_chart_cache():
+    return ChartCache()
+
+# Input yang sama -> hasil yang sama: hanya dihitung ulang jika data/filter berubah
+# (_df tidak di-hash, jadi versi data wajib ikut menjadi kunci)
+@st.cache_data(max_entries=4, show_spinner=False)
+def encode_csv(_df, filter_key, data_version):
+    return _df.to_csv(index=False).encode('utf-8')
+
+# Order SARIMAX per komponen hasil `python sarimax_order.py` (dibaca ulang jika file berubah)
+@st.cache_data(max_entries=1, show_spinner=False)
+def load_order_sarimax(versi):
+    return baca_order()
+
+# Metrik backtest rolling-origin hasil `python backtest_engine.py`
+@st.cache_data(max_entries=1, show_spinner=False)
+def load_metrik_backtest(versi):
+    return baca_metrik()
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def evaluasi_backtest(ts_series, order=ORDER_DEFAULT[0], seasonal_order=ORDER_DEFAULT[1]):
+    """
+    Backtest HOLDOUT (3) bulan terakhir -> (mae, rmse, nmae). Bulan-bulan ini tidak
+    dipakai sarimax_order.py saat memilih order otomatis, jadi skornya tidak bias.
+    """
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    import numpy as np
+
+    train_data = ts_series.iloc[:-HOLDOUT]
+    test_data = ts_series.iloc[-HOLDOUT:]
+
+    train_log = np.log1p(train_data)
+
+    model_eval = SARIMAX(
+        train_log,
+        order=order,
+        seasonal_order=seasonal_order,
+        enforce_stationarity=False,
+        enforce_invertibility=False
+    )
+    fit_eval = model_eval.fit(disp=False)
+
+    fc_eval_log = fit_eval.get_forecast(steps=HOLDOUT)
+    pred_eval = np.expm1(fc_eval_log.predicted_mean)
+    pred_eval.index = test_data.index
+
+    # Error Metrics
+    mae = (test_data - pred_eval).abs().mean()
+    rmse = ((test_data - pred_eval) ** 2).mean() ** 0.5
+
+    mean_actual = test_data.mean()
+    nmae = mae / mean_actual if mean_actual != 0 else 0
+    return mae, rmse, nmae
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def ramal_sarimax(ts_series, forecast_steps, order=ORDER_DEFAULT[0], seasonal_order=ORDER_DEFAULT[1]):
+    """Model final (full data) -> DataFrame Date, Prediksi, Lower, Upper."""
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    import numpy as np
+
+    full_log = np.log1p(ts_series)
+
+    model_main = SARIMAX(
+        full_log,
+        order=order,
+        seasonal_order=seasonal_order,
+        enforce_stationarity=False,
+        enforce_invertibility=False
+    )
+    fit_main = model_main.fit(disp=False)
+
+    fc_res = fit_main.get_forecast(steps=forecast_steps)
+    pred_future = np.expm1(fc_res.predicted_mean)
+
+    conf_int_log = fc_res.conf_int()
+    lower = np.expm1(conf_int_log.iloc[:, 0])
+    upper = np.expm1(conf_int_log.iloc[:, 1])
+
+    pred_df = pd.DataFrame({
+        'Date': pred_future.index,
+        'Prediksi': pred_future.values,
+        'Lower': lower.values,
+        'Upper': upper.values
+    })
+
+    numeric_cols = ['Prediksi', 'Lower', 'Upper']
+    pred_df[numeric_cols] = pred_df[numeric_cols].clip(lower=0)
+    return pred_df
+
+# Load data awal (opsi filter; data dibaca setelah filter dipilih)
+versi = versi_data(FILE_2024, FILE_2025)
+opsi = siapkan_dataset(versi)
+
+if opsi is not None:
+    all_years, all_vessels, all_freqs = opsi
 
-if not df.empty:
     # --- SIDEBAR: FILTER ---
     st.sidebar.header("🔍 Filter Data")
     
     # 1. Filter Tahun
-    all_years = sorted(df['TAHUN'].unique())
     selected_years = st.sidebar.multiselect("Pilih Tahun", all_years, default=all_years)
     
     # --- FILTER KAPAL (ADVANCED) ---
     st.sidebar.subheader("🚢 Filter Kapal")
     
-    all_vessels = sorted(df['VESSELID'].unique().tolist())
-    
     # A. INCLUDE
     selected_vessels_include = st.sidebar.multiselect(
         "Include Kapal (Tampilkan)", 
@@ -105,7 +269,6 @@ if not df.empty:
     st.sidebar.markdown("---")
     
     # Filter Tipe Frekuensi
-    all_freqs = sorted(df['FREQ_TYPE'].unique())
     selected_freqs = st.sidebar.multiselect("Pilih Tipe Frekuensi", all_freqs, default=all_freqs)
     
     st.sidebar.markdown("---")
@@ -120,38 +283,50 @@ if not df.empty:
     if not selected_freqs: selected_freqs = all_freqs
     
     # Logic Vessel Include
+    # pushdown_kapal = None (semua kapal) atau daftar kapal yang dibaca dari disk
     if 'ALL' in selected_vessels_include or not selected_vessels_include:
         target_vessels = all_vessels
+        pushdown_kapal = None
     else:
         target_vessels = selected_vessels_include
+        pushdown_kapal = target_vessels
         
     # Logic Vessel Exclude
     if selected_vessels_exclude:
         target_vessels = [v for v in target_vessels if v not in selected_vessels_exclude]
         
-    # Logic Low Activity
-    temp_df = df[(df['TAHUN'].isin(selected_years)) & (df['VESSELID'].isin(target_vessels))]
-    
+    # Logic Low Activity (jumlah job per kapal dari metadata partisi tahun terpilih)
     if show_low_activity:
-        vessel_counts = temp_df['VESSELID'].value_counts()
+        vessel_counts = load_jumlah_per_kapal(versi, tuple(selected_years))
         num_years = len(selected_years) if len(selected_years) > 0 else 1
         threshold = 100 * num_years
         low_activity_vessels = vessel_counts[vessel_counts < threshold].index.tolist()
         target_vessels = [v for v in target_vessels if v in low_activity_vessels]
+        pushdown_kapal = target_vessels
         st.sidebar.info(f"Filter Low Activity Aktif: {len(target_vessels)} kapal.")
 
-    # Apply Final Filter
-    filtered_df = df[
-        (df['TAHUN'].isin(selected_years)) &
-        (df['VESSELID'].isin(target_vessels)) &
-        (df['FREQ_TYPE'].isin(selected_freqs))
-    ]
+    # Apply Final Filter (pushdown: hanya partisi & row group yang cocok dibaca;
+    # pilihan yang mencakup semua opsi tidak dikirim sebagai filter)
+    semua_tahun = set(selected_years) >= set(all_years)
+    semua_freq = set(selected_freqs) >= set(all_freqs)
+    filtered_df = load_filtered(
+        versi, None if semua_tahun else tuple(selected_years),
+        None if pushdown_kapal is None else tuple(pushdown_kapal),
+        tuple(selected_vessels_exclude), None if semua_freq else tuple(selected_freqs)
+    )
     
     # Filter Running Hours
-    df_analysis = filtered_df.copy()
+    # Salinan dangkal: kolom tambahan (Kategori_Delay) tidak mengubah DataFrame cache
+    # bersama, tetapi data kolom tidak disalin per rerun
+    df_analysis = filtered_df.copy(deep=False)
     if exclude_zero_rh:
         df_analysis = df_analysis[df_analysis['RH_THIS_MONTH_UNTIL_JOBDONE'] > 0]
 
+    # Kunci cache grafik: fingerprint filter + versi dataset (folder versi Parquet aktif)
+    filter_key = (tuple(selected_years), tuple(target_vessels), tuple(selected_freqs), exclude_zero_rh)
+    charts = get_chart_cache()
+    data_version = versi_partisi()
+
     # --- KPI SUMMARY ---
     kpi1, kpi2, kpi3, kpi4 = st.columns(4)
     
@@ -184,21 +359,31 @@ if not df.empty:
     with row1_col1:
         st.subheader("📈 Tren Maintenance Per Bulan")
         if not df_analysis.empty:
-            jobs_per_month = df_analysis.groupby('Month_Year').size().reset_index(name='Count').sort_values('Month_Year')
-            suffix = " (RH > 0)" if exclude_zero_rh else " (Semua)"
-            fig_trend = px.line(jobs_per_month, x='Month_Year', y='Count', markers=True, 
-                                title=f"Jumlah Job Report per Bulan{suffix}")
-            st.plotly_chart(fig_trend, use_container_width=True)
+
+            def chart_tren():
+                import plotly.express as px
+
+                jobs_per_month = df_analysis.groupby('Month_Year').size().reset_index(name='Count').sort_values('Month_Year')
+                suffix = " (RH > 0)" if exclude_zero_rh else " (Semua)"
+                fig_trend = px.line(jobs_per_month, x='Month_Year', y='Count', markers=True, 
+                                    title=f"Jumlah Job Report per Bulan{suffix}")
+                return fig_trend
+            st.plotly_chart(charts.plotly('tren_bulanan', filter_key, data_version, chart_tren), use_container_width=True)
         else:
             st.info("Tidak ada data tren.")
 
     with row1_col2:
         st.subheader("🍩 Distribusi Frekuensi")
         if not df_analysis.empty:
-            freq_counts = df_analysis['FREQ_TYPE'].value_counts().reset_index()
-            freq_counts.columns = ['Tipe', 'Jumlah']
-            fig_pie = px.pie(freq_counts, values='Jumlah', names='Tipe', hole=0.4)
-            st.plotly_chart(fig_pie, use_container_width=True)
+
+            def chart_frekuensi():
+                import plotly.express as px
+
+                freq_counts = df_analysis['FREQ_TYPE'].value_counts().reset_index()
+                freq_counts.columns = ['Tipe', 'Jumlah']
+                fig_pie = px.pie(freq_counts, values='Jumlah', names='Tipe', hole=0.4)
+                return fig_pie
+            st.plotly_chart(charts.plotly('distribusi_frekuensi', filter_key, data_version, chart_frekuensi), use_container_width=True)
         else:
             st.info("Tidak ada data.")
 
@@ -208,32 +393,48 @@ if not df.empty:
     
     col_viz_new, col_viz_right = st.columns([2, 1])
     
-    with col_viz_new:
+    @fragment
+    def tampilkan_tren_komponen(df_analysis, filter_key):
+        t0 = time.perf_counter()
         if not df_analysis.empty:
             st.write("**Tren Komponen Paling Sering Di-Maintenance:**")
             top_n = st.slider("Jumlah Top Komponen:", 3, 15, 5)
-            top_comps = df_analysis['COMPNAME'].value_counts().head(top_n).index.tolist()
-            df_trend_comp = df_analysis[df_analysis['COMPNAME'].isin(top_comps)]
-            comp_trend = df_trend_comp.groupby(['Month_Year', 'COMPNAME']).size().reset_index(name='Count').sort_values('Month_Year')
+
+            def chart_tren_komponen():
+                import plotly.express as px
+
+                top_comps = df_analysis['COMPNAME'].value_counts().head(top_n).index.tolist()
+                df_trend_comp = df_analysis[df_analysis['COMPNAME'].isin(top_comps)]
+                comp_trend = df_trend_comp.groupby(['Month_Year', 'COMPNAME']).size().reset_index(name='Count').sort_values('Month_Year')
             
-            fig_comp_trend = px.bar(
-                comp_trend, x='Month_Year', y='Count', color='COMPNAME',
-                text='Count', category_orders={'COMPNAME': top_comps} 
-            )
-            fig_comp_trend.update_traces(textposition='inside', textfont_size=10)
-            st.plotly_chart(fig_comp_trend, use_container_width=True)
+                fig_comp_trend = px.bar(
+                    comp_trend, x='Month_Year', y='Count', color='COMPNAME',
+                    text='Count', category_orders={'COMPNAME': top_comps} 
+                )
+                fig_comp_trend.update_traces(textposition='inside', textfont_size=10)
+                return fig_comp_trend
+            st.plotly_chart(charts.plotly('tren_top_komponen', (filter_key, top_n), data_version, chart_tren_komponen), use_container_width=True)
         else:
             st.info("Data kosong.")
+        catat_latency("Tren Top Komponen", t0)
+
+    with col_viz_new:
+        tampilkan_tren_komponen(df_analysis, filter_key)
 
     with col_viz_right:
         st.write("**Top 10 Komponen (Total Periode):**")
         if not df_analysis.empty:
-            top_components = df_analysis['COMPNAME'].value_counts().head(10).reset_index()
-            top_components.columns = ['Nama Komponen', 'Frekuensi']
-            fig_comp = px.bar(top_components, y='Nama Komponen', x='Frekuensi', orientation='h',
-                              text='Frekuensi', color='Frekuensi', color_continuous_scale='Reds')
-            fig_comp.update_layout(yaxis={'categoryorder':'total ascending'})
-            st.plotly_chart(fig_comp, use_container_width=True)
+
+            def chart_top_komponen():
+                import plotly.express as px
+
+                top_components = df_analysis['COMPNAME'].value_counts().head(10).reset_index()
+                top_components.columns = ['Nama Komponen', 'Frekuensi']
+                fig_comp = px.bar(top_components, y='Nama Komponen', x='Frekuensi', orientation='h',
+                                  text='Frekuensi', color='Frekuensi', color_continuous_scale='Reds')
+                fig_comp.update_layout(yaxis={'categoryorder':'total ascending'})
+                return fig_comp
+            st.plotly_chart(charts.plotly('top_komponen', filter_key, data_version, chart_top_komponen), use_container_width=True)
         else:
             st.info("Tidak ada data.")
 
@@ -247,37 +448,46 @@ if not df.empty:
         # 1. TOP KAPAL DENGAN MAINTENANCE TERBANYAK
         with col_delay1:
             st.subheader("Aktivitas Maintenance Kapal")
-            limit_vessels = 50 if show_low_activity else 15
-            top_vessels = df_analysis['VESSELID'].value_counts().head(limit_vessels).reset_index()
-            top_vessels.columns = ['Vessel ID', 'Jumlah Job']
+
+            def chart_top_kapal():
+                import plotly.express as px
+
+                limit_vessels = 50 if show_low_activity else 15
+                top_vessels = df_analysis['VESSELID'].value_counts().head(limit_vessels).reset_index()
+                top_vessels.columns = ['Vessel ID', 'Jumlah Job']
             
-            fig_vessel = px.bar(top_vessels, x='Vessel ID', y='Jumlah Job', text='Jumlah Job',
-                                color='Jumlah Job', color_continuous_scale='Blues',
-                                title="Top Kapal Berdasarkan Jumlah Laporan")
-            st.plotly_chart(fig_vessel, use_container_width=True)
+                fig_vessel = px.bar(top_vessels, x='Vessel ID', y='Jumlah Job', text='Jumlah Job',
+                                    color='Jumlah Job', color_continuous_scale='Blues',
+                                    title="Top Kapal Berdasarkan Jumlah Laporan")
+                return fig_vessel
+            st.plotly_chart(charts.plotly('top_kapal', (filter_key, show_low_activity), data_version, chart_top_kapal), use_container_width=True)
 
         # 2. TOP KAPAL PALING SERING TELAT LAPOR
         with col_delay2:
             st.subheader("Keterlambatan Pelaporan (Delay)")
             
-            # Hitung rata-rata delay per kapal
-            delay_per_vessel = df_analysis.groupby('VESSELID')['Delay_Days'].mean().reset_index()
-            # Ambil Top 15 Paling Telat
-            delay_per_vessel = delay_per_vessel.sort_values('Delay_Days', ascending=False).head(15)
-            delay_per_vessel.columns = ['Vessel ID', 'Avg Delay (Hari)']
+            def chart_delay():
+                import plotly.express as px
+
+                # Hitung rata-rata delay per kapal
+                delay_per_vessel = df_analysis.groupby('VESSELID')['Delay_Days'].mean().reset_index()
+                # Ambil Top 15 Paling Telat
+                delay_per_vessel = delay_per_vessel.sort_values('Delay_Days', ascending=False).head(15)
+                delay_per_vessel.columns = ['Vessel ID', 'Avg Delay (Hari)']
             
-            fig_delay = px.bar(
-                delay_per_vessel, 
-                x='Avg Delay (Hari)', 
-                y='Vessel ID', 
-                orientation='h',
-                color='Avg Delay (Hari)', 
-                color_continuous_scale='Reds',
-                text_auto='.1f',
-                title="Top Kapal dengan Rata-rata Delay Tertinggi"
-            )
-            fig_delay.update_layout(yaxis={'categoryorder':'total ascending'})
-            st.plotly_chart(fig_delay, use_container_width=True)
+                fig_delay = px.bar(
+                    delay_per_vessel, 
+                    x='Avg Delay (Hari)', 
+                    y='Vessel ID', 
+                    orientation='h',
+                    color='Avg Delay (Hari)', 
+                    color_continuous_scale='Reds',
+                    text_auto='.1f',
+                    title="Top Kapal dengan Rata-rata Delay Tertinggi"
+                )
+                fig_delay.update_layout(yaxis={'categoryorder':'total ascending'})
+                return fig_delay
+            st.plotly_chart(charts.plotly('delay_kapal', filter_key, data_version, chart_delay), use_container_width=True)
             
         # 3. PIE CHART KEPATUHAN
         st.markdown("---")
@@ -297,19 +507,24 @@ if not df.empty:
         col_pie_delay, col_kpi_delay = st.columns([2, 1])
         
         with col_pie_delay:
-            fig_pie_delay = px.pie(
-                delay_counts, values='Jumlah', names='Kategori',
-                title="Distribusi Ketepatan Waktu Pelaporan",
-                color='Kategori',
-                color_discrete_map={
-                    "Tepat Waktu (<24 Jam)": "green",
-                    "Telat Ringan (2-7 Hari)": "yellow",
-                    "Telat Sedang (8-30 Hari)": "orange",
-                    "Telat Berat (>30 Hari)": "red"
-                },
-                hole=0.4
-            )
-            st.plotly_chart(fig_pie_delay, use_container_width=True)
+
+            def chart_kepatuhan():
+                import plotly.express as px
+
+                fig_pie_delay = px.pie(
+                    delay_counts, values='Jumlah', names='Kategori',
+                    title="Distribusi Ketepatan Waktu Pelaporan",
+                    color='Kategori',
+                    color_discrete_map={
+                        "Tepat Waktu (<24 Jam)": "green",
+                        "Telat Ringan (2-7 Hari)": "yellow",
+                        "Telat Sedang (8-30 Hari)": "orange",
+                        "Telat Berat (>30 Hari)": "red"
+                    },
+                    hole=0.4
+                )
+                return fig_pie_delay
+            st.plotly_chart(charts.plotly('kepatuhan_pelaporan', filter_key, data_version, chart_kepatuhan), use_container_width=True)
             
         with col_kpi_delay:
             avg_delay_all = df_analysis['Delay_Days'].mean()
@@ -327,7 +542,7 @@ if not df.empty:
         show_cols = ['JOBREPORT_DATE', 'JOB_TIMESTAMP', 'Delay_Days', 'VESSELID', 'COMPNAME', 'JOBTITLE', 'RH_THIS_MONTH_UNTIL_JOBDONE']
         st.dataframe(df_analysis[show_cols], use_container_width=True)
         
-        csv = df_analysis.to_csv(index=False).encode('utf-8')
+        csv = encode_csv(df_analysis, filter_key, data_version)
         st.download_button(
             label="💾 Download Data CSV",
             data=csv,
@@ -349,17 +564,14 @@ if not df.empty:
     </div>
     """, unsafe_allow_html=True)
 
-    # Cek Library
-    try:
-        from statsmodels.tsa.statespace.sarimax import SARIMAX
-        import plotly.graph_objects as go
-        import numpy as np 
-        has_libraries = True
-    except ImportError:
+    # Cek Library (tanpa import: statsmodels baru dimuat saat forecast benar-benar dihitung)
+    has_libraries = find_spec('statsmodels') is not None
+    if not has_libraries:
         st.error("❌ Library `statsmodels` atau `numpy` belum terinstall.")
-        has_libraries = False
 
-    if has_libraries and not df_analysis.empty:
+    @fragment
+    def tampilkan_forecast(df_analysis):
+        t0 = time.perf_counter()
         col_fc1, col_fc2 = st.columns([1, 2])
         
         with col_fc1:
@@ -374,6 +586,21 @@ if not df.empty:
             else:
                 target_comp = st.selectbox("Pilih Sparepart:", valid_comps)
                 forecast_steps = st.slider("Durasi Prediksi (Bulan):", 1, 12, 6)
+                mode_order = st.radio("Order Model:", ["Otomatis (hasil pencarian)", "Default"], horizontal=True)
+
+                # Mode otomatis: order terpilih per komponen, cukup fit satu model
+                order_komponen = load_order_sarimax(versi_file(FILE_ORDER_SARIMAX))
+                if mode_order == "Default" or target_comp not in order_komponen:
+                    order, seasonal_order = ORDER_DEFAULT
+                    nama_model = 'SARIMAX_DEFAULT'
+                else:
+                    order, seasonal_order = order_komponen[target_comp]
+                    nama_model = 'SARIMAX_OTOMATIS'
+                if mode_order != "Default" and target_comp not in order_komponen:
+                    st.caption("Order otomatis belum tersedia (jalankan `python sarimax_order.py`), memakai default.")
+                st.caption(f"SARIMAX{order}{seasonal_order}")
+                if nama_model == 'SARIMAX_OTOMATIS':
+                    st.caption(f"Skor di bawah dihitung pada {HOLDOUT} bulan terakhir yang tidak dipakai saat memilih order.")
                 
                 # --- PREPROCESSING ---
                 df_ts = df_analysis[df_analysis['COMPNAME'] == target_comp].copy()
@@ -393,53 +620,11 @@ if not df.empty:
             if valid_comps and len(ts_series) >= 10: 
                 try:
                     # =========================================================
-                    # 1. BACKTESTING (3 BULAN TERAKHIR)
-                    # =========================================================
-                    train_data = ts_series.iloc[:-3]
-                    test_data = ts_series.iloc[-3:]
-
-                    train_log = np.log1p(train_data)
-
-                    model_eval = SARIMAX(
-                        train_log,
-                        order=(1, 1, 1),
-                        seasonal_order=(1, 0, 1, 12),
-                        enforce_stationarity=False,
-                        enforce_invertibility=False
-                    )
-                    fit_eval = model_eval.fit(disp=False)
-
-                    fc_eval_log = fit_eval.get_forecast(steps=3)
-                    pred_eval = np.expm1(fc_eval_log.predicted_mean)
-                    pred_eval.index = test_data.index
-
-                    # Error Metrics
-                    mae = (test_data - pred_eval).abs().mean()
-                    rmse = ((test_data - pred_eval) ** 2).mean() ** 0.5
-
-                    mean_actual = test_data.mean()
-                    nmae = mae / mean_actual if mean_actual != 0 else 0
-
-                    # =========================================================
-                    # 2. MODEL FINAL (FULL DATA)
+                    # 1-2. BACKTESTING (3 BULAN TERAKHIR) & MODEL FINAL (FULL DATA)
                     # =========================================================
-                    full_log = np.log1p(ts_series)
-
-                    model_main = SARIMAX(
-                        full_log,
-                        order=(1, 1, 1),
-                        seasonal_order=(1, 0, 1, 12),
-                        enforce_stationarity=False,
-                        enforce_invertibility=False
-                    )
-                    fit_main = model_main.fit(disp=False)
-
-                    fc_res = fit_main.get_forecast(steps=forecast_steps)
-                    pred_future = np.expm1(fc_res.predicted_mean)
-
-                    conf_int_log = fc_res.conf_int()
-                    lower = np.expm1(conf_int_log.iloc[:, 0])
-                    upper = np.expm1(conf_int_log.iloc[:, 1])
+                    # Di-cache per (komponen, filter): ganti durasi hanya menghitung ulang model final
+                    mae, rmse, nmae = evaluasi_backtest(ts_series, order, seasonal_order)
+                    pred_df = ramal_sarimax(ts_series, forecast_steps, order, seasonal_order)
 
                     # =========================================================
                     # 3. KPI AKURASI (RELATIF, BUKAN ABSOLUT)
@@ -450,29 +635,38 @@ if not df.empty:
                     col_score2.metric("RMSE", f"{rmse:.2f}")
                     col_score3.metric("NMAE", f"{nmae:.2f}", help="MAE / rata-rata aktual")
 
-                    if nmae < 0.2:
+                    # Badge dari backtest rolling (banyak cutoff) jika tersedia, selain itu holdout tunggal
+                    metrik_bt = load_metrik_backtest(versi_file(FILE_BACKTEST))
+                    bukti = pd.DataFrame() if metrik_bt is None else metrik_bt[metrik_bt['COMPNAME'] == target_comp]
+                    baris_model = bukti[bukti['MODEL'] == nama_model] if not bukti.empty else bukti
+                    nmae_badge = baris_model['NMAE'].iloc[0] if not baris_model.empty else nmae
+
+                    akurasi = label_akurasi(nmae_badge)
+                    if akurasi == 'Akurasi Tinggi':
                         st.success("✅ Akurasi Tinggi (Stabil)")
-                    elif nmae < 0.5:
+                    elif akurasi == 'Akurasi Sedang':
                         st.warning("⚠️ Akurasi Sedang (Data Fluktuatif)")
                     else:
                         st.error("❌ Akurasi Rendah (High Uncertainty)")
 
+                    if not baris_model.empty:
+                        st.caption(f"Badge: NMAE {nmae_badge:.2f} dari backtest rolling {int(baris_model['N_CUTOFF'].iloc[0])} cutoff (seluruh data).")
+                        with st.expander("📊 Perbandingan Model (Backtest Rolling)"):
+                            st.dataframe(bukti.drop(columns='COMPNAME').sort_values('NMAE'), use_container_width=True, hide_index=True)
+                            terbaik = bukti.loc[bukti['NMAE'].idxmin(), 'MODEL']
+                            if terbaik != nama_model:
+                                st.caption(f"Model dengan error terkecil untuk komponen ini: **{terbaik}**.")
+                    else:
+                        st.caption(f"Badge dari holdout {HOLDOUT} bulan (jalankan `python backtest_engine.py` untuk backtest rolling).")
+
                     # =========================================================
                     # 4. VISUALISASI
                     # =========================================================
+                    import plotly.graph_objects as go
+
                     hist_df = ts_series.reset_index()
                     hist_df.columns = ['Date', 'Count']
 
-                    pred_df = pd.DataFrame({
-                        'Date': pred_future.index,
-                        'Prediksi': pred_future.values,
-                        'Lower': lower.values,
-                        'Upper': upper.values
-                    })
-
-                    numeric_cols = ['Prediksi', 'Lower', 'Upper']
-                    pred_df[numeric_cols] = pred_df[numeric_cols].clip(lower=0)
-
                     fig_arima = go.Figure()
 
                     fig_arima.add_trace(go.Scatter(
@@ -524,6 +718,15 @@ if not df.empty:
                 st.warning("⚠️ Data historis kurang dari 10 bulan. Prediksi tidak akurat.")
             else:
                 st.info("👈 Pilih komponen di menu sebelah kiri.")
+        catat_latency("Forecast", t0)
+
+    if has_libraries and not df_analysis.empty:
+        tampilkan_forecast(df_analysis)
+
+    catat_latency("Full rerun", T_MULAI)
+    with st.sidebar.expander("⏱️ Latency Interaksi"):
+        st.caption("Fragment aktif" if USE_FRAGMENT else "Fragment nonaktif (setiap widget = full rerun)")
+        st.dataframe(pd.DataFrame(st.session_state['latency_log'][::-1], columns=['Bagian', 'ms']), use_container_width=True)
 else:
     st.warning("⚠️ Data belum dimuat. Pastikan file Excel tersedia di folder yang benar.")
 
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from date_parser import parse_tanggal
+from job_canonical import tambah_semua_kanonik
+from interval_kernel import statistik_interval
+from xlsx_reader import KOLOM_JOB_REPORT, baca_xlsx_kolom
+
+# ==========================================
+# KONFIGURASI FILE
+# ==========================================
+# Sesuaikan path file Anda di sini
+FILE_MAINT = {
+    2023: 'Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2023.xlsx',
+    2024: 'Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2024.xlsx',
+    2025: 'Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2025.xlsx',
+}
+FILE_MASTER_BARANG = 'Master_Barang_Rapih_V3.csv'
+
+# ==========================================
+# 1. LOAD DATA MAINTENANCE
+# ==========================================
+def load_job_reports(files=None, columns=KOLOM_JOB_REPORT):
+    """
+    Membaca semua file Job Report lalu menggabungkannya menjadi satu "Data Induk".
+    Setiap baris diberi tanda SOURCE_YEAR sesuai file asalnya.
+    Hanya kolom `columns` yang dibaca (streaming); columns=None membaca semua kolom.
+    """
+    files = files or FILE_MAINT
+
+    frames = []
+    for year, path in files.items():
+        df = pd.read_excel(path) if columns is None else baca_xlsx_kolom(path, columns)
+        df['SOURCE_YEAR'] = year
+        frames.append(df)
+
+    return pd.concat(frames, ignore_index=True)
+
+# ==========================================
+# 2. CLEANING & PREPARATION
+# ==========================================
+def clean_job_reports(df_maint):
+    """
+    Menambahkan kolom REPORT_DATE & YYYYMM, lalu hanya mengambil
+    pekerjaan yang sudah selesai (memiliki tanggal laporan).
+    JOBTITLE/JOBDESC diberi versi kanonik (<kolom>_KANONIK, <kolom>_ID).
+    """
+    df_maint['REPORT_DATE'] = parse_tanggal(df_maint['JOBREPORT_DATE'])
+    df_maint['YYYYMM'] = df_maint['REPORT_DATE'].dt.to_period('M')
+
+    df_done = df_maint.dropna(subset=['REPORT_DATE'])
+    return tambah_semua_kanonik(df_done)
+
+# ==========================================
+# 3. HITUNG MTBF (Mean Time Between Failures)
+# ==========================================
+def hitung_mtbf(df_done, by='COMPNAME'):
+    """
+    Rata-rata selisih hari antar pekerjaan per (Kapal, Komponen),
+    diringkas per COMPNAME (atau per kolom `by` lain, misal ['VESSELID', 'COMPNAME']).
+    Selisih <= 0 (input tanggal salah) diabaikan.
+    """
+    # Jumlah & banyak selisih hari per (Kapal, Komponen) dari kernel interval (tanpa kolom sementara)
+    return ringkas_mtbf(statistik_interval(df_done), by)
+
+
+def ringkas_mtbf(stat, by='COMPNAME'):
+    """MTBF dari tabel statistik_interval (JUMLAH_HARI & TOTAL_KEJADIAN per Kapal, Komponen)."""
+    by = [by] if isinstance(by, str) else list(by)
+    stat = stat[stat['TOTAL_KEJADIAN'] > 0]
+
+    mtbf_summary = stat.groupby(by)[['JUMLAH_HARI', 'TOTAL_KEJADIAN']].sum().reset_index()
+    mtbf_summary['MTBF_HARI'] = (mtbf_summary['JUMLAH_HARI'] / mtbf_summary['TOTAL_KEJADIAN']).round(1)
+
+    return mtbf_summary[by + ['MTBF_HARI', 'TOTAL_KEJADIAN']]
@@ -1,6 +1,15 @@
+import os
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from count_matrix import CountMatrixBuilder
+from date_parser import parse_tanggal
+from xlsx_reader import baca_xlsx_kolom
+from trend_engine import TrendEngine, KOLOM_TREN
+
+# Grafik tren (dan import matplotlib) hanya saat TAMPILKAN_GRAFIK aktif.
+# MAINT_GRAFIK=0 untuk run batch tanpa jendela grafik.
+TAMPILKAN_GRAFIK = os.environ.get('MAINT_GRAFIK', '1') != '0'
 
 # ==========================================
 # 1. LOAD DATA DARI 3 TAHUN
@@ -9,9 +18,9 @@ print("Sedang memuat data...")
 try:
     # Membaca file sesuai path yang Anda berikan
     # Pastikan file excel ada di folder 'Magang Sparepart 2025'
-    df_2023 = pd.read_excel('Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2023.xlsx')
-    df_2024 = pd.read_excel('Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2024.xlsx')
-    df_2025 = pd.read_excel('Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2025.xlsx') 
+    df_2023 = baca_xlsx_kolom('Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2023.xlsx')
+    df_2024 = baca_xlsx_kolom('Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2024.xlsx')
+    df_2025 = baca_xlsx_kolom('Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2025.xlsx') 
     
     # Beri tanda tahun untuk identifikasi
     df_2023['SOURCE_YEAR'] = 2023
@@ -31,7 +40,7 @@ except FileNotFoundError as e:
 # 2. DATA CLEANING & PREPARATION
 # ==========================================
 # Konversi Tanggal Laporan ke format DateTime
-df_all['REPORT_DATE'] = pd.to_datetime(df_all['JOBREPORT_DATE'], dayfirst=True, errors='coerce')
+df_all['REPORT_DATE'] = parse_tanggal(df_all['JOBREPORT_DATE'])
 
 # Buat kolom Bulan-Tahun untuk plot grafik (Contoh: 2023-01)
 df_all['YYYYMM'] = df_all['REPORT_DATE'].dt.to_period('M')
@@ -42,17 +51,20 @@ df_done = df_all.dropna(subset=['REPORT_DATE'])
 # ==========================================
 # 3. VISUALISASI TREN BULANAN (Grafik)
 # ==========================================
-print("Membuat grafik tren...")
-monthly_trend = df_done.groupby('YYYYMM').size()
-
-plt.figure(figsize=(15, 6))
-monthly_trend.plot(kind='line', marker='o', color='b', linewidth=2)
-plt.title('Tren Total Pekerjaan Maintenance (2023-2025)', fontsize=14)
-plt.xlabel('Bulan', fontsize=12)
-plt.ylabel('Jumlah Pekerjaan', fontsize=12)
-plt.grid(True, linestyle='--', alpha=0.7)
-plt.tight_layout()
-plt.show() # Jendela grafik akan muncul
+if TAMPILKAN_GRAFIK:
+    import matplotlib.pyplot as plt
+
+    print("Membuat grafik tren...")
+    monthly_trend = df_done.groupby('YYYYMM').size()
+
+    plt.figure(figsize=(15, 6))
+    monthly_trend.plot(kind='line', marker='o', color='b', linewidth=2)
+    plt.title('Tren Total Pekerjaan Maintenance (2023-2025)', fontsize=14)
+    plt.xlabel('Bulan', fontsize=12)
+    plt.ylabel('Jumlah Pekerjaan', fontsize=12)
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.show() # Jendela grafik akan muncul
 
 # ==========================================
 # 4. ANALISIS FULL KOMPONEN & EXPORT CSV
@@ -60,23 +72,31 @@ plt.show() # Jendela grafik akan muncul
 print("\nMenghitung statistik untuk SEMUA komponen...")
 
 # Pivot table: Menjadikan Tahun sebagai kolom, Nama Komponen sebagai baris
-# aggfunc='size' menghitung frekuensi kemunculan
-pivot_full = df_done.pivot_table(index='COMPNAME', columns='SOURCE_YEAR', aggfunc='size', fill_value=0)
-
-# Pastikan kolom tahun 2023, 2024, 2025 ada (untuk menghindari error jika data kosong)
-for year in [2023, 2024, 2025]:
-    if year not in pivot_full.columns:
-        pivot_full[year] = 0
+# (matriks hitungan frekuensi kemunculan, setara pivot_table aggfunc='size')
+counts = CountMatrixBuilder(df_done)
+pivot_full = counts.pivot('COMPNAME', 'SOURCE_YEAR')
+
+# Daftar tahun diambil dari data (tidak lagi hardcode 2023, 2024, 2025)
+years = sorted(pivot_full.columns)
+tahun_ini = years[-1]
+# Label periode & nama kolom total mengikuti tahun yang ada di data (misal 2023-2025, TOTAL_3_TAHUN)
+periode = f"{years[0]}-{years[-1]}"
+kolom_total = f"TOTAL_{len(years)}_TAHUN"
+
+# Tren dari matriks bulanan: periode yang sama tahun lalu (YoY), 12 bulan berjalan & slope.
+# Tahun berjalan yang belum lengkap tidak lagi membuat semua komponen tampak "TURUN".
+trend = TrendEngine.from_builder(counts, 'COMPNAME')
+print(f"Periode pembanding tren: {trend.periode_yoy()}")
 
 # Hitung Statistik Tambahan
-pivot_full['TOTAL_3_TAHUN'] = pivot_full[2023] + pivot_full[2024] + pivot_full[2025]
-pivot_full['TREN_24_vs_25'] = pivot_full[2025] - pivot_full[2024] # Positif berarti naik, Negatif berarti turun
+pivot_full[kolom_total] = pivot_full[years].sum(axis=1)
+pivot_full = pivot_full.join(trend.summary()[KOLOM_TREN]) # TREN_YOY positif berarti naik, negatif berarti turun
 
 # Urutkan data dari yang paling sering dimaintenance (High Frequency)
-pivot_full = pivot_full.sort_values(by='TOTAL_3_TAHUN', ascending=False)
+pivot_full = pivot_full.sort_values(by=kolom_total, ascending=False)
 
 # Simpan hasil lengkap ke CSV
-output_filename = 'Analisis_Maintenance_Lengkap_2023-2025.csv'
+output_filename = f'Analisis_Maintenance_Lengkap_{periode}.csv'
 pivot_full.to_csv(output_filename)
 print(f"[-] Data lengkap berhasil disimpan ke file: {output_filename}")
 
@@ -84,9 +104,9 @@ print(f"[-] Data lengkap berhasil disimpan ke file: {output_filename}")
 # 5. INSIGHT & REKOMENDASI (Console Output)
 # ==========================================
 print("\n" + "="*50)
-print("TOP 10 KOMPONEN PALING SERING MAINTENANCE (2023-2025)")
+print(f"TOP 10 KOMPONEN PALING SERING MAINTENANCE ({periode})")
 print("="*50)
-print(pivot_full[[2023, 2024, 2025, 'TOTAL_3_TAHUN', 'TREN_24_vs_25']].head(10))
+print(pivot_full[years + [kolom_total] + KOLOM_TREN].head(10))
 
 print("\n" + "="*50)
 print("REKOMENDASI FORECASTING (Berdasarkan Top 20 Item)")
@@ -96,18 +116,19 @@ print("="*50)
 top_20_items = pivot_full.head(20)
 
 for component_name, row in top_20_items.iterrows():
-    diff = row['TREN_24_vs_25']
-    total_2025 = row[2025]
+    # TREN_YOY berupa float (periode tahun lalu diprorata); jangan dipotong int() agar tanda sama dengan STATUS_TREN
+    diff = row['TREN_YOY']
+    total_tahun_ini = int(row[tahun_ini])
     
     if diff > 0:
         # Jika tren naik
         print(f"[NAIK] {component_name}")
-        print(f"   -> Aktivitas naik +{diff} job dibanding tahun lalu.")
-        print(f"   -> Total 2025: {total_2025} job. SARAN: Tingkatkan stok sparepart terkait.")
+        print(f"   -> Aktivitas naik +{diff:g} job dibanding periode yang sama tahun lalu.")
+        print(f"   -> Total {tahun_ini}: {total_tahun_ini} job. SARAN: Tingkatkan stok sparepart terkait.")
     elif diff < 0:
         # Jika tren turun
         print(f"[TURUN] {component_name}")
-        print(f"   -> Aktivitas turun {diff} job. (Cenderung aman/stabil)")
+        print(f"   -> Aktivitas turun {diff:g} job. (Cenderung aman/stabil)")
     else:
-        print(f"[STABIL] {component_name} (Aktivitas sama dengan tahun lalu)")
+        print(f"[STABIL] {component_name} (Aktivitas sama dengan periode yang sama tahun lalu)")
     print("-" * 30)
\ No newline at end of file
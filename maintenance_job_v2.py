@@ -1,7 +1,14 @@
+import os
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import re
+
+from count_matrix import CountMatrixBuilder
+from date_parser import parse_tanggal
+from xlsx_reader import baca_xlsx_kolom
+from part_recommender import PartRecommender
+from trend_engine import TrendEngine, KOLOM_TREN
+from maintenance_store import store_tersedia, connect_store, simpan_tabel
+from maintenance_data import hitung_mtbf
 
 # ==========================================
 # KONFIGURASI FILE
@@ -11,15 +18,18 @@ FILE_MAINT_2023 = 'Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSE
 FILE_MAINT_2024 = 'Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2024.xlsx'
 FILE_MAINT_2025 = 'Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2025.xlsx'
 FILE_MASTER_BARANG = 'Master_Barang_Rapih_V3.csv' # File hasil olahan sebelumnya
+# Grafik tren (dan import matplotlib) hanya saat TAMPILKAN_GRAFIK aktif.
+# MAINT_GRAFIK=0 untuk run batch tanpa jendela grafik.
+TAMPILKAN_GRAFIK = os.environ.get('MAINT_GRAFIK', '1') != '0'
 
 # ==========================================
 # 1. LOAD DATA MAINTENANCE (3 TAHUN)
 # ==========================================
 print("\n--- [1] MEMUAT DATA MAINTENANCE ---")
 try:
-    df_2023 = pd.read_excel(FILE_MAINT_2023)
-    df_2024 = pd.read_excel(FILE_MAINT_2024)
-    df_2025 = pd.read_excel(FILE_MAINT_2025)
+    df_2023 = baca_xlsx_kolom(FILE_MAINT_2023)
+    df_2024 = baca_xlsx_kolom(FILE_MAINT_2024)
+    df_2025 = baca_xlsx_kolom(FILE_MAINT_2025)
     
     df_2023['SOURCE_YEAR'] = 2023
     df_2024['SOURCE_YEAR'] = 2024
@@ -49,7 +59,7 @@ except FileNotFoundError:
 # ==========================================
 # 3. CLEANING & PREPARATION
 # ==========================================
-df_maint['REPORT_DATE'] = pd.to_datetime(df_maint['JOBREPORT_DATE'], dayfirst=True, errors='coerce')
+df_maint['REPORT_DATE'] = parse_tanggal(df_maint['JOBREPORT_DATE'])
 df_maint['YYYYMM'] = df_maint['REPORT_DATE'].dt.to_period('M')
 
 # Hanya ambil pekerjaan yang sudah selesai
@@ -60,19 +70,9 @@ df_done = df_maint.dropna(subset=['REPORT_DATE'])
 # ==========================================
 print("\n--- [3] MENGHITUNG MTBF (UMUR PAKAI KOMPONEN) ---")
 
-# Urutkan data berdasarkan Kapal -> Nama Komponen -> Tanggal Laporan
-df_mtbf = df_done.sort_values(by=['VESSELID', 'COMPNAME', 'REPORT_DATE'])
-
-# Hitung selisih hari dengan pekerjaan berikutnya (Shift -1)
-df_mtbf['NEXT_JOB_DATE'] = df_mtbf.groupby(['VESSELID', 'COMPNAME'])['REPORT_DATE'].shift(-1)
-df_mtbf['DAYS_BETWEEN'] = (df_mtbf['NEXT_JOB_DATE'] - df_mtbf['REPORT_DATE']).dt.days
-
-# Hitung Rata-rata MTBF per Komponen (Diabaikan jika minus/error)
-# Kita filter yang > 0 (jika ada input tanggal salah)
-mtbf_valid = df_mtbf[df_mtbf['DAYS_BETWEEN'] > 0]
-mtbf_summary = mtbf_valid.groupby('COMPNAME')['DAYS_BETWEEN'].agg(['mean', 'count']).reset_index()
-mtbf_summary.columns = ['COMPNAME', 'MTBF_HARI', 'TOTAL_KEJADIAN']
-mtbf_summary['MTBF_HARI'] = mtbf_summary['MTBF_HARI'].round(1)
+# Selisih hari antar pekerjaan per (Kapal, Komponen) dihitung kernel interval dalam satu jalan
+# (data terurut + offset grup), selisih <= 0 (input tanggal salah) diabaikan
+mtbf_summary = hitung_mtbf(df_done)
 
 print("MTBF Selesai dihitung. Contoh:")
 print(mtbf_summary.head(3))
@@ -81,57 +81,35 @@ print(mtbf_summary.head(3))
 # 5. ANALISIS TREN (PIVOT 3 TAHUN)
 # ==========================================
 print("\n--- [4] MENGHITUNG TREN TAHUNAN ---")
-pivot_full = df_done.pivot_table(index='COMPNAME', columns='SOURCE_YEAR', aggfunc='size', fill_value=0)
+counts = CountMatrixBuilder(df_done)
+pivot_full = counts.pivot('COMPNAME', 'SOURCE_YEAR')
 
-for year in [2023, 2024, 2025]:
-    if year not in pivot_full.columns: pivot_full[year] = 0
+# Daftar tahun diambil dari data (tidak lagi hardcode 2023, 2024, 2025)
+years = sorted(pivot_full.columns)
+tahun_ini = years[-1]
+
+# Hitung Tren (YoY periode yang sama, 12 bulan berjalan & slope dari matriks bulanan)
+trend = TrendEngine.from_builder(counts, 'COMPNAME')
+print(f"Periode pembanding tren: {trend.periode_yoy()}")
+pivot_full = pivot_full.join(trend.summary()[KOLOM_TREN])
 
 # Gabungkan dengan Data MTBF
 pivot_full = pivot_full.reset_index()
 final_analysis = pd.merge(pivot_full, mtbf_summary, on='COMPNAME', how='left')
-
-# Hitung Tren
-final_analysis['TREN_24_vs_25'] = final_analysis[2025] - final_analysis[2024]
-final_analysis = final_analysis.sort_values(by=2025, ascending=False)
+final_analysis = final_analysis.sort_values(by=tahun_ini, ascending=False)
 
 # ==========================================
 # 6. FUNGSI PENCARI SPAREPART (MERGE LOGIC)
 # ==========================================
+# Pencarian per kata kunci di-cache oleh PartRecommender (lihat part_recommender.py)
+recommender = PartRecommender(df_inventory)
+
 def cari_sparepart_rekomendasi(nama_komponen):
     """
     Mencari sparepart di Master Barang berdasarkan kata kunci dari Nama Komponen.
     Contoh: Komponen "Seawater Pump" -> Cari "SEAWATER" dan "PUMP" di Inventory.
     """
-    if pd.isna(nama_komponen): return "Tidak ditemukan"
-    
-    # Bersihkan nama komponen (Hapus #1, No.2, dll)
-    keywords = re.findall(r'[a-zA-Z]{3,}', str(nama_komponen).upper())
-    # Hapus kata umum yang tidak berguna untuk pencarian
-    stop_words = ['THE', 'FOR', 'AND', 'UNIT', 'SET', 'KIT', 'ASSY', 'MAIN', 'AUX', 'NO']
-    keywords = [k for k in keywords if k not in stop_words]
-    
-    if not keywords: return "Keyword tidak jelas"
-    
-    # Cari di inventory yang mengandung SALAH SATU keyword utama (Prioritas kata terakhir biasanya nama alat, misal 'PUMP')
-    # Kita ambil max 3 rekomendasi teratas
-    matches = []
-    
-    # Strategi: Cari yang mengandung kata paling spesifik (biasanya kata benda terakhir, misal PUMP atau ENGINE)
-    search_term = keywords[-1] if keywords else ""
-    
-    if search_term:
-        # Cari di kolom NAMA_BARANG_RAPIH
-        hasil = df_inventory[df_inventory['NAMA_BARANG_RAPIH'].str.contains(search_term, case=False, na=False)]
-        
-        if not hasil.empty:
-            # Ambil 3 part number unik
-            top_parts = hasil[['NAMA_BARANG_RAPIH', 'PART_NO']].head(3)
-            for _, row in top_parts.iterrows():
-                pn = row['PART_NO'] if pd.notna(row['PART_NO']) else "No P/N"
-                nama = row['NAMA_BARANG_RAPIH'][:30] # Potong biar gak kepanjangan
-                matches.append(f"{nama} ({pn})")
-    
-    return " | ".join(matches) if matches else "Tidak ada match di Inventory"
+    return recommender.rekomendasi_teks(nama_komponen)
 
 # ==========================================
 # 7. GENERATE LAPORAN LENGKAP
@@ -139,7 +117,7 @@ def cari_sparepart_rekomendasi(nama_komponen):
 print("\n--- [5] MENYUSUN REKOMENDASI FORECASTING & STOK ---")
 
 print("="*80)
-print(f"{'KOMPONEN':<30} | {'TREN 25':<8} | {'MTBF (HARI)':<12} | {'REKOMENDASI STOK (PART NUMBER)':<40}")
+print(f"{'KOMPONEN':<30} | {'TREN YOY':<8} | {'MTBF (HARI)':<12} | {'REKOMENDASI STOK (PART NUMBER)':<40}")
 print("="*80)
 
 # Ambil Top 15 Komponen yang Tren-nya NAIK atau SANGAT SERING dirawat
@@ -149,7 +127,7 @@ export_data = []
 
 for index, row in top_action_items.iterrows():
     comp = row['COMPNAME']
-    tren = row['TREN_24_vs_25']
+    tren = row['TREN_YOY']
     mtbf = row['MTBF_HARI']
     
     # Logika Pencarian Sparepart
@@ -157,8 +135,8 @@ for index, row in top_action_items.iterrows():
     
     # Logika Status
     status_text = "STABIL"
-    if tren > 0: status_text = f"NAIK (+{tren})"
-    elif tren < 0: status_text = f"TURUN ({tren})"
+    if tren > 0: status_text = f"NAIK (+{tren:g})"
+    elif tren < 0: status_text = f"TURUN ({tren:g})"
     
     # Tampilkan di Layar
     print(f"{str(comp)[:30]:<30} | {status_text:<8} | {str(mtbf):<12} | {sparepart_info}")
@@ -166,8 +144,8 @@ for index, row in top_action_items.iterrows():
     # Simpan untuk Excel
     export_data.append({
         'Nama Komponen': comp,
-        'Total Job 2025': row[2025],
-        'Tren vs 2024': status_text,
+        f'Total Job {tahun_ini}': row[tahun_ini],
+        f'Tren ({trend.periode_yoy()})': status_text,
         'Rata-rata MTBF (Hari)': mtbf,
         'Estimasi Order Berikutnya': f"Setiap {mtbf} Hari" if mtbf > 0 else "Tidak Terprediksi",
         'Rekomendasi Part Number': sparepart_info
@@ -179,16 +157,25 @@ for index, row in top_action_items.iterrows():
 df_export = pd.DataFrame(export_data)
 filename = "Laporan_Forecasting_MTBF_Sparepart.csv"
 df_export.to_csv(filename, index=False)
+
+# Simpan juga ke store (jika sudah dibangun) agar dashboard tidak perlu membaca CSV
+if store_tersedia():
+    conn = connect_store()
+    simpan_tabel(conn, 'forecast', df_export, {'idx_forecast_comp': ['Nama Komponen']})
+    conn.close()
 print("\n" + "="*80)
 print(f"Laporan lengkap dengan MTBF & Rekomendasi Part Number disimpan di: {filename}")
 
 # ==========================================
 # 9. VISUALISASI TREN BULANAN (OPSIONAL)
 # ==========================================
-monthly_trend = df_done.groupby('YYYYMM').size()
-plt.figure(figsize=(12, 5))
-monthly_trend.plot(kind='line', marker='o', color='green')
-plt.title('Tren Aktivitas Maintenance (2023-2025)')
-plt.grid(True, linestyle='--')
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+if TAMPILKAN_GRAFIK:
+    import matplotlib.pyplot as plt
+
+    monthly_trend = df_done.groupby('YYYYMM').size()
+    plt.figure(figsize=(12, 5))
+    monthly_trend.plot(kind='line', marker='o', color='green')
+    plt.title('Tren Aktivitas Maintenance (2023-2025)')
+    plt.grid(True, linestyle='--')
+    plt.tight_layout()
+    plt.show()
\ No newline at end of file
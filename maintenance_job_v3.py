@@ -1,80 +1,96 @@
+import os
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-# ==========================================
-# KONFIGURASI FILE
-# ==========================================
-# Sesuaikan path file Anda di sini
-FILE_MAINT_2023 = 'Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2023.xlsx'
-FILE_MAINT_2024 = 'Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2024.xlsx'
-FILE_MAINT_2025 = 'Magang Sparepart 2025/Maintenance Job Report ALL ACTIVE VESSEL 2025.xlsx'
+from count_matrix import CountMatrixBuilder
+from trend_engine import TrendEngine, KOLOM_TREN
+from maintenance_data import load_job_reports, clean_job_reports, hitung_mtbf
+from reliability import hitung_mtbf_jam
+from maintenance_store import store_tersedia, connect_store, query_tren_bulanan, query_pivot_tahunan, query_bulanan_komponen, query_tanggal_akhir, baca_tabel
 
 # ==========================================
 # 1. LOAD DATA MAINTENANCE (3 TAHUN)
 # ==========================================
-print("\n--- [1] MEMUAT DATA MAINTENANCE ---")
-try:
-    df_2023 = pd.read_excel(FILE_MAINT_2023)
-    df_2024 = pd.read_excel(FILE_MAINT_2024)
-    df_2025 = pd.read_excel(FILE_MAINT_2025)
-    
-    df_2023['SOURCE_YEAR'] = 2023
-    df_2024['SOURCE_YEAR'] = 2024
-    df_2025['SOURCE_YEAR'] = 2025
+# Jika store (python maintenance_store.py) sudah dibangun, agregat diambil langsung
+# dari database tanpa memuat ulang seluruh file Excel.
+USE_STORE = store_tersedia()
+
+# Histori yang lebih besar dari RAM: MAINT_OUT_OF_CORE=1 membaca Excel per blok dan
+# hanya menyimpan agregat (chunked_pipeline.py). Dipakai jika store belum dibangun.
+OUT_OF_CORE = os.environ.get('MAINT_OUT_OF_CORE', '0') != '0' and not USE_STORE
 
-    df_maint = pd.concat([df_2023, df_2024, df_2025], ignore_index=True)
-    print(f"Sukses! Total Data Maintenance: {len(df_maint):,} baris.")
+# Grafik tren (dan import matplotlib) hanya saat TAMPILKAN_GRAFIK aktif.
+# MAINT_GRAFIK=0 untuk run batch tanpa jendela grafik.
+TAMPILKAN_GRAFIK = os.environ.get('MAINT_GRAFIK', '1') != '0'
 
-except FileNotFoundError:
-    print("Error: File maintenance tidak ditemukan. Cek path file dan nama folder.")
-    exit()
+print("\n--- [1] MEMUAT DATA MAINTENANCE ---")
+if USE_STORE:
+    conn = connect_store(read_only=True)
+    print("Store ditemukan! Agregat dihitung langsung di database.")
+elif OUT_OF_CORE:
+    # Import di sini: pyarrow & modul out-of-core hanya dibutuhkan di mode ini
+    from chunked_pipeline import jalankan_out_of_core
+    try:
+        hasil_ooc = jalankan_out_of_core()
+        print(f"Sukses (out-of-core)! Total Data Maintenance: {hasil_ooc['n_baris']:,} baris.")
+
+    except FileNotFoundError:
+        print("Error: File maintenance tidak ditemukan. Cek path file dan nama folder.")
+        exit()
+else:
+    try:
+        df_maint = load_job_reports()
+        print(f"Sukses! Total Data Maintenance: {len(df_maint):,} baris.")
+
+    except FileNotFoundError:
+        print("Error: File maintenance tidak ditemukan. Cek path file dan nama folder.")
+        exit()
 
 # ==========================================
 # 2. CLEANING & PREPARATION
 # ==========================================
-# Konversi Tanggal Laporan ke format DateTime
-df_maint['REPORT_DATE'] = pd.to_datetime(df_maint['JOBREPORT_DATE'], dayfirst=True, errors='coerce')
-
-# Buat kolom Bulan-Tahun untuk plot grafik (Contoh: 2023-01)
-df_maint['YYYYMM'] = df_maint['REPORT_DATE'].dt.to_period('M')
-
 # Hanya ambil pekerjaan yang sudah selesai (memiliki tanggal laporan)
-df_done = df_maint.dropna(subset=['REPORT_DATE'])
+if not USE_STORE and not OUT_OF_CORE:
+    df_done = clean_job_reports(df_maint)
 
 # ==========================================
 # 3. VISUALISASI TREN BULANAN (GRAFIK)
 # ==========================================
-print("\n--- [2] MEMBUAT GRAFIK TREN ---")
-monthly_trend = df_done.groupby('YYYYMM').size()
-
-plt.figure(figsize=(15, 6))
-monthly_trend.plot(kind='line', marker='o', color='b', linewidth=2)
-plt.title('Tren Total Pekerjaan Maintenance (2023-2025)', fontsize=14)
-plt.xlabel('Bulan', fontsize=12)
-plt.ylabel('Jumlah Pekerjaan', fontsize=12)
-plt.grid(True, linestyle='--', alpha=0.7)
-plt.tight_layout()
-plt.show() # Jendela grafik akan muncul
+if TAMPILKAN_GRAFIK:
+    import matplotlib.pyplot as plt
+
+    print("\n--- [2] MEMBUAT GRAFIK TREN ---")
+    if USE_STORE:
+        monthly_trend = query_tren_bulanan(conn)
+    elif OUT_OF_CORE:
+        monthly_trend = hasil_ooc['tren_bulanan']
+    else:
+        monthly_trend = df_done.groupby('YYYYMM').size()
+
+    plt.figure(figsize=(15, 6))
+    monthly_trend.plot(kind='line', marker='o', color='b', linewidth=2)
+    plt.title('Tren Total Pekerjaan Maintenance (2023-2025)', fontsize=14)
+    plt.xlabel('Bulan', fontsize=12)
+    plt.ylabel('Jumlah Pekerjaan', fontsize=12)
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.show() # Jendela grafik akan muncul
 
 # ==========================================
 # 4. HITUNG MTBF (Mean Time Between Failures)
 # ==========================================
 print("\n--- [3] MENGHITUNG MTBF (UMUR PAKAI KOMPONEN) ---")
 
-# Urutkan data berdasarkan Kapal -> Nama Komponen -> Tanggal Laporan
-df_mtbf = df_done.sort_values(by=['VESSELID', 'COMPNAME', 'REPORT_DATE'])
-
-# Hitung selisih hari dengan pekerjaan berikutnya (Shift -1)
-df_mtbf['NEXT_JOB_DATE'] = df_mtbf.groupby(['VESSELID', 'COMPNAME'])['REPORT_DATE'].shift(-1)
-df_mtbf['DAYS_BETWEEN'] = (df_mtbf['NEXT_JOB_DATE'] - df_mtbf['REPORT_DATE']).dt.days
-
-# Hitung Rata-rata MTBF per Komponen (Diabaikan jika minus/error)
-# Kita filter yang > 0
-mtbf_valid = df_mtbf[df_mtbf['DAYS_BETWEEN'] > 0]
-mtbf_summary = mtbf_valid.groupby('COMPNAME')['DAYS_BETWEEN'].agg(['mean', 'count']).reset_index()
-mtbf_summary.columns = ['COMPNAME', 'MTBF_HARI', 'TOTAL_KEJADIAN_MTBF']
-mtbf_summary['MTBF_HARI'] = mtbf_summary['MTBF_HARI'].round(1)
+# MTBF = rata-rata selisih hari antar pekerjaan per (Kapal, Komponen), diringkas per komponen
+# MTBF berbasis pemakaian (selisih Running Hours antar pekerjaan), relevan untuk mesin & generator
+if USE_STORE:
+    mtbf_summary, mtbf_jam = baca_tabel(conn, 'mtbf'), baca_tabel(conn, 'mtbf_jam')
+elif OUT_OF_CORE:
+    mtbf_summary, mtbf_jam = hasil_ooc['mtbf'], hasil_ooc['mtbf_jam']
+else:
+    mtbf_summary, mtbf_jam = hitung_mtbf(df_done), hitung_mtbf_jam(df_done)
+mtbf_summary = mtbf_summary.rename(columns={'TOTAL_KEJADIAN': 'TOTAL_KEJADIAN_MTBF'})
+mtbf_summary = pd.merge(mtbf_summary, mtbf_jam, on='COMPNAME', how='outer')
 
 print("MTBF Selesai dihitung. Contoh hasil:")
 print(mtbf_summary.head(3))
@@ -85,31 +101,42 @@ print(mtbf_summary.head(3))
 print("\n--- [4] MENYUSUN ANALISIS LENGKAP ---")
 
 # Pivot table: Menjadikan Tahun sebagai kolom, Nama Komponen sebagai baris
-pivot_full = df_done.pivot_table(index='COMPNAME', columns='SOURCE_YEAR', aggfunc='size', fill_value=0)
-
-# Pastikan kolom tahun 2023, 2024, 2025 ada
-for year in [2023, 2024, 2025]:
-    if year not in pivot_full.columns: 
-        pivot_full[year] = 0
-
-# Gabungkan Pivot Table dengan Data MTBF
-pivot_full = pivot_full.reset_index()
+# Tren dari matriks bulanan: periode yang sama tahun lalu (YoY), 12 bulan berjalan & slope
+if USE_STORE:
+    pivot_full = query_pivot_tahunan(conn)
+    trend = TrendEngine.from_long(query_bulanan_komponen(conn), 'COMPNAME', tanggal_akhir=query_tanggal_akhir(conn))
+elif OUT_OF_CORE:
+    pivot_full = hasil_ooc['pivot_tahunan']
+    trend = TrendEngine.from_long(hasil_ooc['bulanan_komponen'], 'COMPNAME', tanggal_akhir=hasil_ooc['tanggal_akhir'])
+else:
+    counts = CountMatrixBuilder(df_done)
+    pivot_full = counts.pivot('COMPNAME', 'SOURCE_YEAR')
+    trend = TrendEngine.from_builder(counts, 'COMPNAME')
+print(f"Periode pembanding tren: {trend.periode_yoy()}")
+
+# Daftar tahun diambil dari data (tidak lagi hardcode 2023, 2024, 2025)
+years = sorted(pivot_full.columns)
+# Label periode & nama kolom total mengikuti tahun yang ada di data (misal 2023-2025, TOTAL_3_TAHUN)
+periode = f"{years[0]}-{years[-1]}"
+kolom_total = f"TOTAL_{len(years)}_TAHUN"
+
+# Gabungkan Pivot Table dengan Tren & Data MTBF
+pivot_full = pivot_full.join(trend.summary()[KOLOM_TREN]).reset_index()
 final_analysis = pd.merge(pivot_full, mtbf_summary, on='COMPNAME', how='left')
 
 # Hitung Statistik Tambahan
-final_analysis['TOTAL_3_TAHUN'] = final_analysis[2023] + final_analysis[2024] + final_analysis[2025]
-final_analysis['TREN_24_vs_25'] = final_analysis[2025] - final_analysis[2024]
+final_analysis[kolom_total] = final_analysis[years].sum(axis=1)
 
 # Isi NaN pada MTBF dengan strip atau info (untuk file CSV)
 final_analysis['MTBF_HARI'] = final_analysis['MTBF_HARI'].fillna('Belum Cukup Data')
 
 # Urutkan data dari yang paling sering dimaintenance
-final_analysis = final_analysis.sort_values(by='TOTAL_3_TAHUN', ascending=False)
+final_analysis = final_analysis.sort_values(by=kolom_total, ascending=False)
 
 # ==========================================
 # 6. EXPORT HASIL KE CSV
 # ==========================================
-output_filename = 'Analisis_Maintenance_Lengkap_MTBF_2023-2025.csv'
+output_filename = f'Analisis_Maintenance_Lengkap_MTBF_{periode}.csv'
 final_analysis.to_csv(output_filename, index=False)
 print(f"\n[-] Data lengkap berhasil disimpan ke file: {output_filename}")
 
@@ -119,7 +146,7 @@ print(f"\n[-] Data lengkap berhasil disimpan ke file: {output_filename}")
 print("\n" + "="*80)
 print(f"{'TOP 10 KOMPONEN PALING SERING MAINTENANCE':<50} | {'TOTAL':<8} | {'TREN':<8}")
 print("="*80)
-print(final_analysis[['COMPNAME', 'TOTAL_3_TAHUN', 'TREN_24_vs_25']].head(10))
+print(final_analysis[['COMPNAME', kolom_total] + KOLOM_TREN].head(10))
 
 print("\n" + "="*80)
 print("REKOMENDASI FORECASTING (Berdasarkan Top 20 Item)")
@@ -130,24 +157,25 @@ top_20_items = final_analysis.head(20)
 
 for index, row in top_20_items.iterrows():
     component_name = row['COMPNAME']
-    diff = row['TREN_24_vs_25']
-    total_2025 = row[2025]
+    diff = row['TREN_YOY']
     mtbf_val = row['MTBF_HARI']
     
     # Info MTBF
     mtbf_info = f"Rata-rata rusak setiap {mtbf_val} hari." if mtbf_val != 'Belum Cukup Data' else "Pola kerusakan belum terbaca."
+    if pd.notna(row['MTBF_JAM']):
+        mtbf_info += f" (setiap {row['MTBF_JAM']} jam operasi)"
 
     if diff > 0:
         # Jika tren naik
         print(f"[NAIK] {component_name}")
-        print(f"   -> Aktivitas naik +{diff} job dibanding tahun lalu.")
+        print(f"   -> Aktivitas naik +{diff:g} job dibanding periode yang sama tahun lalu.")
         print(f"   -> {mtbf_info}")
         print(f"   -> SARAN: Tingkatkan stok sparepart. Cek kondisi alat.")
     elif diff < 0:
         # Jika tren turun
         print(f"[TURUN] {component_name}")
-        print(f"   -> Aktivitas turun {diff} job.")
+        print(f"   -> Aktivitas turun {diff:g} job.")
         print(f"   -> {mtbf_info}")
     else:
-        print(f"[STABIL] {component_name} (Aktivitas sama dengan tahun lalu)")
+        print(f"[STABIL] {component_name} (Aktivitas sama dengan periode yang sama tahun lalu)")
     print("-" * 50)
\ No newline at end of file
@@ -0,0 +1,229 @@
+import json
+import os
+import sqlite3
+import pandas as pd
+
+from maintenance_data import FILE_MAINT, FILE_MASTER_BARANG, load_job_reports, clean_job_reports
+from date_parser import parse_tanggal
+from reliability import hitung_mtbf_jam, tabel_weibull
+from interval_kernel import statistik_interval
+
+# ==========================================
+# KONFIGURASI STORE
+# ==========================================
+# Database embedded (SQLite) berisi data yang sudah dibersihkan.
+# Dibangun sekali lewat: python maintenance_store.py
+# Setelah itu script & dashboard cukup menjalankan query agregat ke file ini.
+STORE_PATH = 'maintenance_store.sqlite'
+# File sumber store: jika salah satunya berubah setelah store dibangun, store dianggap
+# usang (store_tersedia() = False) dan script kembali membaca file sumber
+SUMBER_STORE = list(FILE_MAINT.values()) + [FILE_MASTER_BARANG]
+
+# Kolom Job Report yang disimpan ke database
+JOB_COLUMNS = [
+    'SOURCE_YEAR', 'TAHUN', 'BULAN', 'VESSELID', 'COMPNAME', 'JOBTITLE', 'JOBDESC',
+    'JOBTITLE_KANONIK', 'JOBTITLE_ID', 'JOBDESC_KANONIK', 'JOBDESC_ID',
+    'FREQ_TYPE', 'MAKERS_NAME', 'REPORT_DATE', 'JOB_TIMESTAMP', 'RH_THIS_MONTH_UNTIL_JOBDONE',
+]
+
+# Index untuk mempercepat filter & agregasi
+JOB_INDEXES = {
+    'idx_job_vessel': ['VESSELID'],
+    'idx_job_comp': ['COMPNAME'],
+    'idx_job_date': ['REPORT_DATE'],
+    'idx_job_vessel_comp_date': ['VESSELID', 'COMPNAME', 'REPORT_DATE'],
+}
+
+# ==========================================
+# 1. KONEKSI
+# ==========================================
+def connect_store(path=STORE_PATH, read_only=False):
+    """
+    Membuka koneksi ke store. Mode read_only dipakai dashboard supaya
+    banyak sesi Streamlit bisa berbagi satu file yang sama.
+    """
+    if read_only:
+        return sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+    return sqlite3.connect(path)
+
+
+def _mtime_sumber(sumber):
+    return {p: os.stat(p).st_mtime_ns for p in sumber if os.path.exists(p)}
+
+
+def store_usang(path=STORE_PATH, sumber=SUMBER_STORE):
+    """
+    True jika file sumber (yang ada) berubah sejak store dibangun. Waktu modifikasi
+    sumber dicatat di tabel store_meta saat build; store lama tanpa tabel itu
+    dibandingkan dengan waktu modifikasi file store.
+    """
+    sekarang = _mtime_sumber(sumber)
+    try:
+        conn = connect_store(path, read_only=True)
+        try:
+            baris = conn.execute("SELECT NILAI FROM store_meta WHERE KUNCI = 'mtime_sumber'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        baris = None
+    if baris is None:
+        store_mtime = os.stat(path).st_mtime_ns
+        return any(mtime > store_mtime for mtime in sekarang.values())
+    tercatat = json.loads(baris[0])
+    return any(tercatat.get(p) != mtime for p, mtime in sekarang.items())
+
+
+_SUDAH_DIPERINGATKAN = set()   # Path store usang yang warning-nya sudah dicetak
+
+
+def store_tersedia(path=STORE_PATH, sumber=SUMBER_STORE):
+    """True jika store ada dan tidak lebih lama dari file sumbernya (warning usang dicetak sekali per path)."""
+    if not os.path.exists(path):
+        return False
+    if store_usang(path, sumber):
+        if path in _SUDAH_DIPERINGATKAN:
+            return False
+        _SUDAH_DIPERINGATKAN.add(path)
+        print(f"Warning: '{path}' lebih lama dari file sumber, data dibaca dari file sumber. "
+              f"Jalankan python maintenance_store.py untuk membangun ulang store.")
+        return False
+    return True
+
+# ==========================================
+# 2. TULIS DATA
+# ==========================================
+def simpan_tabel(conn, nama_tabel, df, indexes=None):
+    """Menulis DataFrame ke tabel (replace) lalu membuat index yang diminta."""
+    df.to_sql(nama_tabel, conn, if_exists='replace', index=False)
+    for nama_index, kolom in (indexes or {}).items():
+        kolom_sql = ', '.join(f'"{k}"' for k in kolom)
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {nama_index} ON {nama_tabel} ({kolom_sql})')
+    conn.commit()
+
+
+def simpan_job_reports(conn, df_done):
+    """Menyimpan Job Report bersih. Tanggal disimpan sebagai teks ISO agar bisa diurutkan."""
+    df_store = df_done[[c for c in JOB_COLUMNS if c in df_done.columns]].copy()
+    for col in ['REPORT_DATE', 'JOB_TIMESTAMP']:
+        if col in df_store.columns:
+            df_store[col] = parse_tanggal(df_store[col]).dt.strftime('%Y-%m-%d %H:%M:%S')
+
+    simpan_tabel(conn, 'job_reports', df_store, JOB_INDEXES)
+
+# ==========================================
+# 3. QUERY AGREGAT (PUSH-DOWN KE DATABASE)
+# ==========================================
+def query_pivot_tahunan(conn):
+    """Jumlah job per COMPNAME per tahun (pengganti pivot_table aggfunc='size')."""
+    df = pd.read_sql_query(
+        'SELECT COMPNAME, SOURCE_YEAR, COUNT(*) AS JUMLAH FROM job_reports GROUP BY COMPNAME, SOURCE_YEAR',
+        conn
+    )
+    return df.pivot_table(index='COMPNAME', columns='SOURCE_YEAR', values='JUMLAH', fill_value=0).astype(int)
+
+
+def query_tren_bulanan(conn):
+    """Total pekerjaan per bulan (YYYY-MM)."""
+    df = pd.read_sql_query(
+        'SELECT substr(REPORT_DATE, 1, 7) AS YYYYMM, COUNT(*) AS JUMLAH FROM job_reports GROUP BY YYYYMM ORDER BY YYYYMM',
+        conn
+    )
+    return df.set_index('YYYYMM')['JUMLAH']
+
+
+def _query_bulanan(conn, dims):
+    """Jumlah job per dims per bulan. PERIOD = tahun*12 + bulan-1 (input TrendEngine & detektor anomali)."""
+    kolom = ', '.join(dims)
+    return pd.read_sql_query(
+        f'''
+        SELECT {kolom},
+               CAST(substr(REPORT_DATE, 1, 4) AS INTEGER) * 12 + CAST(substr(REPORT_DATE, 6, 2) AS INTEGER) - 1 AS PERIOD,
+               COUNT(*) AS JUMLAH
+        FROM job_reports
+        GROUP BY {kolom}, PERIOD
+        ''',
+        conn
+    )
+
+
+def query_bulanan_komponen(conn):
+    return _query_bulanan(conn, ['COMPNAME'])
+
+
+def query_tanggal_akhir(conn):
+    """Tanggal laporan terakhir (untuk mendeteksi bulan berjalan yang belum lengkap)."""
+    nilai = conn.execute('SELECT MAX(REPORT_DATE) FROM job_reports').fetchone()[0]
+    return pd.Timestamp(nilai) if nilai else None
+
+
+def query_bulanan_kapal_komponen(conn):
+    return _query_bulanan(conn, ['VESSELID', 'COMPNAME'])
+
+
+def query_mtbf(conn, by=('COMPNAME',)):
+    """
+    MTBF per COMPNAME (atau per kolom `by`, misal ('VESSELID', 'COMPNAME')) dihitung
+    langsung di database dengan window function LEAD, hasilnya sama dengan logika
+    shift(-1) di script pandas.
+    """
+    kolom = ', '.join(by)
+    # Pembulatan di pandas (half-even), sama dengan statistik_interval; ROUND SQLite half-up
+    df = pd.read_sql_query(
+        f'''
+        SELECT {kolom}, AVG(DAYS_BETWEEN) AS MTBF_HARI, COUNT(*) AS TOTAL_KEJADIAN
+        FROM (
+            SELECT VESSELID, COMPNAME,
+                   CAST(julianday(LEAD(REPORT_DATE) OVER (PARTITION BY VESSELID, COMPNAME ORDER BY REPORT_DATE))
+                        - julianday(REPORT_DATE) AS INTEGER) AS DAYS_BETWEEN
+            FROM job_reports
+        )
+        WHERE DAYS_BETWEEN > 0
+        GROUP BY {kolom}
+        ORDER BY {kolom}
+        ''',
+        conn
+    )
+    df['MTBF_HARI'] = df['MTBF_HARI'].round(1)
+    return df
+
+
+def baca_tabel(conn, nama_tabel):
+    """Membaca tabel hasil (mtbf, master_barang, forecast, ...) secara utuh."""
+    return pd.read_sql_query(f'SELECT * FROM {nama_tabel}', conn)
+
+# ==========================================
+# 4. BUILD STORE DARI FILE EXCEL/CSV
+# ==========================================
+def build_store(path=STORE_PATH):
+    # Dicatat sebelum membaca, sehingga perubahan sumber selama build tetap terdeteksi
+    mtime_sumber = _mtime_sumber(SUMBER_STORE)
+
+    print("\n--- [1] MEMUAT DATA MAINTENANCE ---")
+    df_done = clean_job_reports(load_job_reports())
+    print(f"Sukses! Total Data Maintenance (selesai): {len(df_done):,} baris.")
+
+    conn = connect_store(path)
+
+    print("\n--- [2] MENYIMPAN JOB REPORT, MTBF (HARI/JAM) & PARAMETER WEIBULL ---")
+    simpan_job_reports(conn, df_done)
+    simpan_tabel(conn, 'mtbf', query_mtbf(conn), {'idx_mtbf_comp': ['COMPNAME']})
+    # MTBF berbasis Running Hours disimpan berdampingan dengan MTBF kalender
+    simpan_tabel(conn, 'mtbf_jam', hitung_mtbf_jam(df_done), {'idx_mtbf_jam_comp': ['COMPNAME']})
+    simpan_tabel(conn, 'weibull', tabel_weibull(df_done), {'idx_weibull_comp': ['COMPNAME']})
+    # Gap terpanjang, hari sejak job terakhir & streak overdue per (Kapal, Komponen)
+    simpan_tabel(conn, 'statistik_interval', statistik_interval(df_done), {'idx_interval_vessel_comp': ['VESSELID', 'COMPNAME']})
+
+    print("\n--- [3] MENYIMPAN MASTER BARANG ---")
+    try:
+        df_inventory = pd.read_csv(FILE_MASTER_BARANG)
+        simpan_tabel(conn, 'master_barang', df_inventory, {'idx_master_part': ['PART_NO'], 'idx_master_kategori': ['KATEGORI']})
+    except FileNotFoundError:
+        print(f"Warning: '{FILE_MASTER_BARANG}' tidak ditemukan, tabel master_barang dilewati.")
+
+    simpan_tabel(conn, 'store_meta', pd.DataFrame({'KUNCI': ['mtime_sumber'], 'NILAI': [json.dumps(mtime_sumber)]}))
+    conn.close()
+    print(f"\nStore berhasil dibuat: {path}")
+
+
+if __name__ == '__main__':
+    build_store()
@@ -0,0 +1,227 @@
+import re
+import zlib
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI DEDUP MASTER BARANG (MINHASH LSH)
+# ==========================================
+# Barang yang sama sering ditulis berbeda (spasi, urutan kata, spesifikasi).
+# Membandingkan ~27 ribu nama satu per satu = kuadratik. Di sini setiap barang
+# diringkas menjadi signature MinHash, lalu hanya barang yang jatuh ke "bucket"
+# LSH yang sama yang dibandingkan -> waktu hampir linear.
+FILE_DUPLIKAT = 'Duplikat_Master_Barang.csv'
+NUM_PERM = 128           # Panjang signature MinHash
+BANDS = 16               # 16 band x 8 baris -> ambang kandidat ~0.7 (longgar, diverifikasi lagi)
+JACCARD_MIN = 0.8        # Kemiripan minimum (estimasi MinHash) untuk dianggap duplikat
+JENDELA_BUCKET = 50      # Bucket LSH lebih besar dari ini: tiap barang dibandingkan dengan 50 tetangga
+PERM_CHUNK = 16          # Jumlah permutasi yang dihitung sekaligus (membatasi memori)
+SEED = 1
+
+_PRIME = np.uint64(4294967291)     # Prima terbesar < 2^32
+
+# ==========================================
+# 1. SHINGLE TEKS & KUNCI KERAS
+# ==========================================
+_POLA_TOKEN = re.compile(r'[A-Z0-9]+(?:[\.,]\d+)*')
+
+
+def _token_nama(nama):
+    """Token kata/angka dari nama barang (tanpa bagian P/N), koma desimal -> titik."""
+    if pd.isna(nama):
+        return []
+    nama = re.sub(r'\(P/N:[^)]*\)', ' ', str(nama).upper())
+    return [t.replace(',', '.') for t in _POLA_TOKEN.findall(nama)]
+
+
+def shingles_barang(nama, merek):
+    """
+    Himpunan shingle untuk satu barang: setiap token kata/angka nama + pasangan token
+    berurutan + merek bertanda. Shingle karakter tidak dipakai karena "BEARING 6205"
+    dan "BEARING 6206" hampir identik di level karakter.
+    """
+    token = _token_nama(nama)
+    hasil = set(token) | {f'{a} {b}' for a, b in zip(token, token[1:])}
+    if pd.notna(merek) and str(merek).strip():
+        hasil.add('MR:' + str(merek).upper())
+    return hasil
+
+
+def kunci_angka(teks):
+    """
+    Kunci keras: semua token yang mengandung angka (ukuran, tipe, kode), terurut dan
+    termasuk pengulangannya. Barang dengan kunci berbeda tidak pernah dianggap
+    duplikat, semirip apa pun teksnya ("1 TON" vs "1.5 TON", "6205" vs "6206").
+    """
+    return ' '.join(sorted(t for t in _token_nama(teks) if any(c.isdigit() for c in t)))
+
+
+def normalisasi_part_no(part_no):
+    """P/N tanpa tanda baca ('' jika kosong) untuk pembanding keras antar barang."""
+    if pd.isna(part_no):
+        return ''
+    return re.sub(r'[^A-Z0-9]', '', str(part_no).upper())
+
+# ==========================================
+# 2. SIGNATURE MINHASH (VECTORIZED)
+# ==========================================
+def minhash_signatures(daftar_shingle, num_perm=NUM_PERM, seed=SEED):
+    """
+    daftar_shingle: list himpunan shingle per barang.
+    Setiap shingle unik di-hash sekali (crc32), lalu permutasi h(x) = (a*x + b) mod p
+    dihitung per blok untuk semua kemunculan; minimum per barang lewat np.minimum.reduceat.
+    Hasil: array uint64 (barang x num_perm). Barang tanpa shingle bernilai maksimum.
+    """
+    panjang = np.array([len(s) for s in daftar_shingle])
+    semua = [sh for s in daftar_shingle for sh in s]
+    kode, unik = pd.factorize(pd.Series(semua, dtype=object))
+    base = np.array([zlib.crc32(u.encode()) for u in unik], dtype=np.uint64) % _PRIME
+
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+
+    sig = np.full((len(daftar_shingle), num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+    ada = panjang > 0
+    if not ada.any():
+        return sig
+    starts = np.concatenate(([0], np.cumsum(panjang[ada])[:-1]))
+    for p0 in range(0, num_perm, PERM_CHUNK):
+        sl = slice(p0, p0 + PERM_CHUNK)
+        # a, b, x < p < 2^32 -> a*x + b < p^2 + p, masih muat di uint64
+        h_unik = (base[:, None] * a[sl] + b[sl]) % _PRIME
+        sig[ada, sl] = np.minimum.reduceat(h_unik[kode], starts, axis=0)
+    return sig
+
+# ==========================================
+# 3. LSH BANDING & CLUSTER
+# ==========================================
+def kandidat_lsh(sig, bands=BANDS, kunci=None, jendela=JENDELA_BUCKET):
+    """
+    Pasangan kandidat (i, j), i < j, dari barang yang signature-nya identik pada minimal
+    satu band. Semua pasangan di dalam bucket ikut (bukan hanya ke anggota pertama),
+    kecuali bucket yang lebih besar dari `jendela`: di sana tiap anggota dipasangkan
+    dengan `jendela` tetangga terdekat (diurutkan menurut hash band berikutnya) agar
+    jumlah kandidat tidak kuadratik. kunci (opsional): kunci keras, bucket dipisah per kunci.
+    """
+    n, num_perm = sig.shape
+    r = num_perm // bands
+    ada = sig[:, 0] != np.iinfo(np.uint64).max
+    kode_kunci = pd.factorize(pd.Series(kunci, dtype=object))[0] if kunci is not None else np.zeros(n, dtype=np.int64)
+    kiri, kanan = [], []
+    for band in range(bands):
+        blok = np.ascontiguousarray(sig[:, band * r:(band + 1) * r])
+        # Satu baris band -> satu kunci (void view) untuk dikelompokkan
+        kode_band = pd.factorize(blok.view(np.dtype((np.void, blok.dtype.itemsize * r))).ravel())[0]
+        codes = pd.factorize(pd.MultiIndex.from_arrays([kode_band, kode_kunci]))[0]
+        codes = np.where(ada, codes, -1)
+
+        # Hanya bucket berisi >= 2 barang yang perlu dipasangkan
+        ukuran = np.bincount(codes[codes >= 0], minlength=1)
+        urut = np.flatnonzero((codes >= 0) & (ukuran[np.maximum(codes, 0)] > 1))
+        urut = urut[np.lexsort((sig[urut, ((band + 1) * r) % num_perm], codes[urut]))]
+        c = codes[urut]
+        # Pasangan anggota bucket berjarak d di urutan terurut, d = 1 .. min(ukuran bucket - 1, jendela)
+        for d in range(1, min(len(c), jendela + 1)):
+            sama = c[d:] == c[:-d]
+            if not sama.any():
+                break
+            kiri.append(urut[:-d][sama])
+            kanan.append(urut[d:][sama])
+
+    if not kiri:
+        kosong = np.empty(0, dtype=np.int64)
+        return kosong, kosong
+    i, j = np.concatenate(kiri), np.concatenate(kanan)
+    pasangan = np.unique(np.column_stack([np.minimum(i, j), np.maximum(i, j)]), axis=0)
+    return pasangan[:, 0], pasangan[:, 1]
+
+
+def cluster_minhash(sig, jaccard_min=JACCARD_MIN, bands=BANDS, kunci=None, part_no=None):
+    """
+    Label cluster (0..k-1) untuk setiap baris signature dan estimasi Jaccard tiap barang
+    ke wakil cluster-nya (1 untuk barang tunggal).
+    Bukan komponen terhubung (yang bisa merangkai A~B~C walau A dan C jauh berbeda):
+    pasangan terverifikasi diproses dari yang paling mirip, dan cluster kecil hanya
+    bergabung jika SEMUA anggotanya >= jaccard_min ke wakil cluster besar. Karena jarak
+    Jaccard memenuhi ketaksamaan segitiga, dua anggota mana pun tetap >= 2*jaccard_min - 1.
+    kunci: kunci keras per barang (lihat kunci_angka); part_no: P/N ternormalisasi,
+    dua P/N terisi yang berbeda tidak pernah digabung.
+    """
+    n = sig.shape[0]
+    kunci = pd.Series(kunci if kunci is not None else [''] * n, dtype=object).to_numpy()
+    part_no = pd.Series(part_no if part_no is not None else [''] * n, dtype=object).to_numpy()
+
+    # Baris identik (signature, kunci & P/N sama) langsung satu cluster, sisanya diproses unik
+    baris = np.ascontiguousarray(sig).view(np.dtype((np.void, sig.dtype.itemsize * sig.shape[1]))).ravel()
+    kode = pd.factorize(pd.MultiIndex.from_arrays([pd.factorize(baris)[0], kunci, part_no]))[0]
+    _, pertama, kembali = np.unique(kode, return_index=True, return_inverse=True)
+    sig, kunci, part_no = sig[pertama], kunci[pertama], part_no[pertama]
+    m = len(pertama)
+
+    i, j = kandidat_lsh(sig, bands, kunci)
+    # Verifikasi kandidat: proporsi posisi signature yang sama ~ Jaccard
+    kemiripan = (sig[i] == sig[j]).mean(axis=1)
+    lolos = (kemiripan >= jaccard_min) & ((part_no[i] == '') | (part_no[j] == '') | (part_no[i] == part_no[j]))
+    i, j, kemiripan = i[lolos], j[lolos], kemiripan[lolos]
+
+    # Label cluster = indeks wakilnya (anggota pendiri cluster besar)
+    label = np.arange(m)
+    anggota, pn_cluster, gagal = {}, {}, set()
+    for p in np.argsort(-kemiripan, kind='stable'):
+        a, b = label[i[p]], label[j[p]]
+        if a == b:
+            continue
+        grup_a, grup_b = anggota.get(a, [a]), anggota.get(b, [b])
+        if len(grup_a) < len(grup_b):
+            a, b, grup_a, grup_b = b, a, grup_b, grup_a
+        uji = (a, b, len(grup_a), len(grup_b))
+        if uji in gagal:
+            continue
+        pn_a, pn_b = pn_cluster.get(a, part_no[a]), pn_cluster.get(b, part_no[b])
+        if (pn_a and pn_b and pn_a != pn_b) or (sig[grup_b] == sig[a]).mean(axis=1).min() < jaccard_min:
+            gagal.add(uji)
+            continue
+        label[grup_b] = a
+        anggota[a] = grup_a + grup_b
+        pn_cluster[a] = pn_a or pn_b
+        anggota.pop(b, None)
+        pn_cluster.pop(b, None)
+
+    skor = (sig == sig[label]).mean(axis=1)
+    return pd.factorize(label[kembali])[0], skor[kembali]
+
+
+def cari_duplikat(df_master, jaccard_min=JACCARD_MIN, num_perm=NUM_PERM, bands=BANDS):
+    """
+    Mengembalikan tabel cluster duplikat (hanya cluster berisi >= 2 barang) dengan
+    kolom CLUSTER_ID, UKURAN_CLUSTER, KEMIRIPAN (estimasi Jaccard ke wakil cluster)
+    dan kolom asli master barang. Barang dengan angka/kode berbeda atau
+    P/N berbeda tidak pernah masuk cluster yang sama.
+    """
+    nama, merek = df_master['NAMA_BARANG_RAPIH'], df_master['MEREK']
+    daftar_shingle = [shingles_barang(n, m) for n, m in zip(nama, merek)]
+    # Angka diambil dari teks asli jika ada (nama rapih memecah "1.5" menjadi "1 5")
+    kunci = [kunci_angka(t) for t in df_master.get('BARANG', nama)]
+    part_no = [normalisasi_part_no(p) for p in df_master['PART_NO']]
+    label, skor = cluster_minhash(minhash_signatures(daftar_shingle, num_perm), jaccard_min, bands,
+                                  kunci=kunci, part_no=part_no)
+
+    ukuran = np.bincount(label)[label]
+    hasil = df_master.reset_index(drop=True).assign(
+        CLUSTER_ID=label, UKURAN_CLUSTER=ukuran, KEMIRIPAN=np.round(skor, 2)
+    )
+    hasil = hasil[hasil['UKURAN_CLUSTER'] > 1].copy()
+    # Nomori ulang cluster dari yang terbesar
+    urutan = hasil.groupby('CLUSTER_ID')['UKURAN_CLUSTER'].first().sort_values(ascending=False, kind='stable')
+    hasil['CLUSTER_ID'] = hasil['CLUSTER_ID'].map(pd.Series(np.arange(1, len(urutan) + 1), index=urutan.index))
+    return hasil.sort_values(['CLUSTER_ID', 'KEMIRIPAN'], ascending=[True, False]).reset_index(drop=True)
+
+
+def ringkas_duplikat(hasil):
+    """Statistik singkat untuk dicetak di akhir proses."""
+    return {
+        'cluster': hasil['CLUSTER_ID'].nunique(),
+        'barang': len(hasil),
+        'barang_berlebih': len(hasil) - hasil['CLUSTER_ID'].nunique(),
+    }
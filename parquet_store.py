@@ -0,0 +1,180 @@
+import functools
+import operator
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from shared_data import _STRING_TYPES, seragamkan_teks, publish_table, map_dataset
+
+# ==========================================
+# KONFIGURASI DATASET PARQUET TERPARTISI
+# ==========================================
+# Data Job Report bersih disimpan sebagai dataset Parquet berpartisi Hive:
+#   maintenance_parquet/v<waktu>/TAHUN=2025/VESSELID=KM%20ABC/part-0.parquet
+# Pilihan sidebar (tahun, include/exclude kapal, tipe frekuensi) diterjemahkan menjadi
+# filter pyarrow: tahun & kapal memangkas folder partisi (file lain tidak dibuka),
+# FREQ_TYPE memangkas row group lewat statistik min/max (baris dalam partisi
+# diurutkan per FREQ_TYPE). Hanya data yang cocok yang dibaca dari disk.
+# Setiap penulisan membuat folder versi baru; file penunjuk (AKTIF) diganti secara
+# atomik, sehingga pembaca selalu melihat satu versi utuh. Versi lama dihapus
+# belakangan (SIMPAN_VERSI terakhir disimpan untuk pembaca yang masih berjalan).
+# Tampilan tanpa filter (semua tahun, kapal & tipe frekuensi) tidak perlu dipangkas:
+# setiap versi juga ditulis sebagai file Arrow (v<waktu>.arrow) yang di-memory-map
+# (zero-copy, dibagi semua sesi) alih-alih men-decode seluruh Parquet.
+PARQUET_DIR = 'maintenance_parquet'
+FILE_PENUNJUK = 'AKTIF'
+SIMPAN_VERSI = 2
+KOLOM_PARTISI = ['TAHUN', 'VESSELID']
+URUTAN_DALAM_PARTISI = ['FREQ_TYPE', 'BULAN']
+ROW_GROUP = 16_384
+
+_SKEMA_PARTISI = pa.schema([('TAHUN', pa.int64()), ('VESSELID', pa.string())])
+
+# ==========================================
+# 1. TULIS DATASET (FOLDER VERSI + PENUNJUK ATOMIK)
+# ==========================================
+def path_penunjuk(path=PARQUET_DIR):
+    return os.path.join(path, FILE_PENUNJUK)
+
+
+def versi_partisi(path=PARQUET_DIR):
+    """Nama folder versi aktif (token versi dataset); None jika belum ada."""
+    try:
+        with open(path_penunjuk(path), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def folder_aktif(path=PARQUET_DIR):
+    versi = versi_partisi(path)
+    if versi is None:
+        raise FileNotFoundError(f"Dataset Parquet '{path}' belum dibangun")
+    return os.path.join(path, versi)
+
+
+def _hapus_versi_lama(path, simpan):
+    # Hanya versi lama yang dihapus (termasuk sisa tulisan gagal & layout lama tanpa versi);
+    # yang gagal dihapus (file masih dibuka di Windows) dicoba lagi pada penulisan berikutnya
+    versi = sorted(
+        (nama for nama in os.listdir(path) if nama.startswith('v') and nama[1:].isdigit()
+         and os.path.isdir(os.path.join(path, nama))),
+        key=lambda nama: int(nama[1:]),
+    )
+    simpan = set(versi[-simpan:]) | {versi_partisi(path)}
+    simpan |= {nama + '.arrow' for nama in simpan} | {FILE_PENUNJUK}
+    for nama in os.listdir(path):
+        if nama in simpan:
+            continue
+        target = os.path.join(path, nama)
+        if os.path.isdir(target):
+            shutil.rmtree(target, ignore_errors=True)
+        else:
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+
+
+def tulis_partisi(df, path=PARQUET_DIR, simpan=SIMPAN_VERSI):
+    """
+    Menulis DataFrame bersih (minimal berisi TAHUN & VESSELID) sebagai dataset Hive
+    di folder versi baru, lalu memindahkan penunjuk ke versi itu.
+    """
+    df = seragamkan_teks(df).astype({'TAHUN': 'int64', 'VESSELID': str})
+    urutan = KOLOM_PARTISI + [c for c in URUTAN_DALAM_PARTISI if c in df.columns]
+    table = pa.Table.from_pandas(df.sort_values(urutan, kind='stable'), preserve_index=False)
+
+    os.makedirs(path, exist_ok=True)
+    versi = f'v{time.time_ns()}'
+    tmp_path = os.path.join(path, versi + '.tmp')
+    ds.write_dataset(
+        table, tmp_path, format='parquet',
+        partitioning=ds.partitioning(_SKEMA_PARTISI, flavor='hive'),
+        max_rows_per_group=ROW_GROUP, min_rows_per_group=min(ROW_GROUP, 1024),
+    )
+    os.replace(tmp_path, os.path.join(path, versi))
+    # Salinan Arrow untuk tampilan tanpa filter (kolom partisi di akhir, seperti hasil Parquet)
+    urutan_kolom = [c for c in table.column_names if c not in KOLOM_PARTISI] + KOLOM_PARTISI
+    publish_table(table.select(urutan_kolom), os.path.join(path, versi + '.arrow'))
+
+    # Penunjuk ditulis ke file sementara lalu rename (atomik, juga di Windows)
+    penunjuk_tmp = path_penunjuk(path) + '.tmp'
+    with open(penunjuk_tmp, 'w', encoding='utf-8') as f:
+        f.write(versi)
+    os.replace(penunjuk_tmp, path_penunjuk(path))
+    _hapus_versi_lama(path, simpan)
+    return versi
+
+
+def partisi_tersedia(path=PARQUET_DIR):
+    return versi_partisi(path) is not None
+
+# ==========================================
+# 2. FILTER (PUSHDOWN)
+# ==========================================
+def buka_dataset(path=PARQUET_DIR):
+    return ds.dataset(folder_aktif(path), format='parquet', partitioning=ds.partitioning(_SKEMA_PARTISI, flavor='hive'))
+
+
+def filter_pushdown(tahun=None, kapal=None, kecuali=None, freq=None):
+    """
+    Ekspresi filter pyarrow dari pilihan sidebar (None = tidak difilter).
+    kapal: include kapal, kecuali: exclude kapal, freq: daftar FREQ_TYPE.
+    """
+    # Nilai diberi tipe eksplisit: daftar kosong tetap valid (hasilnya 0 baris)
+    teks = lambda nilai: pa.array([str(v) for v in nilai], pa.string())
+    syarat = []
+    if tahun is not None:
+        syarat.append(ds.field('TAHUN').isin(pa.array([int(t) for t in tahun], pa.int64())))
+    if kapal is not None:
+        syarat.append(ds.field('VESSELID').isin(teks(kapal)))
+    if kecuali:
+        syarat.append(~ds.field('VESSELID').isin(teks(kecuali)))
+    if freq is not None:
+        syarat.append(ds.field('FREQ_TYPE').isin(teks(freq)))
+    return functools.reduce(operator.and_, syarat) if syarat else None
+
+# ==========================================
+# 3. BACA
+# ==========================================
+def baca_semua(path=PARQUET_DIR):
+    """Seluruh dataset versi aktif dari file Arrow yang di-memory-map (tanpa decode Parquet)."""
+    return map_dataset(folder_aktif(path) + '.arrow')
+
+
+def baca_partisi(tahun=None, kapal=None, kecuali=None, freq=None, columns=None, path=PARQUET_DIR):
+    """
+    DataFrame berisi baris yang cocok saja (kolom teks sebagai string[pyarrow]).
+    Tanpa filter & tanpa pilihan kolom: file Arrow versi aktif di-memory-map (zero-copy).
+    """
+    filter_ = filter_pushdown(tahun, kapal, kecuali, freq)
+    # Versi yang ditulis sebelum ada salinan Arrow tetap dibaca dari Parquet
+    if filter_ is None and columns is None and os.path.exists(folder_aktif(path) + '.arrow'):
+        return baca_semua(path)
+    dataset = buka_dataset(path)
+    table = dataset.to_table(columns=columns, filter=filter_)
+    return table.to_pandas(split_blocks=True, types_mapper=_STRING_TYPES.get)
+
+
+def opsi_partisi(path=PARQUET_DIR):
+    """(daftar tahun, daftar kapal) langsung dari nama folder partisi, tanpa membaca data."""
+    tahun, kapal = set(), set()
+    for fragment in buka_dataset(path).get_fragments():
+        kunci = ds.get_partition_keys(fragment.partition_expression)
+        tahun.add(kunci['TAHUN'])
+        kapal.add(kunci['VESSELID'])
+    return sorted(tahun), sorted(kapal)
+
+
+def jumlah_per_kapal(tahun=None, path=PARQUET_DIR):
+    """Jumlah baris per VESSELID dari metadata footer Parquet (tanpa membaca kolom data)."""
+    jumlah = {}
+    for fragment in buka_dataset(path).get_fragments(filter=filter_pushdown(tahun)):
+        kapal = ds.get_partition_keys(fragment.partition_expression)['VESSELID']
+        jumlah[kapal] = jumlah.get(kapal, 0) + fragment.metadata.num_rows
+    return pd.Series(jumlah, dtype='int64')
@@ -0,0 +1,116 @@
+import re
+import pandas as pd
+
+# ==========================================
+# PENCARI SPAREPART (KOMPONEN -> MASTER BARANG)
+# ==========================================
+# Logika sama dengan cari_sparepart_rekomendasi di maintenance_job_v2.py:
+# ambil kata paling spesifik dari nama komponen (kata terakhir, misal 'PUMP'),
+# lalu cari di NAMA_BARANG_RAPIH. Hasil pencarian per kata kunci disimpan,
+# sehingga ribuan komponen dengan kata kunci sama hanya memindai inventory sekali.
+
+# Mapping manual komponen -> barang (bill of materials), opsional. Kolom: COMPNAME,
+# PART_NO, NAMA_BARANG_RAPIH, QTY. Komponen yang ada di file ini tidak dicari otomatis.
+FILE_MAPPING_PART = 'Mapping_Komponen_Part.csv'
+
+# Hapus kata umum yang tidak berguna untuk pencarian
+STOP_WORDS = ['THE', 'FOR', 'AND', 'UNIT', 'SET', 'KIT', 'ASSY', 'MAIN', 'AUX', 'NO']
+
+
+def kata_kunci(nama_komponen):
+    """Kata kunci pencarian dari nama komponen (#1, No.2, dll dibuang)."""
+    keywords = re.findall(r'[a-zA-Z]{3,}', str(nama_komponen).upper())
+    return [k for k in keywords if k not in STOP_WORDS]
+
+
+def baca_mapping_manual(path=FILE_MAPPING_PART):
+    """Mapping manual (QTY default 1); None jika file belum ada."""
+    try:
+        df = pd.read_csv(path)
+    except FileNotFoundError:
+        return None
+    if 'QTY' not in df.columns:
+        df['QTY'] = 1
+    if 'NAMA_BARANG_RAPIH' not in df.columns:
+        df['NAMA_BARANG_RAPIH'] = df['PART_NO'].astype(str)
+    return df[['COMPNAME', 'NAMA_BARANG_RAPIH', 'PART_NO', 'QTY']]
+
+
+def skor_kecocokan(nama_komponen, nama_barang):
+    """Banyak kata kunci komponen yang muncul di nama barang (makin besar makin cocok)."""
+    kata_barang = set(re.findall(r'[A-Z]{3,}', str(nama_barang).upper()))
+    return sum(k in kata_barang for k in dict.fromkeys(kata_kunci(nama_komponen)))
+
+
+class PartRecommender:
+    def __init__(self, df_inventory, max_parts=3, mapping_manual=None):
+        self.df_inventory = df_inventory
+        self.max_parts = max_parts
+        self.mapping_manual = mapping_manual
+        self._cache = {}
+
+    def cari(self, nama_komponen):
+        """
+        Mengembalikan DataFrame (NAMA_BARANG_RAPIH, PART_NO) berisi maksimal
+        `max_parts` barang yang cocok. None jika nama komponen kosong/tidak jelas.
+        """
+        if pd.isna(nama_komponen):
+            return None
+        keywords = kata_kunci(nama_komponen)
+        if not keywords:
+            return None
+
+        # Strategi: Cari yang mengandung kata paling spesifik (biasanya kata benda terakhir)
+        search_term = keywords[-1]
+        if search_term not in self._cache:
+            hasil = self.df_inventory[self.df_inventory['NAMA_BARANG_RAPIH'].str.contains(search_term, case=False, na=False)]
+            self._cache[search_term] = hasil[['NAMA_BARANG_RAPIH', 'PART_NO']].head(self.max_parts)
+        return self._cache[search_term]
+
+    def rekomendasi_teks(self, nama_komponen):
+        """Format teks seperti kolom 'Rekomendasi Part Number' di laporan forecasting."""
+        if pd.isna(nama_komponen):
+            return "Tidak ditemukan"
+        top_parts = self.cari(nama_komponen)
+        if top_parts is None:
+            return "Keyword tidak jelas"
+
+        matches = []
+        for _, row in top_parts.iterrows():
+            pn = row['PART_NO'] if pd.notna(row['PART_NO']) else "No P/N"
+            nama = row['NAMA_BARANG_RAPIH'][:30] # Potong biar gak kepanjangan
+            matches.append(f"{nama} ({pn})")
+        return " | ".join(matches) if matches else "Tidak ada match di Inventory"
+
+    def tabel_mapping(self, daftar_komponen, terbaik=False):
+        """
+        Tabel panjang komponen -> barang untuk semua komponen sekaligus.
+        Hasil pencarian otomatis adalah kandidat alternatif (bukan daftar barang yang
+        semuanya terpakai): terbaik=True hanya mengambil satu kandidat per komponen
+        (SKOR kata kunci tertinggi, lalu yang punya PART_NO). Baris dari mapping manual
+        selalu diambil semua (QTY per pekerjaan).
+        """
+        kolom = ['COMPNAME', 'NAMA_BARANG_RAPIH', 'PART_NO', 'QTY', 'SKOR', 'SUMBER']
+        komponen = pd.unique(pd.Series(daftar_komponen).dropna())
+        manual = self.mapping_manual
+        frames = []
+        if manual is not None:
+            frames.append(manual[manual['COMPNAME'].isin(komponen)].assign(SKOR=None, SUMBER='MANUAL'))
+            komponen = [c for c in komponen if c not in set(manual['COMPNAME'])]
+
+        for comp in komponen:
+            parts = self.cari(comp)
+            if parts is None or parts.empty:
+                continue
+            parts = parts.assign(
+                COMPNAME=comp, QTY=1, SUMBER='REKOMENDASI',
+                SKOR=[skor_kecocokan(comp, nama) for nama in parts['NAMA_BARANG_RAPIH']],
+            )
+            if terbaik:
+                urutan = parts.assign(_ADA_PN=parts['PART_NO'].notna()).sort_values(
+                    ['SKOR', '_ADA_PN'], ascending=False, kind='stable')
+                parts = parts.loc[urutan.index[:1]]
+            frames.append(parts)
+        if not frames:
+            return pd.DataFrame(columns=kolom)
+        return pd.concat(frames, ignore_index=True)[kolom]
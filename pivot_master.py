@@ -1,6 +1,8 @@
 import pandas as pd
 import re
 
+from spec_index import KOLOM_SPESIFIKASI, parse_spesifikasi
+
 # ==========================================
 # 1. KONFIGURASI DAFTAR MEREK (DIPERLUAS)
 # ==========================================
@@ -82,7 +84,7 @@ CATEGORIES = {
 
 def clean_and_parse_v2(text):
     if not isinstance(text, str):
-        return pd.Series(['', '', '', '', ''])
+        return pd.Series(['', '', '', '', ''] + [float('nan')] * 4 + ['', ''])
     
     original_text = text.upper()
     
@@ -123,20 +125,10 @@ def clean_and_parse_v2(text):
                  part_no = first
 
     # --- 4. CARI SPESIFIKASI (UKURAN/RATING) ---
-    specs = []
-    
-    # Dimensi (10x20, 10*20, 10 X 20)
-    dim_matches = re.findall(r'\b\d+(?:[\.,]\d+)?\s*[xX\*]\s*\d+(?:[\.,]\d+)?(?:\s*[xX\*]\s*\d+(?:[\.,]\d+)?)?\b', original_text)
-    specs.extend(dim_matches)
-    
-    # Satuan Unit (termasuk " untuk inchi)
-    # Menambahkan \b di depan angka agar tidak memotong kata (misal A20 tidak jadi 20)
-    unit_matches = re.findall(r'\b\d+(?:[\.,]\d+)?\s*(?:MM|CM|M|INCH|KG|LTR|VOLT|WATT|AMP|A|HP|KW|KVA|BAR|PSI|V|HZ|")', original_text)
-    specs.extend(unit_matches)
-    
-    # Rating/Standar
-    rating_matches = re.findall(r'\b(?:10K|5K|16K|20K|30K|SCH\s*\d+|PN\s*\d+|JIS|ANSI|DIN|DN\d+)\b', original_text)
-    specs.extend(rating_matches)
+    # Dimensi (10x20, 10*20, 10 X 20), Satuan Unit (termasuk " untuk inchi), Rating/Standar
+    # + versi bertipe (DIMENSI_1..3, NILAI, SATUAN, RATING) untuk pencarian rentang (spec_index.py)
+    dim_matches, unit_matches, rating_matches, spec_fields = parse_spesifikasi(original_text)
+    specs = dim_matches + unit_matches + rating_matches
     
     spec_str = ', '.join(sorted(set(specs), key=len, reverse=True)) # Urutkan dari yang terpanjang
     
@@ -159,7 +151,7 @@ def clean_and_parse_v2(text):
         
     tidy_name = ' '.join(components)
     
-    return pd.Series([category, brand, part_no, spec_str, tidy_name])
+    return pd.Series([category, brand, part_no, spec_str, tidy_name] + spec_fields)
 
 # ==========================================
 # 3. EKSEKUSI (GANTI NAMA FILE ANDA DI SINI)
@@ -175,10 +167,10 @@ except FileNotFoundError:
 
 print("Sedang merapikan data...")
 # Terapkan fungsi
-df_barang[['KATEGORI', 'MEREK', 'PART_NO', 'SPESIFIKASI', 'NAMA_BARANG_RAPIH']] = df_barang['BARANG'].apply(clean_and_parse_v2)
+df_barang[['KATEGORI', 'MEREK', 'PART_NO', 'SPESIFIKASI', 'NAMA_BARANG_RAPIH'] + KOLOM_SPESIFIKASI] = df_barang['BARANG'].apply(clean_and_parse_v2)
 
 # Pilih Kolom Output
-output_cols = ['BARANG', 'NAMA_BARANG_RAPIH', 'KATEGORI', 'MEREK', 'SPESIFIKASI', 'PART_NO', 'COA']
+output_cols = ['BARANG', 'NAMA_BARANG_RAPIH', 'KATEGORI', 'MEREK', 'SPESIFIKASI', 'PART_NO', 'COA'] + KOLOM_SPESIFIKASI
 df_final = df_barang[output_cols]
 
 # Simpan
@@ -186,4 +178,21 @@ output_file = 'Master_Barang_Rapih_V3.csv'
 df_final.to_csv(output_file, index=False)
 
 print(f"Sukses! Hasil disimpan di: {output_file}")
-print(df_final.head())
\ No newline at end of file
+print(df_final.head())
+
+# ==========================================
+# 4. TAHAP OPSIONAL: DETEKSI DUPLIKAT (MINHASH LSH)
+# ==========================================
+# Set True untuk menjalankan tahap ini (hasilnya daftar kandidat untuk dicek manual)
+CARI_DUPLIKAT = False
+
+if CARI_DUPLIKAT:
+    from master_dedup import FILE_DUPLIKAT, cari_duplikat, ringkas_duplikat
+
+    print("\nSedang mencari barang duplikat...")
+    df_duplikat = cari_duplikat(df_final)
+    df_duplikat.to_csv(FILE_DUPLIKAT, index=False)
+
+    ringkasan = ringkas_duplikat(df_duplikat)
+    print(f"Ditemukan {ringkasan['cluster']:,} cluster ({ringkasan['barang']:,} barang, "
+          f"{ringkasan['barang_berlebih']:,} kemungkinan duplikat). Disimpan di: {FILE_DUPLIKAT}")
\ No newline at end of file
@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI RELIABILITY
+# ==========================================
+# MTBF kalender (hari) dihitung dari selisih REPORT_DATE. Untuk mesin & generator
+# yang lebih penting adalah pemakaian, yaitu selisih counter Running Hours
+# (RH_THIS_MONTH_UNTIL_JOBDONE) antar pekerjaan berurutan pada komponen yang sama.
+#
+# Asumsi KOLOM_RH: walau namanya "THIS_MONTH", selisih antar job hanya bermakna jika
+# nilainya counter Running Hours kumulatif mesin saat job selesai (bukan jam sejak awal
+# bulan). Export Job Report tidak ikut di repo, jadi asumsi ini dicek saat jalan: jika
+# hampir semua nilai (persentil 95) <= MAKS_JAM_BULAN, kolom dianggap month-to-date dan
+# MTBF jam tidak dihitung. Selisih negatif (counter reset/ganti mesin/salah input)
+# dibuang dan jumlahnya dilaporkan.
+KEYS = ['VESSELID', 'COMPNAME']
+KOLOM_RH = 'RH_THIS_MONTH_UNTIL_JOBDONE'
+MAKS_JAM_BULAN = 31 * 24
+
+# ==========================================
+# 1. INTERVAL ANTAR PEKERJAAN (VECTORIZED)
+# ==========================================
+def hitung_interval_rh(df_done, keys=KEYS, laporan=True):
+    """
+    Selisih Running Hours antara setiap pekerjaan dan pekerjaan berikutnya
+    pada (Kapal, Komponen) yang sama, diurutkan berdasarkan REPORT_DATE.
+    Nilai RH 0/kosong (tidak diisi) dan selisih <= 0 (counter reset/salah input) diabaikan.
+    Jumlah selisih negatif yang dibuang disimpan di attrs['N_RESET'] (dicetak jika laporan=True);
+    attrs['RH_BULANAN'] = True jika kolom tampak month-to-date (hasil kosong).
+    """
+    df_sorted = df_done.sort_values(by=keys + ['REPORT_DATE'])
+    rh = pd.to_numeric(df_sorted[KOLOM_RH], errors='coerce').to_numpy(dtype=float)
+    group_id = df_sorted.groupby(keys, sort=False).ngroup().to_numpy()
+
+    # Bandingkan setiap baris dengan baris berikutnya dalam grup yang sama
+    same_group = group_id[1:] == group_id[:-1]
+    interval = rh[1:] - rh[:-1]
+    terisi = same_group & (rh[:-1] > 0) & (rh[1:] > 0)
+    valid = terisi & (interval > 0)
+    n_reset = int((terisi & (interval < 0)).sum())
+
+    rh_isi = rh[rh > 0]
+    rh_bulanan = len(rh_isi) > 0 and np.quantile(rh_isi, 0.95) <= MAKS_JAM_BULAN
+    if rh_bulanan:
+        valid[:] = False
+
+    df_interval = df_sorted[keys].iloc[:-1][valid].reset_index(drop=True)
+    df_interval['INTERVAL_JAM'] = interval[valid]
+    df_interval.attrs.update(N_RESET=n_reset, RH_BULANAN=rh_bulanan)
+    if laporan:
+        laporan_interval_rh(n_reset, rh_bulanan)
+    return df_interval
+
+
+def laporan_interval_rh(n_reset, rh_bulanan):
+    """Mencetak Warning untuk interval RH yang dibuang."""
+    if rh_bulanan:
+        print(f"Warning: {KOLOM_RH} tampak berisi jam bulan berjalan (<= {MAKS_JAM_BULAN} jam), MTBF jam tidak dihitung.")
+    elif n_reset:
+        print(f"Warning: {n_reset:,} selisih {KOLOM_RH} negatif (counter reset/salah input) diabaikan.")
+
+# ==========================================
+# 2. MTBF BERBASIS RUNNING HOURS
+# ==========================================
+def hitung_mtbf_jam(df_done, by='COMPNAME'):
+    """MTBF dalam jam operasi per komponen (atau per (Kapal, Komponen) jika by=KEYS)."""
+    df_interval = hitung_interval_rh(df_done)
+    mtbf_jam = df_interval.groupby(by)['INTERVAL_JAM'].agg(['mean', 'count']).reset_index()
+    mtbf_jam.columns = ([by] if isinstance(by, str) else list(by)) + ['MTBF_JAM', 'TOTAL_KEJADIAN_JAM']
+    mtbf_jam['MTBF_JAM'] = mtbf_jam['MTBF_JAM'].round(1)
+    return mtbf_jam
+
+# ==========================================
+# 3. DATA UMUR KOMPONEN (UNTUK WEIBULL)
+# ==========================================
+def data_umur_komponen(df_done, keys=KEYS):
+    """
+    Durasi (hari) setiap interval antar pekerjaan per (Kapal, Komponen).
+    GAGAL = 1 untuk interval yang diakhiri pekerjaan berikutnya, GAGAL = 0 untuk
+    interval terakhir yang masih berjalan sampai tanggal data terakhir (tersensor kanan).
+    """
+    df_sorted = df_done.sort_values(by=keys + ['REPORT_DATE'])
+    dates = df_sorted['REPORT_DATE'].to_numpy(dtype='datetime64[ns]')
+    group_id = df_sorted.groupby(keys, sort=False).ngroup().to_numpy()
+
+    is_last = np.append(group_id[1:] != group_id[:-1], True)
+    next_dates = np.append(dates[1:], dates.max())
+    # Baris terakhir setiap grup dihitung sampai tanggal data terakhir (sensor)
+    next_dates[is_last] = dates.max()
+    durasi = (next_dates - dates) // np.timedelta64(1, 'D')
+
+    df_umur = df_sorted[keys].reset_index(drop=True)
+    df_umur['DURASI_HARI'] = durasi
+    df_umur['GAGAL'] = (~is_last).astype(int)
+    return df_umur[df_umur['DURASI_HARI'] > 0].reset_index(drop=True)
+
+# ==========================================
+# 4. WEIBULL MLE (VECTORIZED UNTUK SEMUA GRUP)
+# ==========================================
+def fit_weibull(durasi, gagal, group_codes, n_groups, n_iter=60):
+    """
+    Estimasi MLE Weibull (shape k, scale lambda) dengan data tersensor kanan,
+    untuk ribuan grup sekaligus. Persamaan shape:
+        sum(t^k ln t)/sum(t^k) - 1/k - mean(ln t | gagal) = 0
+    diselesaikan dengan Newton yang dijaga bracket (bisection jika langkah keluar),
+    semua grup diiterasi bersama memakai np.bincount.
+    """
+    durasi = np.asarray(durasi, dtype=float)
+    gagal = np.asarray(gagal, dtype=float)
+    g = np.asarray(group_codes)
+
+    n_gagal = np.bincount(g, weights=gagal, minlength=n_groups)
+    n_total = np.bincount(g, minlength=n_groups)
+
+    # Skala per grup agar t^k tidak overflow (persamaan shape tidak bergantung skala)
+    scale_ref = np.bincount(g, weights=durasi, minlength=n_groups) / np.maximum(n_total, 1)
+    x = durasi / scale_ref[g]
+    log_x = np.log(x)
+    mean_log_gagal = np.bincount(g, weights=gagal * log_x, minlength=n_groups) / np.maximum(n_gagal, 1)
+
+    k = np.ones(n_groups)
+    lo = np.full(n_groups, 0.02)
+    hi = np.full(n_groups, 50.0)
+    for _ in range(n_iter):
+        xk = x ** k[g]
+        s0 = np.bincount(g, weights=xk, minlength=n_groups)
+        s1 = np.bincount(g, weights=xk * log_x, minlength=n_groups)
+        s2 = np.bincount(g, weights=xk * log_x ** 2, minlength=n_groups)
+
+        ratio = s1 / s0
+        f = ratio - 1 / k - mean_log_gagal
+        df = s2 / s0 - ratio ** 2 + 1 / k ** 2   # Selalu positif -> akar tunggal
+
+        # f naik monoton terhadap k: perbarui bracket lalu ambil langkah Newton
+        lo = np.where(f < 0, k, lo)
+        hi = np.where(f > 0, k, hi)
+        k_new = k - f / df
+        outside = ~((k_new > lo) & (k_new < hi))
+        k_new[outside] = (lo[outside] + hi[outside]) / 2
+
+        if np.all(np.abs(k_new - k) < 1e-8):
+            k = k_new
+            break
+        k = k_new
+
+    s0 = np.bincount(g, weights=x ** k[g], minlength=n_groups)
+    scale = scale_ref * (s0 / np.maximum(n_gagal, 1)) ** (1 / k)
+
+    # Minimal 3 kejadian gagal agar estimasi bermakna
+    cukup = n_gagal >= 3
+    return np.where(cukup, k, np.nan), np.where(cukup, scale, np.nan), n_gagal.astype(int), (n_total - n_gagal).astype(int)
+
+
+def pola_kegagalan(shape):
+    """Interpretasi shape Weibull: < 1 kerusakan dini, ~1 acak, > 1 aus (wear-out)."""
+    return np.select(
+        [np.isnan(shape), shape < 0.8, shape <= 1.2],
+        ['BELUM CUKUP DATA', 'DINI (INFANT)', 'ACAK (RANDOM)'],
+        default='AUS (WEAR-OUT)'
+    )
+
+
+def tabel_weibull(df_done, by='COMPNAME'):
+    """
+    Parameter Weibull per COMPNAME, atau per (Kapal, Komponen) jika by=KEYS.
+    Interval dari semua kapal digabung bila by='COMPNAME'.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    df_umur = data_umur_komponen(df_done)
+    group_codes, groups = pd.MultiIndex.from_frame(df_umur[by]).factorize()
+
+    shape, scale, n_gagal, n_sensor = fit_weibull(
+        df_umur['DURASI_HARI'], df_umur['GAGAL'], group_codes, len(groups)
+    )
+
+    tabel = groups.set_names(by).to_frame(index=False)
+    tabel['WEIBULL_SHAPE'] = np.round(shape, 3)
+    tabel['WEIBULL_SCALE_HARI'] = np.round(scale, 1)
+    tabel['JUMLAH_GAGAL'] = n_gagal
+    tabel['JUMLAH_SENSOR'] = n_sensor
+    tabel['POLA_KEGAGALAN'] = pola_kegagalan(shape)
+    return tabel
+
+# ==========================================
+# 5. QUERY PELUANG GAGAL (UNTUK DASHBOARD)
+# ==========================================
+class WeibullLookup:
+    """
+    Index parameter Weibull di memori (dict) untuk query cepat:
+    peluang komponen berumur `umur` hari rusak dalam `horizon` hari ke depan.
+        P = 1 - exp((umur/scale)^k - ((umur+horizon)/scale)^k)
+    """
+    def __init__(self, tabel, key='COMPNAME'):
+        valid = tabel.dropna(subset=['WEIBULL_SHAPE'])
+        self.params = dict(zip(valid[key], zip(valid['WEIBULL_SHAPE'], valid['WEIBULL_SCALE_HARI'])))
+
+    def peluang_gagal(self, key, umur_hari, horizon_hari):
+        if key not in self.params:
+            return None
+        k, scale = self.params[key]
+        return 1 - np.exp((umur_hari / scale) ** k - ((umur_hari + horizon_hari) / scale) ** k)
@@ -0,0 +1,245 @@
+import itertools
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from maintenance_data import load_job_reports, clean_job_reports
+from maintenance_store import store_tersedia, connect_store, simpan_tabel
+
+# ==========================================
+# KONFIGURASI PEMILIHAN ORDER SARIMAX
+# ==========================================
+# Dashboard v4 memakai order (1,1,1)(1,0,1,12) untuk semua komponen. Di sini setiap
+# komponen mencoba grid kandidat order (paralel antar komponen, ProcessPoolExecutor):
+#   1. Kandidat dengan parameter terlalu banyak untuk panjang data langsung dilewati.
+#   2. Fit singkat (ITER_AWAL iterasi); jika AIC-nya sudah jauh lebih buruk dari
+#      kandidat terbaik dengan differencing yang sama (> AIC_MARGIN), fit dihentikan.
+#      Sisanya dilanjutkan sampai konvergen.
+#   3. TOP_AIC kandidat dengan AIC terendah (per differencing) dibandingkan dengan error
+#      pada VALIDASI bulan sebelum HOLDOUT; pemenang = MAE validasi terkecil.
+#   4. HOLDOUT bulan terakhir tidak dipakai seleksi sama sekali: MAE_BACKTEST dihitung
+#      di sana (sama dengan jendela backtest dashboard v4), jadi bukan skor yang bias.
+# Order pemenang disimpan per komponen (FILE_ORDER_SARIMAX), sehingga dashboard
+# cukup fit satu model.
+FILE_ORDER_SARIMAX = 'Order_SARIMAX_Komponen.csv'
+ORDER_DEFAULT = ((1, 1, 1), (1, 0, 1, 12))
+
+GRID_ORDER = list(itertools.product([0, 1, 2], [0, 1], [0, 1, 2]))     # (p, d, q)
+GRID_SEASONAL = list(itertools.product([0, 1], [0], [0, 1], [12]))     # (P, D, Q, s)
+HOLDOUT = 3          # Bulan terakhir yang tidak pernah dilihat seleksi (jendela laporan)
+VALIDASI = 3         # Bulan sebelum HOLDOUT untuk memilih order
+MIN_JOB = 5          # Sama dengan filter dashboard (minimal 5 kejadian)
+MIN_BULAN = 10       # Sama dengan syarat dashboard (minimal 10 bulan data)
+ITER_AWAL = 15
+MAX_ITER = 50
+AIC_MARGIN = 10.0
+TOP_AIC = 5
+N_PROSES = None      # None = jumlah CPU
+
+# ==========================================
+# 1. SERI BULANAN & FIT
+# ==========================================
+def seri_bulanan(df_comp):
+    """Jumlah job per bulan (TAHUN, BULAN) dengan bulan kosong = 0, seperti di dashboard v4."""
+    tahun = pd.to_numeric(df_comp['TAHUN'], errors='coerce')
+    bulan = pd.to_numeric(df_comp['BULAN'], errors='coerce')
+    valid = (tahun > 2000) & bulan.between(1, 12)
+    tanggal = pd.to_datetime(dict(year=tahun[valid].astype(int), month=bulan[valid].astype(int), day=1))
+    return tanggal.value_counts().sort_index().resample('MS').sum().fillna(0).rename('Count')
+
+
+def fit_sarimax(y_log, order, seasonal_order, maxiter=MAX_ITER, start_params=None):
+    """Fit SARIMAX pada log1p(jumlah job) dengan pengaturan yang sama seperti dashboard."""
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    model = SARIMAX(
+        y_log,
+        order=order,
+        seasonal_order=seasonal_order,
+        enforce_stationarity=False,
+        enforce_invertibility=False
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return model.fit(disp=False, maxiter=maxiter, start_params=start_params)
+
+
+def _jumlah_parameter(order, seasonal_order):
+    p, _, q = order
+    P, _, Q, _ = seasonal_order
+    return p + q + P + Q + 1    # + varians
+
+
+def _perlu_dilewati(order, seasonal_order, n_train):
+    """Kandidat 'tanpa harapan' sebelum fit: data terlalu pendek untuk parameter/musiman."""
+    p, d, q = order
+    P, D, Q, s = seasonal_order
+    if (P or Q) and n_train < 2 * s + d:
+        return True
+    return _jumlah_parameter(order, seasonal_order) * 3 > n_train - d - s * D
+
+# ==========================================
+# 2. PENCARIAN ORDER SATU KOMPONEN
+# ==========================================
+def ramal_order(train, order, seasonal_order, horizon, maxiter=MAX_ITER, start_params=None):
+    """Fit pada train lalu ramal `horizon` bulan (skala asli, >= 0). ValueError jika hasil tidak finite."""
+    fit = fit_sarimax(np.log1p(train), order, seasonal_order, maxiter=maxiter, start_params=start_params)
+    pred = np.clip(np.expm1(fit.forecast(horizon)), 0, None)
+    if not np.all(np.isfinite(pred)):
+        raise ValueError('Prediksi SARIMAX tidak finite.')
+    return pred
+
+
+def pilih_order(nilai, validasi=VALIDASI, grid_order=GRID_ORDER, grid_seasonal=GRID_SEASONAL):
+    """
+    Seleksi order hanya dari `nilai`: fit pada nilai[:-validasi], dinilai pada `validasi`
+    bulan terakhirnya. AIC hanya dibandingkan antar kandidat dengan differencing (d, D)
+    yang sama (likelihood seri yang di-difference berbeda tidak sebanding), jadi
+    penghentian dini & shortlist TOP_AIC berlaku per (d, D); pemenang = MAE validasi
+    terkecil dari semua shortlist. None jika tidak ada kandidat yang berhasil.
+    """
+    y = np.asarray(nilai, dtype=float)
+    train, val = y[:-validasi], y[-validasi:]
+    train_log = np.log1p(train)
+
+    hasil, dihentikan, dilewati = [], 0, 0
+    best_aic = {}
+    # Kandidat sederhana lebih dulu -> AIC terbaik cepat rendah -> lebih banyak fit dihentikan
+    kandidat = sorted(itertools.product(grid_order, grid_seasonal), key=lambda k: _jumlah_parameter(*k))
+    for order, seasonal_order in kandidat:
+        if _perlu_dilewati(order, seasonal_order, len(train)):
+            dilewati += 1
+            continue
+        diff = (order[1], seasonal_order[1])
+        try:
+            fit = fit_sarimax(train_log, order, seasonal_order, maxiter=ITER_AWAL)
+            if not np.isfinite(fit.aic) or fit.aic > best_aic.get(diff, np.inf) + AIC_MARGIN:
+                dihentikan += 1
+                continue
+            if not fit.mle_retvals.get('converged', True):
+                fit = fit_sarimax(train_log, order, seasonal_order, start_params=fit.params)
+            if not np.isfinite(fit.aic):
+                dihentikan += 1
+                continue
+            pred = np.clip(np.expm1(fit.forecast(validasi)), 0, None)
+        except (ValueError, np.linalg.LinAlgError):
+            dihentikan += 1
+            continue
+        if not np.all(np.isfinite(pred)):
+            dihentikan += 1
+            continue
+
+        best_aic[diff] = min(best_aic.get(diff, np.inf), fit.aic)
+        hasil.append((diff, fit.aic, np.abs(val - pred).mean(), order, seasonal_order))
+
+    if not hasil:
+        return None
+    # Shortlist AIC terendah per differencing, pemenang = error validasi terkecil
+    shortlist = []
+    for diff in best_aic:
+        shortlist += sorted((h for h in hasil if h[0] == diff), key=lambda h: h[1])[:TOP_AIC]
+    _, aic, mae, order, seasonal_order = min(shortlist, key=lambda h: (h[2], _jumlah_parameter(h[3], h[4])))
+    return {
+        'order': order, 'seasonal_order': seasonal_order, 'aic': aic, 'mae_validasi': mae,
+        'difit': len(hasil), 'dihentikan': dihentikan, 'dilewati': dilewati,
+    }
+
+
+def cari_order(nilai, holdout=HOLDOUT, validasi=VALIDASI, grid_order=GRID_ORDER, grid_seasonal=GRID_SEASONAL):
+    """
+    nilai: array jumlah job per bulan (berurutan). Order dipilih tanpa `holdout` bulan
+    terakhir (pilih_order), lalu difit ulang sampai sebelum holdout dan diuji pada holdout
+    itu: MAE/NMAE_BACKTEST = error pada bulan yang tidak pernah dilihat seleksi.
+    Mengembalikan dict order terpilih + AIC, MAE validasi & backtest, jumlah kandidat.
+    """
+    y = np.asarray(nilai, dtype=float)
+    if len(y) <= holdout + validasi:
+        return None
+    pilihan = pilih_order(y[:-holdout], validasi, grid_order, grid_seasonal)
+    if pilihan is None:
+        return None
+    order, seasonal_order = pilihan['order'], pilihan['seasonal_order']
+
+    test = y[-holdout:]
+    try:
+        mae = np.abs(test - ramal_order(y[:-holdout], order, seasonal_order, holdout)).mean()
+    except (ValueError, np.linalg.LinAlgError):
+        mae = np.nan
+    rata2 = test.mean()
+    return {
+        'ORDER': ','.join(map(str, order)),
+        'SEASONAL_ORDER': ','.join(map(str, seasonal_order)),
+        'AIC': round(float(pilihan['aic']), 2),
+        'MAE_VALIDASI': round(float(pilihan['mae_validasi']), 3),
+        'MAE_BACKTEST': round(float(mae), 3),
+        'NMAE_BACKTEST': round(float(mae / rata2), 3) if rata2 > 0 else 0.0,
+        'KANDIDAT_DIFIT': pilihan['difit'],
+        'KANDIDAT_DIHENTIKAN': pilihan['dihentikan'],
+        'KANDIDAT_DILEWATI': pilihan['dilewati'],
+    }
+
+
+def _cari_order_task(args):
+    comp, nilai = args
+    hasil = cari_order(nilai)
+    if hasil is None:
+        return None
+    return {'COMPNAME': comp, 'N_BULAN': len(nilai), **hasil}
+
+# ==========================================
+# 3. SEMUA KOMPONEN (PROCESS POOL)
+# ==========================================
+def cari_order_semua(df_done, n_proses=N_PROSES, min_job=MIN_JOB, min_bulan=MIN_BULAN):
+    """Tabel order terpilih per COMPNAME (komponen dengan data cukup saja)."""
+    jumlah = df_done['COMPNAME'].value_counts()
+    tugas = []
+    for comp, df_comp in df_done[df_done['COMPNAME'].isin(jumlah[jumlah >= min_job].index)].groupby('COMPNAME'):
+        seri = seri_bulanan(df_comp)
+        if len(seri) >= min_bulan:
+            tugas.append((comp, seri.to_numpy()))
+
+    # Seri terpanjang dulu agar pekerja tidak menunggu satu tugas berat di akhir
+    tugas.sort(key=lambda t: -len(t[1]))
+    with ProcessPoolExecutor(max_workers=n_proses) as pool:
+        hasil = [h for h in pool.map(_cari_order_task, tugas, chunksize=4) if h is not None]
+    return pd.DataFrame(hasil)
+
+
+def baca_order(path=FILE_ORDER_SARIMAX):
+    """{COMPNAME: (order, seasonal_order)} dari hasil pencarian; {} jika belum ada."""
+    try:
+        tabel = pd.read_csv(path)
+    except FileNotFoundError:
+        return {}
+    ke_tuple = lambda teks: tuple(int(x) for x in str(teks).split(','))
+    return {
+        comp: (ke_tuple(o), ke_tuple(s))
+        for comp, o, s in zip(tabel['COMPNAME'], tabel['ORDER'], tabel['SEASONAL_ORDER'])
+    }
+
+# ==========================================
+# 4. EKSEKUSI
+# ==========================================
+if __name__ == '__main__':
+    print("\n--- [1] MEMUAT DATA MAINTENANCE ---")
+    df_done = clean_job_reports(load_job_reports())
+    print(f"Sukses! Total Data Maintenance (selesai): {len(df_done):,} baris.")
+
+    n_kandidat = len(GRID_ORDER) * len(GRID_SEASONAL)
+    print(f"\n--- [2] MENCARI ORDER SARIMAX ({n_kandidat} kandidat/komponen, {N_PROSES or os.cpu_count()} proses) ---")
+    t0 = time.perf_counter()
+    tabel_order = cari_order_semua(df_done)
+    print(f"Selesai dalam {time.perf_counter() - t0:.1f} detik untuk {len(tabel_order):,} komponen.")
+
+    tabel_order.to_csv(FILE_ORDER_SARIMAX, index=False)
+    if store_tersedia():
+        conn = connect_store()
+        simpan_tabel(conn, 'order_sarimax', tabel_order, {'idx_order_comp': ['COMPNAME']})
+        conn.close()
+    print(f"Order terpilih disimpan di: {FILE_ORDER_SARIMAX}")
+    if not tabel_order.empty:
+        print(tabel_order[['COMPNAME', 'ORDER', 'SEASONAL_ORDER', 'AIC', 'MAE_BACKTEST', 'KANDIDAT_DIHENTIKAN']].head(10))
@@ -0,0 +1,66 @@
+import os
+import pandas as pd
+import pyarrow as pa
+
+# ==========================================
+# KONFIGURASI SHARED DATA
+# ==========================================
+# Dataset bersih disimpan sekali sebagai file Arrow IPC (tanpa kompresi),
+# lalu di-memory-map oleh setiap sesi/proses Streamlit. Buffer-nya berasal dari
+# page cache OS yang sama, sehingga memori tidak bertambah per user.
+# Dipakai oleh ingest_daemon (part per workbook) dan parquet_store (salinan penuh
+# setiap versi dataset untuk tampilan tanpa filter).
+
+# Kolom teks dibaca sebagai string[pyarrow] agar tetap menunjuk ke buffer Arrow (zero-copy)
+_STRING_TYPES = {
+    pa.string(): pd.StringDtype('pyarrow'),
+    pa.large_string(): pd.StringDtype('pyarrow'),
+}
+
+# ==========================================
+# 1. PUBLISH (SEKALI, OLEH PROSES PEMBUAT DATA)
+# ==========================================
+def seragamkan_teks(df):
+    """Salinan df dengan kolom object campuran (misal angka 0 dan teks '-') diseragamkan menjadi teks."""
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def publish_dataset(df, path):
+    """
+    Menulis DataFrame bersih ke file Arrow IPC.
+    Ditulis ke file sementara lalu di-rename, sehingga pembaca tidak pernah
+    melihat file yang setengah jadi.
+    """
+    publish_table(pa.Table.from_pandas(seragamkan_teks(df), preserve_index=False), path)
+
+
+def publish_table(table, path):
+    """Sama dengan publish_dataset untuk tabel Arrow yang sudah jadi."""
+    tmp_path = path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+# ==========================================
+# 2. MAP (DI SETIAP SESI, READ-ONLY)
+# ==========================================
+def map_dataset(path):
+    """
+    Membuka file Arrow secara memory-mapped dan mengembalikan DataFrame
+    yang kolomnya menunjuk langsung ke buffer file (read-only).
+    """
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True, types_mapper=_STRING_TYPES.get)
+
+
+def dataset_perlu_dibangun(source_files, path):
+    """True jika file `path` belum ada atau lebih lama dari salah satu file sumber."""
+    if not os.path.exists(path):
+        return True
+    dataset_mtime = os.path.getmtime(path)
+    return any(os.path.exists(f) and os.path.getmtime(f) > dataset_mtime for f in source_files)
@@ -0,0 +1,168 @@
+import itertools
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI FIELD SPESIFIKASI BERTIPE
+# ==========================================
+# clean_and_parse_v2 (pivot_master.py) menggabungkan dimensi, satuan & rating menjadi
+# satu teks SPESIFIKASI. Di sini pola yang sama juga diurai menjadi kolom bertipe:
+#   DIMENSI_1..3 (angka, dari "10 X 20 X 5"), NILAI + SATUAN (angka pertama bersatuan,
+#   misal 20 MM, 5.5 KW), RATING (JIS, 10K, DN50, ...)
+# SpecIndex menyimpan nilai terurut per (KATEGORI, MEREK, SATUAN), sehingga pencarian
+# "kategori + rentang ukuran + merek" cukup dua kali binary search (np.searchsorted).
+DAFTAR_SATUAN = ['MM', 'CM', 'M', 'INCH', 'KG', 'LTR', 'VOLT', 'WATT', 'AMP', 'A', 'HP', 'KW', 'KVA', 'BAR', 'PSI', 'V', 'HZ', '"']
+ALIAS_SATUAN = {'"': 'INCH'}
+
+_ANGKA = r'\d+(?:[\.,]\d+)?'
+POLA_DIMENSI = r'\b' + _ANGKA + r'\s*[xX\*]\s*' + _ANGKA + r'(?:\s*[xX\*]\s*' + _ANGKA + r')?\b'
+# Menambahkan \b di depan angka agar tidak memotong kata (misal A20 tidak jadi 20)
+POLA_SATUAN = r'\b' + _ANGKA + r'\s*(?:' + '|'.join(DAFTAR_SATUAN) + ')'
+POLA_RATING = r'\b(?:10K|5K|16K|20K|30K|SCH\s*\d+|PN\s*\d+|JIS|ANSI|DIN|DN\d+)\b'
+
+# Versi bertipe (hanya untuk kolom bertipe, teks SPESIFIKASI tetap memakai pola di atas):
+# angka harus diawali spasi, ( atau awal teks ("A20 MM", "3/4\"" bukan 20 MM / 4 INCH), satuan harus
+# diikuti spasi, akhir teks atau , ; ) ("38 M2" bukan 38 M), dan satuan satu huruf
+# (A, V, M) harus dipisah spasi dari angkanya ("6204M", "12V" adalah kode/tipe)
+_SATUAN_HURUF = [s for s in DAFTAR_SATUAN if len(s) == 1 and s.isalpha()]
+_SATUAN_LAIN = [s for s in DAFTAR_SATUAN if s not in _SATUAN_HURUF]
+_AWAL = r'(?<![^\s(])'
+_AKHIR = r'(?=[\s,;)]|$)'
+_POLA_NILAI = re.compile(
+    _AWAL + '(' + _ANGKA + r')(?:\s*(' + '|'.join(map(re.escape, _SATUAN_LAIN)) + r')|\s+('
+    + '|'.join(_SATUAN_HURUF) + '))' + _AKHIR
+)
+# Satuan di belakang dimensi ("90X50MM", "(150X150 MM)") ikut diambil: dipakai sebagai
+# SATUAN jika _POLA_NILAI tidak menemukan angka bersatuan yang berdiri sendiri
+_POLA_DIMENSI_NILAI = re.compile(
+    _AWAL + '(' + _ANGKA + r')\s*[xX\*]\s*(' + _ANGKA + r')(?:\s*[xX\*]\s*(' + _ANGKA + r'))?'
+    + r'(?:\s*(' + '|'.join(map(re.escape, _SATUAN_LAIN)) + r')|\s+(' + '|'.join(_SATUAN_HURUF) + r'))?'
+    + _AKHIR
+)
+
+KOLOM_SPESIFIKASI = ['DIMENSI_1', 'DIMENSI_2', 'DIMENSI_3', 'NILAI', 'SATUAN', 'RATING']
+KOLOM_ANGKA = ['DIMENSI_1', 'DIMENSI_2', 'DIMENSI_3', 'NILAI']
+
+# ==========================================
+# 1. PARSING
+# ==========================================
+def _angka(teks):
+    return float(teks.replace(',', '.'))
+
+
+def parse_spesifikasi(text):
+    """
+    Teks barang (huruf besar) -> (dimensi, satuan, rating, field bertipe).
+    Tiga daftar pertama = potongan teks untuk SPESIFIKASI, field bertipe = list
+    sesuai KOLOM_SPESIFIKASI (NaN / '' jika tidak ada).
+    """
+    dim_matches = re.findall(POLA_DIMENSI, text)
+    unit_matches = re.findall(POLA_SATUAN, text)
+    rating_matches = re.findall(POLA_RATING, text)
+
+    dims, satuan_dimensi = [np.nan] * 3, ''
+    cocok = _POLA_DIMENSI_NILAI.search(text)
+    if cocok:
+        dims = [np.nan if d is None else _angka(d) for d in cocok.groups()[:3]]
+        satuan_dimensi = cocok.group(4) or cocok.group(5) or ''
+
+    nilai, satuan = np.nan, satuan_dimensi
+    cocok = _POLA_NILAI.search(text)
+    if cocok:
+        nilai = _angka(cocok.group(1))
+        satuan = cocok.group(2) or cocok.group(3)
+    satuan = ALIAS_SATUAN.get(satuan, satuan)
+
+    rating = ', '.join(dict.fromkeys(re.sub(r'\s+', '', r) for r in rating_matches))
+    return dim_matches, unit_matches, rating_matches, dims + [nilai, satuan, rating]
+
+
+def tambah_kolom_spesifikasi(df, kolom='BARANG'):
+    """Menambahkan KOLOM_SPESIFIKASI ke master barang lama (dari teks `kolom`)."""
+    fields = [parse_spesifikasi(t.upper())[3] if isinstance(t, str) else [np.nan] * 4 + ['', '']
+              for t in df[kolom]]
+    df = df.copy()
+    df[KOLOM_SPESIFIKASI] = pd.DataFrame(fields, index=df.index, columns=KOLOM_SPESIFIKASI)
+    return df
+
+# ==========================================
+# 2. INDEX RENTANG (TERURUT + BINARY SEARCH)
+# ==========================================
+def _teks(s):
+    return s.fillna('').astype(str).str.strip().str.upper()
+
+
+class SpecIndex:
+    def __init__(self, df_master, kolom_angka=KOLOM_ANGKA):
+        """
+        df_master: master barang (KATEGORI, MEREK + KOLOM_SPESIFIKASI). Jika kolom
+        spesifikasi belum ada, dihitung dari BARANG.
+        """
+        if 'NILAI' not in df_master.columns:
+            df_master = tambah_kolom_spesifikasi(df_master)
+        self.df = df_master.reset_index(drop=True)
+        self._index = {}
+
+        kunci = pd.DataFrame({
+            'KATEGORI': _teks(self.df['KATEGORI']),
+            'MEREK': _teks(self.df['MEREK']),
+            'SATUAN': _teks(self.df['SATUAN']),
+        })
+        for kolom in kolom_angka:
+            nilai = pd.to_numeric(self.df[kolom], errors='coerce')
+            ada = nilai.notna().to_numpy()
+            # Urut per nilai sekali, lalu dibagi per kunci (urutan di dalam grup tetap terurut)
+            urut = nilai[ada].sort_values(kind='stable')
+            sub = kunci.loc[urut.index]
+            # MEREK / SATUAN None = semua merek / semua satuan
+            for pakai_merek, pakai_satuan in itertools.product((True, False), repeat=2):
+                by = ['KATEGORI'] + (['MEREK'] if pakai_merek else []) + (['SATUAN'] if pakai_satuan else [])
+                for k, posisi in sub.groupby(by, sort=False).indices.items():
+                    k = k if isinstance(k, tuple) else (k,)
+                    merek = k[1] if pakai_merek else None
+                    satuan = k[-1] if pakai_satuan else None
+                    self._index[(kolom, k[0], merek, satuan)] = (
+                        urut.to_numpy()[posisi], urut.index.to_numpy()[posisi])
+
+    def cari(self, kategori, kolom='DIMENSI_1', minimum=-np.inf, maksimum=np.inf, merek=None, satuan=None):
+        """
+        Barang dengan KATEGORI = kategori dan minimum <= kolom <= maksimum, diurutkan
+        menurut nilai kolom. merek / satuan None = tidak difilter ('' = tanpa merek).
+        Contoh: bearing dengan diameter dalam 20 mm -> cari('BEARING', 'DIMENSI_1', 20, 20).
+        """
+        bersih = lambda v: None if v is None else str(v).strip().upper()
+        satuan = ALIAS_SATUAN.get(bersih(satuan), bersih(satuan))
+        kosong = (np.empty(0), np.empty(0, dtype=np.int64))
+        nilai, baris = self._index.get((kolom, bersih(kategori), bersih(merek), satuan), kosong)
+        awal = np.searchsorted(nilai, minimum, side='left')
+        akhir = np.searchsorted(nilai, maksimum, side='right')
+        return self.df.iloc[baris[awal:akhir]]
+
+# ==========================================
+# 3. EKSEKUSI (CONTOH QUERY)
+# ==========================================
+if __name__ == '__main__':
+    from maintenance_data import FILE_MASTER_BARANG
+
+    print("\n--- [1] MEMBANGUN INDEX SPESIFIKASI ---")
+    try:
+        df_master = pd.read_csv(FILE_MASTER_BARANG)
+    except FileNotFoundError:
+        print(f"Error: '{FILE_MASTER_BARANG}' tidak ditemukan. Jalankan pivot_master.py dulu.")
+        exit()
+    t0 = time.perf_counter()
+    index = SpecIndex(df_master)
+    print(f"Selesai dalam {time.perf_counter() - t0:.2f} detik untuk {len(index.df):,} barang "
+          f"({index.df['DIMENSI_1'].notna().sum():,} berdimensi, {index.df['NILAI'].notna().sum():,} bersatuan).")
+
+    print("\n--- [2] CONTOH: BEARING DENGAN DIMENSI PERTAMA 20 ---")
+    t0 = time.perf_counter()
+    hasil = index.cari('BEARING', 'DIMENSI_1', 20, 20)
+    print(f"{len(hasil):,} barang, query {1000 * (time.perf_counter() - t0):.2f} ms")
+    print(hasil[['NAMA_BARANG_RAPIH', 'MEREK', 'DIMENSI_1', 'DIMENSI_2', 'DIMENSI_3']].head(10))
+
+    print("\n--- [3] CONTOH: PUMP 5-20 KW ---")
+    print(index.cari('PUMP', 'NILAI', 5, 20, satuan='KW')[['NAMA_BARANG_RAPIH', 'MEREK', 'NILAI', 'SATUAN']].head(10))
@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+
+from count_matrix import matriks_bulanan_dari_long
+
+# ==========================================
+# TREND ENGINE (PENGGANTI TREN_24_vs_25)
+# ==========================================
+# Tren lama = total tahun ini - total tahun lalu. Karena tahun berjalan belum
+# lengkap (misal 2025 baru Jan-Juni), hampir semua komponen tampak "TURUN".
+# Engine ini bekerja pada matriks hitungan bulanan (komponen x bulan) dan
+# menghitung untuk SEMUA komponen sekaligus (vectorized):
+#   - TREN_12_BULAN : total 12 bulan terakhir - total 12 bulan sebelumnya
+#   - TREN_YOY      : Jan..bulan terakhir tahun ini - periode yang sama tahun lalu
+#   - SLOPE_12_BULAN: kemiringan regresi linear 12 bulan terakhir (job/bulan)
+# Jika tanggal data terakhir diketahui dan bulan terakhir belum lengkap (misal data
+# sampai 15 Jun), bulan pembanding tahun lalu diprorata (Jun tahun lalu x 15/30) dan
+# slope hanya memakai bulan lengkap.
+# Hitungan baru (misal part hasil ingest) ditambahkan dengan tambah_bulanan() tanpa
+# membangun ulang matriks; bulan terakhir yang belum lengkap ikut diperbarui.
+
+# Kolom tren yang digabungkan ke tabel analisis
+KOLOM_TREN = ['TREN_YOY', 'TREN_12_BULAN', 'SLOPE_12_BULAN']
+
+NAMA_BULAN = ['Jan', 'Feb', 'Mar', 'Apr', 'Mei', 'Jun', 'Jul', 'Agu', 'Sep', 'Okt', 'Nov', 'Des']
+
+
+class TrendEngine:
+    def __init__(self, counts, labels, first_period, name='COMPNAME', tanggal_akhir=None):
+        """
+        counts        : array (jumlah label x jumlah bulan), bulan berurutan tanpa lubang
+        labels        : nama baris (misal COMPNAME)
+        first_period  : nomor periode kolom pertama (tahun*12 + bulan-1)
+        tanggal_akhir : tanggal data terakhir (None = bulan terakhir dianggap lengkap)
+        """
+        self.name = name
+        self.labels = pd.Index(labels, name=name)
+        self.first_period = int(first_period)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.tanggal_akhir = None if tanggal_akhir is None or pd.isna(tanggal_akhir) else pd.Timestamp(tanggal_akhir)
+        self._hitung_kumulatif()
+
+    def _hitung_kumulatif(self):
+        # Kumulatif per baris dengan kolom nol di depan -> jumlah jendela = cs[:, akhir] - cs[:, awal]
+        self._cumsum = np.concatenate(
+            [np.zeros((len(self.labels), 1), dtype=np.int64), np.cumsum(self.counts, axis=1)], axis=1
+        )
+
+    # ------------------------------------------
+    # KONSTRUKTOR
+    # ------------------------------------------
+    @classmethod
+    def from_builder(cls, builder, dim='COMPNAME'):
+        """Dibangun dari CountMatrixBuilder (dimensi 'period' dari REPORT_DATE)."""
+        counts, first, labels = builder.monthly(dim)
+        return cls(counts, labels, first, name=dim, tanggal_akhir=builder.df[builder.date_col].max())
+
+    @classmethod
+    def from_long(cls, df_long, dim='COMPNAME', period_col='PERIOD', count_col='JUMLAH', tanggal_akhir=None):
+        """Dibangun dari tabel panjang (dim, periode, jumlah), misal hasil query store."""
+        counts, first, labels = matriks_bulanan_dari_long(df_long, dim, period_col, count_col)
+        return cls(counts, labels, first, name=dim, tanggal_akhir=tanggal_akhir)
+
+    # ------------------------------------------
+    # UPDATE INKREMENTAL
+    # ------------------------------------------
+    @property
+    def last_period(self):
+        return self.first_period + self.counts.shape[1] - 1
+
+    def tambah_bulanan(self, df_long, period_col='PERIOD', count_col='JUMLAH', tanggal_akhir=None):
+        """
+        Menambahkan hitungan baru (tabel panjang: label, periode, jumlah) ke matriks.
+        Bulan yang sudah ada (termasuk bulan terakhir yang belum lengkap) dijumlahkan,
+        bulan baru menjadi kolom baru (bulan kosong di antaranya diisi nol) dan label
+        baru mendapat riwayat nol. tanggal_akhir: tanggal terakhir di data baru.
+        """
+        if tanggal_akhir is not None and pd.notna(tanggal_akhir):
+            tanggal_akhir = pd.Timestamp(tanggal_akhir)
+            if self.tanggal_akhir is None or tanggal_akhir > self.tanggal_akhir:
+                self.tanggal_akhir = tanggal_akhir
+        if df_long.empty:
+            return
+
+        periods = df_long[period_col].to_numpy(dtype=np.int64)
+        new_labels = pd.Index(df_long[self.name].unique()).difference(self.labels)
+        n_label, n_bulan = self.counts.shape
+        self.labels = self.labels.append(pd.Index(new_labels, name=self.name))
+
+        first = min(self.first_period, int(periods.min()))
+        last = max(self.last_period, int(periods.max()))
+        counts = np.zeros((len(self.labels), last - first + 1), dtype=np.int64)
+        geser = self.first_period - first
+        counts[:n_label, geser:geser + n_bulan] = self.counts
+        np.add.at(counts, (self.labels.get_indexer(df_long[self.name]), periods - first),
+                  df_long[count_col].to_numpy(dtype=np.int64))
+
+        self.counts = counts
+        self.first_period = first
+        self._hitung_kumulatif()
+
+    # ------------------------------------------
+    # METRIK TREN
+    # ------------------------------------------
+    def _window_sum(self, end, length):
+        """Jumlah job pada kolom [end-length, end) untuk semua baris sekaligus."""
+        if end <= 0:
+            return np.zeros(len(self.labels), dtype=np.int64)
+        start = max(end - length, 0)
+        return self._cumsum[:, end] - self._cumsum[:, start]
+
+    def fraksi_bulan_akhir(self):
+        """Bagian bulan terakhir yang sudah tercakup data (1.0 = lengkap / tidak diketahui)."""
+        if self.tanggal_akhir is None:
+            return 1.0
+        tanggal = self.tanggal_akhir
+        if tanggal.year * 12 + tanggal.month - 1 != self.last_period:
+            return 1.0
+        return tanggal.day / tanggal.days_in_month
+
+    def slope(self, window=12):
+        """Kemiringan regresi linear (job/bulan) pada `window` bulan lengkap terakhir."""
+        akhir = self.counts.shape[1] - (self.fraksi_bulan_akhir() < 1)
+        y = self.counts[:, max(akhir - window, 0):akhir]
+        x = np.arange(y.shape[1], dtype=float)
+        x -= x.mean()
+        denom = (x ** 2).sum()
+        return y @ x / denom if denom > 0 else np.zeros(len(self.labels))
+
+    def summary(self, window=12):
+        """
+        Tabel tren per baris (index = label). Jika bulan terakhir belum lengkap, bulan
+        yang sama tahun lalu (kolom terakhir jendela pembanding) dihitung pro-rata.
+        """
+        n_months = self.counts.shape[1]
+        n_ytd = self.last_period % 12 + 1  # Jumlah bulan berjalan di tahun terakhir
+
+        t12_now = self._window_sum(n_months, window)
+        t12_prev = self._window_sum(n_months - window, window)
+        ytd_now = self._window_sum(n_months, n_ytd)
+        ytd_prev = self._window_sum(n_months - 12, n_ytd)
+
+        fraksi = self.fraksi_bulan_akhir()
+        if fraksi < 1:
+            # Bulan pembanding untuk bulan berjalan = 12 bulan sebelumnya (akhir kedua jendela lalu)
+            koreksi = (1 - fraksi) * self.counts[:, n_months - 13] if n_months > 12 else 0
+            t12_prev = np.round(t12_prev - koreksi, 1)
+            ytd_prev = np.round(ytd_prev - koreksi, 1)
+
+        result = pd.DataFrame({
+            'T12_INI': t12_now,
+            'T12_LALU': t12_prev,
+            'TREN_12_BULAN': np.round(t12_now - t12_prev, 1),
+            'YTD_INI': ytd_now,
+            'YTD_LALU': ytd_prev,
+            'TREN_YOY': np.round(ytd_now - ytd_prev, 1),
+            'SLOPE_12_BULAN': np.round(self.slope(window), 2),
+        }, index=self.labels)
+
+        result['STATUS_TREN'] = np.select(
+            [result['TREN_YOY'] > 0, result['TREN_YOY'] < 0], ['NAIK', 'TURUN'], default='STABIL'
+        )
+        return result
+
+    def periode_yoy(self):
+        """Teks periode pembanding YoY, misal 'Jan-Jun 2025 vs Jan-Jun 2024'."""
+        year, month_idx = divmod(self.last_period, 12)
+        bulan = f"Jan-{NAMA_BULAN[month_idx]}" if month_idx > 0 else "Jan"
+        teks = f"{bulan} {year} vs {bulan} {year - 1}"
+        if self.fraksi_bulan_akhir() < 1:
+            tanggal = self.tanggal_akhir
+            teks += f" ({NAMA_BULAN[month_idx]} {year - 1} diprorata {tanggal.day}/{tanggal.days_in_month} hari)"
+        return teks
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI PEMBACA XLSX (STREAMING)
+# ==========================================
+# pd.read_excel membentuk semua kolom workbook Job Report, padahal dashboard &
+# script hanya memakai sekitar sebelas kolom di bawah ini. Pembaca ini memakai
+# openpyxl read-only (iter_rows) sehingga baris dibaca satu per satu, hanya kolom
+# yang diminta yang disimpan, dan setiap blok CHUNK_ROWS baris langsung diubah
+# menjadi array bertipe (int/float/datetime/object) sebelum blok berikutnya dibaca.
+KOLOM_JOB_REPORT = [
+    'TAHUN', 'BULAN', 'VESSELID', 'COMPNAME', 'JOBTITLE', 'JOBDESC', 'FREQ_TYPE',
+    'MAKERS_NAME', 'JOBREPORT_DATE', 'JOB_TIMESTAMP', 'RH_THIS_MONTH_UNTIL_JOBDONE',
+]
+CHUNK_ROWS = 50000
+
+
+def _blok_ke_array(nilai):
+    """List nilai satu kolom -> array bertipe (inferensi sama seperti pandas)."""
+    return pd.Series(nilai, dtype=object).infer_objects().to_numpy()
+
+
+def iter_blok_xlsx(path, columns=KOLOM_JOB_REPORT, sheet_name=None, chunk_rows=CHUNK_ROWS):
+    """
+    Generator blok ({kolom: array bertipe}, jumlah baris) dari satu workbook, setiap
+    blok paling banyak chunk_rows baris. Kolom yang tidak ada di workbook tidak
+    ikut di dict blok (dengan peringatan).
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+        # Dimensi di file hasil export sering tidak akurat; baca sampai baris terakhir
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+
+        header = next(rows, ())
+        posisi = {str(h).strip(): i for i, h in enumerate(header) if h is not None}
+        ada = [c for c in columns if c in posisi]
+        hilang = [c for c in columns if c not in posisi]
+        if hilang:
+            print(f"Warning: kolom {hilang} tidak ada di '{path}', diisi kosong.")
+
+        idx = [posisi[c] for c in ada]
+        lebar = max(idx) + 1 if idx else 0
+        blok = {c: [] for c in ada}
+        n_blok = 0
+
+        for row in rows:
+            if len(row) < lebar:
+                row = row + (None,) * (lebar - len(row))
+            nilai = [row[i] for i in idx]
+            # Baris kosong (hanya format sel) dilewati
+            if all(v is None for v in nilai):
+                continue
+            for c, v in zip(ada, nilai):
+                blok[c].append(v)
+            n_blok += 1
+            if n_blok == chunk_rows:
+                yield {c: _blok_ke_array(blok[c]) for c in ada}, n_blok
+                blok = {c: [] for c in ada}
+                n_blok = 0
+        yield {c: _blok_ke_array(blok[c]) for c in ada}, n_blok
+    finally:
+        wb.close()
+
+
+def iter_xlsx_kolom(path, columns=KOLOM_JOB_REPORT, sheet_name=None, chunk_rows=CHUNK_ROWS):
+    """Generator DataFrame per blok chunk_rows baris (mode out-of-core)."""
+    for blok, n_baris in iter_blok_xlsx(path, columns, sheet_name, chunk_rows):
+        if n_baris == 0:
+            continue
+        yield pd.DataFrame({
+            c: pd.Series(blok[c]).infer_objects() if c in blok else pd.Series(np.nan, index=range(n_baris))
+            for c in columns
+        })
+
+
+def baca_xlsx_kolom(path, columns=KOLOM_JOB_REPORT, sheet_name=None, chunk_rows=CHUNK_ROWS):
+    """
+    Membaca hanya kolom `columns` dari satu workbook (sheet pertama jika
+    sheet_name=None). Kolom yang tidak ada di workbook diisi NaN (dengan peringatan).
+    """
+    hasil = {}
+    n_baris = 0
+    for blok, n in iter_blok_xlsx(path, columns, sheet_name, chunk_rows):
+        for c, arr in blok.items():
+            hasil.setdefault(c, []).append(arr)
+        n_baris += n
+
+    data = {}
+    for c in columns:
+        if c in hasil:
+            # Tipe setiap blok diinferensi terpisah (misal datetime di satu blok, int di blok
+            # lain): digabung sebagai object lalu tipe diinferensi sekali untuk seluruh kolom
+            blok_kolom = [pd.Series(a).astype(object) for a in hasil[c] if len(a)]
+            gabungan = pd.concat(blok_kolom, ignore_index=True) if blok_kolom else pd.Series([], dtype=object)
+            data[c] = gabungan.infer_objects()
+        else:
+            data[c] = pd.Series(np.nan, index=range(n_baris))
+    return pd.DataFrame(data)